@@ -15,6 +15,18 @@ setup(name='tap-youtube-analytics',
           'singer-python==6.8.0'
       ],
       extras_require={
+          'async': [
+              'aiohttp==3.14.5',
+          ],
+          'fast-json': [
+              'orjson==3.8.3',
+          ],
+          'zstd': [
+              'zstandard==0.23.0',
+          ],
+          'parquet': [
+              'pyarrow==26.0.0',
+          ],
           'dev': [
               'ipdb==0.13.13',
               'pylint==4.0.5',
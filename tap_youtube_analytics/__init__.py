@@ -3,11 +3,14 @@ import json
 import singer
 from tap_youtube_analytics.client import Client
 from tap_youtube_analytics.discover import discover
+from tap_youtube_analytics.planner import plan
 from tap_youtube_analytics.sync import sync
 
 LOGGER = singer.get_logger()
 
 REQUIRED_CONFIG_KEYS = ["client_id", "client_secret", "channel_ids", "start_date", "user_agent", "refresh_token"]
+# Dry run estimating the sync of the catalog; singer's parser knows no such flag
+PLAN_FLAG = "--plan"
 
 
 def ensure_refresh_token(config):
@@ -36,9 +39,22 @@ def do_discover():
     LOGGER.info("Finished discover")
 
 
+def do_plan(client, catalog, state):
+    """Estimate the sync of the selected streams and emit the plan to stdout"""
+    if catalog is None:
+        raise ValueError(f"{PLAN_FLAG} requires a catalog (--catalog)")
+    LOGGER.info("Starting plan")
+    sync_plan = plan(client, catalog, state)
+    json.dump(sync_plan, sys.stdout, indent=2)
+    LOGGER.info("Finished plan")
+
+
 @singer.utils.handle_top_exception(LOGGER)
 def main():
     """Run the tap"""
+    plan_mode = PLAN_FLAG in sys.argv
+    if plan_mode:
+        sys.argv.remove(PLAN_FLAG)
     parsed_args = singer.utils.parse_args(REQUIRED_CONFIG_KEYS)
     ensure_refresh_token(parsed_args.config)
     state = {}
@@ -48,6 +64,8 @@ def main():
     with Client(parsed_args.config) as client:
         if parsed_args.discover:
             do_discover()
+        elif plan_mode:
+            do_plan(client, parsed_args.catalog, state)
         elif parsed_args.catalog:
             sync(
                  client=client,
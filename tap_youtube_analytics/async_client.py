@@ -0,0 +1,354 @@
+import asyncio
+import csv
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import backoff
+from singer import get_logger, metrics
+
+from tap_youtube_analytics.client import REQUEST_TIMEOUT, raise_for_status_code
+from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsBackoffError,
+    YoutubeAnalyticsError,
+    YoutubeAnalyticsRateLimitError,
+)
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+LOGGER = get_logger()
+# Requests in flight at once on the event loop, and reports downloaded ahead
+DEFAULT_MAX_IN_FLIGHT = 64
+# Items handed from the event loop to the sync caller before the loop waits
+DEFAULT_BUFFER_SIZE = 1000
+# Reports downloaded ahead of the one being emitted, and the downloaded rows
+# they may hold before no further download starts
+DEFAULT_REPORTS_AHEAD = 8
+DEFAULT_BUFFER_ROWS = 100000
+_DONE = object()
+
+if aiohttp is not None:
+    RETRYABLE_ERRORS = (
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        asyncio.TimeoutError,
+        YoutubeAnalyticsBackoffError,
+    )
+else:
+    RETRYABLE_ERRORS = (asyncio.TimeoutError, YoutubeAnalyticsBackoffError)
+
+
+def is_async_engine(config: Mapping[str, Any]) -> bool:
+    """True when the config selects the `async` engine."""
+    return (config.get("engine") or "sync") == "async"
+
+
+class AsyncClient:
+    """asyncio counterpart of `Client`, used by the `async` engine.
+    ~~~
+    Same authentication, error mapping and retries as `Client`; the number
+    of requests in flight is bounded by `async_max_in_flight`. Must be used
+    as an async context manager, on the event loop it was created on.
+    """
+
+    def __init__(self, config: Mapping[str, Any], entity_store=None) -> None:
+        if aiohttp is None:
+            raise YoutubeAnalyticsError(
+                "The async engine requires aiohttp: pip install 'tap-youtube-analytics[async]'"
+            )
+        self.config = config
+        self.entity_store = entity_store
+        self.quota = None
+        self.rate_limiter = None
+        self.base_url = "https://www.googleapis.com/youtube/v3"
+        self.google_token_uri = "https://oauth2.googleapis.com/token"
+        self.reporting_url = "https://youtubereporting.googleapis.com/v1"
+
+        config_request_timeout = config.get("request_timeout")
+        self.request_timeout = float(config_request_timeout) if config_request_timeout else REQUEST_TIMEOUT
+        self.max_in_flight = int(config.get("async_max_in_flight") or DEFAULT_MAX_IN_FLIGHT)
+
+        self.__access_token = None
+        self.__expires = None
+        self._token_lock = None
+        self._in_flight = None
+        self._session = None
+
+    async def __aenter__(self):
+        self._token_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+        await self.check_api_credentials()
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, traceback):
+        await self._session.close()
+
+    def _headers(self, headers: Optional[Dict] = None) -> Dict:
+        headers = dict(headers or {})
+        headers["Authorization"] = f"Bearer {self.__access_token}"
+        if self.config.get("user_agent"):
+            headers["User-Agent"] = self.config["user_agent"]
+        return headers
+
+    @backoff.on_exception(backoff.expo,
+                          YoutubeAnalyticsBackoffError,
+                          max_tries=5,
+                          factor=2)
+    async def check_api_credentials(self) -> None:
+        if self.__access_token is not None and self.__expires > datetime.now(timezone.utc):
+            return
+
+        async with self._token_lock:
+            if self.__access_token is not None and self.__expires > datetime.now(timezone.utc):
+                return
+
+            headers = {}
+            if self.config.get("user_agent"):
+                headers["User-Agent"] = self.config["user_agent"]
+
+            async with self._session.post(
+                self.google_token_uri,
+                headers=headers,
+                data={
+                    "grant_type": "refresh_token",
+                    "client_id": self.config["client_id"],
+                    "client_secret": self.config["client_secret"],
+                    "refresh_token": self.config["refresh_token"],
+                },
+            ) as response:
+                if response.status >= 500:
+                    raise YoutubeAnalyticsBackoffError()
+                data = await self._read_json(response)
+                if response.status != 200:
+                    raise_for_status_code(response.status, data, response)
+
+            self.__expires = datetime.now(timezone.utc) + timedelta(seconds=data["expires_in"])
+            self.__access_token = data["access_token"]
+            LOGGER.info(f"Authorized, token expires = {self.__expires}")
+
+    async def _pace(self, url: str) -> None:
+        """Wait for the turn of a request on the client's rate limiter."""
+        if self.rate_limiter:
+            wait = self.rate_limiter.reserve(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    def _raise_for_rate_limit(self, url: str, status: int, headers: Mapping, data: Dict) -> None:
+        """See `Client._raise_for_rate_limit`."""
+        if status == 429 or (self.rate_limiter and self.rate_limiter.is_rate_limited(status, data)):
+            if self.rate_limiter:
+                self.rate_limiter.throttle(url, headers.get("Retry-After"))
+            raise YoutubeAnalyticsRateLimitError()
+
+    @staticmethod
+    async def _read_json(response) -> Dict:
+        try:
+            return await response.json(content_type=None)
+        except Exception:
+            return {}
+
+    async def get(self, path=None, url=None, **kwargs) -> Optional[Mapping[Any, Any]]:
+        """Calls the make_request method with a prefixed method type `GET`"""
+        return await self._make_request("GET", path=path, url=url, **kwargs)
+
+    async def post(self, path=None, url=None, **kwargs) -> Optional[Mapping[Any, Any]]:
+        """Calls the make_request method with a prefixed method type `POST`"""
+        return await self._make_request("POST", path=path, url=url, **kwargs)
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=RETRYABLE_ERRORS,
+        max_tries=7,
+        factor=3,
+    )
+    async def _make_request(self, method: str, path=None, url=None, **kwargs) -> Optional[Mapping[Any, Any]]:
+        """Performs HTTP Operations, see `Client.__make_request`"""
+        await self.check_api_credentials()
+
+        if url and path:
+            url = f"{url}/{path}"
+        if not url and path:
+            url = f"{self.base_url}/{path}"
+
+        endpoint = kwargs.pop("endpoint", None)
+        if self.quota and url.startswith(self.base_url):
+            self.quota.charge(url)
+        headers = self._headers(kwargs.pop("headers", None))
+        if method == "POST":
+            headers["Content-Type"] = "application/json"
+
+        request_key = None
+        if self.entity_store and method == "GET" and url.startswith(self.base_url):
+            request_key = self.entity_store.request_key(url, kwargs.get("params"))
+            etag = self.entity_store.get_etag(request_key)
+            if etag:
+                headers["If-None-Match"] = etag
+
+        if kwargs.get("data"):
+            kwargs["data"] = json.dumps(kwargs["data"])
+
+        while True:
+            await self._pace(url)
+            async with self._in_flight:
+                with metrics.http_request_timer(endpoint) as timer:
+                    async with self._session.request(method, url, headers=headers, **kwargs) as response:
+                        timer.tags[metrics.Tag.http_status_code] = response.status
+                        data = await self._read_json(response)
+
+            if response.status >= 500:
+                raise YoutubeAnalyticsBackoffError()
+
+            self._raise_for_rate_limit(url, response.status, response.headers, data)
+
+            if response.status != 304 or not request_key:
+                break
+            stored_response = self.entity_store.load_response(request_key)
+            if stored_response is not None:
+                return stored_response
+            if "If-None-Match" not in headers:
+                break
+            # The store kept the etag but lost the response: request it in full
+            LOGGER.warning(f"No stored response for a 304 from {url}; requesting it again")
+            del headers["If-None-Match"]
+            if self.quota:
+                self.quota.charge(url)
+
+        if response.status != 200:
+            raise_for_status_code(response.status, data, response)
+
+        if request_key:
+            self.entity_store.save_response(
+                request_key, data, variant=self.entity_store.variant(kwargs.get("params")))
+        return data
+
+    @backoff.on_exception(
+        wait_gen=backoff.expo,
+        exception=RETRYABLE_ERRORS,
+        max_tries=7,
+        factor=3,
+    )
+    async def get_report(self, url: str, endpoint: str = None) -> List[Dict[str, Any]]:
+        """Download a CSV report and return its rows as dictionaries."""
+        await self.check_api_credentials()
+
+        await self._pace(url)
+        async with self._in_flight:
+            with metrics.http_request_timer(endpoint) as timer:
+                async with self._session.get(url, headers=self._headers()) as response:
+                    timer.tags[metrics.Tag.http_status_code] = response.status
+
+                    if response.status >= 500:
+                        raise YoutubeAnalyticsBackoffError()
+
+                    if response.status != 200:
+                        data = await self._read_json(response)
+                        self._raise_for_rate_limit(url, response.status, response.headers, data)
+                        raise_for_status_code(response.status, data, response)
+
+                    lines = []
+                    async for line in response.content:
+                        lines.append(line.decode("utf-8"))
+
+        return [row for row in csv.DictReader(lines, delimiter=",") if row]
+
+
+class AsyncEngine:
+    """Runs an `AsyncClient` on an event loop in a background thread and
+    hands the items of async iterators to synchronous callers.
+    ~~~
+    Each `iterate` call gets its own bounded buffer: when the caller (and so
+    the output writer) falls behind, the coroutine producing the items waits
+    on the full buffer, which in turn stops new requests from being issued.
+    The coroutines run in a copy of the caller's context, so their requests
+    are charged to the stream the caller syncs.
+    """
+
+    def __init__(self, client) -> None:
+        self.config = client.config
+        self.buffer_size = int(self.config.get("async_buffer_size") or DEFAULT_BUFFER_SIZE)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="async-engine", daemon=True)
+        self.thread.start()
+
+        async_client = AsyncClient(self.config, entity_store=client.entity_store)
+        async_client.base_url = client.base_url
+        async_client.reporting_url = client.reporting_url
+        async_client.google_token_uri = client.google_token_uri
+        async_client.quota = client.quota
+        async_client.rate_limiter = client.rate_limiter
+        self.client = self._run(async_client.__aenter__())
+
+    def _run(self, coroutine: Awaitable) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def iterate(self, make_iterator: Callable[[AsyncClient], AsyncIterator], buffer_size: int = None) -> Iterator:
+        """Yield the items of `make_iterator(client)`, run on the engine loop,
+        at most `buffer_size` (default `async_buffer_size`) items ahead."""
+        async def start() -> Tuple[asyncio.Queue, asyncio.Task]:
+            buffer = asyncio.Queue(maxsize=buffer_size or self.buffer_size)
+
+            async def produce() -> Optional[BaseException]:
+                try:
+                    async for item in make_iterator(self.client):
+                        await buffer.put(item)
+                except BaseException as err:  # pylint: disable=broad-except
+                    # Also a cancellation or e.g. a SystemExit, which would
+                    # otherwise stop the loop with the caller still waiting
+                    return err
+                return None
+
+            return buffer, asyncio.ensure_future(produce())
+
+        async def next_item(buffer: asyncio.Queue, producer: asyncio.Task) -> Tuple[Any, Optional[BaseException]]:
+            """The next item, or `_DONE` and the error that ended the producer,
+            whichever comes first."""
+            if buffer.empty() and not producer.done():
+                getter = asyncio.ensure_future(buffer.get())
+                await asyncio.wait((getter, producer), return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    return getter.result(), None
+                getter.cancel()
+            if not buffer.empty():
+                return buffer.get_nowait(), None
+            if producer.cancelled():
+                return _DONE, asyncio.CancelledError()
+            return _DONE, producer.result()
+
+        buffer, producer = self._run(start())
+        try:
+            while True:
+                item, error = self._run(next_item(buffer, producer))
+                if error is not None:
+                    raise error
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            self.loop.call_soon_threadsafe(producer.cancel)
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        self._run(self.client.__aexit__(None, None, None))
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_async_engine(client) -> AsyncEngine:
+    """Return the async engine of a `Client`, starting it on first use."""
+    with _ENGINE_LOCK:
+        if client.async_engine is None:
+            client.async_engine = AsyncEngine(client)
+        return client.async_engine
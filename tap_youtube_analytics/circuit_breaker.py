@@ -0,0 +1,114 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping
+
+from singer import get_logger
+
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsCircuitOpenError
+from tap_youtube_analytics.retry import OPEN, classify
+
+LOGGER = get_logger()
+DEFAULT_COOLDOWN_SECONDS = 60.0
+# Retry classes of the errors that signal an outage; a rate limited or
+# rejected request still got an answer from the endpoint
+OUTAGE_CLASSES = ("server_error", "network")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker of one endpoint.
+    ~~~
+    - closed: calls go through; `failure_threshold` outage errors in a row
+      open it
+    - open: calls raise `YoutubeAnalyticsCircuitOpenError` at once, for
+      `cooldown` seconds
+    - half open: after the cool-down one call probes the endpoint while the
+      others still fail fast; its success closes the breaker, an outage
+      error opens it again
+    """
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float = DEFAULT_COOLDOWN_SECONDS) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.state == CLOSED:
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+                LOGGER.info(f"Circuit of {self.name} half open: probing")
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return
+            raise self.open_error()
+
+    def open_error(self) -> YoutubeAnalyticsCircuitOpenError:
+        remaining = max(self.opened_at + self.cooldown - time.monotonic(), 0)
+        return YoutubeAnalyticsCircuitOpenError(
+            f"Circuit of {self.name} is open after {self.failures} consecutive failures;"
+            f" retrying in {remaining:.0f}s"
+        )
+
+    def record_success(self) -> None:
+        with self.lock:
+            if self.state != CLOSED:
+                LOGGER.info(f"Circuit of {self.name} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    LOGGER.warning(
+                        f"Circuit of {self.name} open after {self.failures} consecutive failures,"
+                        f" failing its calls for {self.cooldown:.0f}s"
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Run one call through the breaker."""
+        self.before_call()
+        try:
+            yield
+        except Exception as err:
+            if classify(err) in OUTAGE_CLASSES:
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+
+class CircuitBreakers:
+    """Circuit breakers of a client, one per endpoint (report downloads:
+    one per host), enabled by `circuit_breaker_failures`."""
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        self.failure_threshold = int(config.get("circuit_breaker_failures") or 0)
+        self.cooldown = float(config.get("circuit_breaker_cooldown_seconds") or DEFAULT_COOLDOWN_SECONDS)
+        self.enabled = self.failure_threshold > 0
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self.lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.cooldown)
+            return self.breakers[endpoint]
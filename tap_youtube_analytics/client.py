@@ -2,18 +2,35 @@ import codecs
 import csv
 from datetime import datetime, timedelta, timezone
 import json
+import sys
+import threading
 from typing import Any, Dict, List, Mapping, Optional, Tuple, Iterator
+from urllib.parse import urlsplit
 
-import backoff
 import requests
 from requests import session
-from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout
+from requests.adapters import HTTPAdapter
 from singer import get_logger, metrics
 
-from tap_youtube_analytics.exceptions import ERROR_CODE_EXCEPTION_MAPPING, YoutubeAnalyticsError, YoutubeAnalyticsBackoffError, YoutubeAnalyticsRateLimitError
+from tap_youtube_analytics.circuit_breaker import CircuitBreakers
+from tap_youtube_analytics.concurrency import ConcurrencyController, limited
+from tap_youtube_analytics.deadline import RunDeadline
+from tap_youtube_analytics.entity_store import EntityStore
+from tap_youtube_analytics.exceptions import (
+    ERROR_CODE_EXCEPTION_MAPPING,
+    YoutubeAnalyticsError,
+    YoutubeAnalyticsBackoffError,
+    YoutubeAnalyticsQuotaExceededError,
+    YoutubeAnalyticsRateLimitError,
+)
+from tap_youtube_analytics.quota import QuotaAccountant
+from tap_youtube_analytics.rate_limit import RATE_LIMIT_REASONS, RateLimiter, google_error_reasons
+from tap_youtube_analytics.retry import QUOTA_EXCEEDED_REASONS, RetryPolicy, retried
 
 LOGGER = get_logger()
 REQUEST_TIMEOUT = 300
+# Connections kept open per host, shared by the sessions of all threads
+DEFAULT_POOL_SIZE = 10
 
 def raise_for_error(response: requests.Response) -> None:
     """Raises the associated response exception. Takes in a response object,
@@ -26,18 +43,50 @@ def raise_for_error(response: requests.Response) -> None:
         response_json = response.json()
     except Exception:
         response_json = {}
-    if response.status_code not in [200, 201, 204]:
+    raise_for_status_code(response.status_code, response_json, response)
+
+
+def raise_for_status_code(status_code: int, response_json: Dict, response: Any = None) -> None:
+    """Raises the exception mapped to an error status code, with the error
+    message of the parsed response body. Shared by the sync and async
+    clients."""
+    if status_code not in [200, 201, 204]:
         if response_json.get("error"):
-            message = f"HTTP-error-code: {response.status_code}, Error: {response_json.get('error')}"
+            message = f"HTTP-error-code: {status_code}, Error: {response_json.get('error')}"
         else:
             message = "HTTP-error-code: {}, Error: {}".format(
-                response.status_code,
+                status_code,
                 response_json.get("message", ERROR_CODE_EXCEPTION_MAPPING.get(
-                    response.status_code, {}).get("message", "Unknown Error")))
+                    status_code, {}).get("message", "Unknown Error")))
         exc = ERROR_CODE_EXCEPTION_MAPPING.get(
-            response.status_code, {}).get("raise_exception", YoutubeAnalyticsError)
+            status_code, {}).get("raise_exception", YoutubeAnalyticsError)
+        if status_code >= 500 and status_code not in ERROR_CODE_EXCEPTION_MAPPING:
+            exc = YoutubeAnalyticsBackoffError
+        if status_code == 403:
+            # A 403 is retried, or not, by its Google error reason
+            reasons = google_error_reasons(response_json)
+            if any(reason in QUOTA_EXCEEDED_REASONS for reason in reasons):
+                exc = YoutubeAnalyticsQuotaExceededError
+            elif any(reason in RATE_LIMIT_REASONS for reason in reasons):
+                exc = YoutubeAnalyticsRateLimitError
         raise exc(message, response) from None
 
+def iter_report_lines(chunks: Iterator[bytes], offset: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """Split a CSV report body into lines, yielding each line without its
+    `\\n` and the byte offset just past it; `offset` is the offset of the
+    first chunk in the report."""
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            offset += len(line) + 1
+            yield line, offset
+    if pending:
+        yield pending, offset + len(pending)
+
+
 class Client:
     """A Wrapper class.
     ~~~
@@ -45,36 +94,135 @@ class Client:
      - Authentication
      - Response parsing
      - HTTP Error handling and retry
+
+    A client may be shared by threads: each thread gets its own session,
+    and the sessions share one connection pool per host (the Data API,
+    the Reporting API and the token host), so keep-alive connections are
+    reused across threads. The access token is refreshed under a lock.
     """
 
+    # Data API quota units spent, and the budgets they are held to
+    quota: QuotaAccountant = None
+    # Pacing of the requests of every thread, per host
+    rate_limiter: RateLimiter = None
+    # Adaptive limits of the requests in flight
+    concurrency: ConcurrencyController = None
+    # Retries of failed requests, and the budget they share
+    retry_policy: RetryPolicy = None
+    # Circuit breakers failing the calls of an endpoint that is down
+    circuit_breakers: CircuitBreakers = None
+    # Time budget of the sync
+    deadline: RunDeadline = None
+
     def __init__(self, config: Mapping[str, Any]) -> None:
         self.config = config
         self.__access_token = None
         self.__expires = None
-        self._session = session()
+        self.__token_lock = threading.Lock()
+        self.__local = threading.local()
+        self.__sessions = []
+        self.__sessions_lock = threading.Lock()
+        self.__adapters = {}
+        self.pool_size = int(config.get("http_pool_size") or DEFAULT_POOL_SIZE)
         self.base_url = "https://www.googleapis.com/youtube/v3"
         self.google_token_uri = "https://oauth2.googleapis.com/token"
         self.reporting_url = "https://youtubereporting.googleapis.com/v1"
+        # Event loop and `AsyncClient` of the `async` engine, started on first use
+        self.async_engine = None
+        # Process pool of the `report_workers`, started on first use
+        self.report_pool = None
+        self.quota = QuotaAccountant(config)
+        self.rate_limiter = RateLimiter(config)
+        self.concurrency = ConcurrencyController(config)
+        self.circuit_breakers = CircuitBreakers(config)
+        self.deadline = RunDeadline(config)
+        self.retry_policy = RetryPolicy(config, self.circuit_breakers, self.deadline)
 
 
         config_request_timeout = config.get("request_timeout")
         self.request_timeout = float(config_request_timeout) if config_request_timeout else REQUEST_TIMEOUT
 
+        # Optional local store used for `If-None-Match` requests to the Data API
+        self.entity_store = None
+        if config.get("entity_store_path"):
+            self.entity_store = EntityStore(
+                config["entity_store_path"],
+                mode=config.get("entity_store_mode") or "emit",
+            )
+
+    @property
+    def _session(self) -> requests.Session:
+        """The session of the calling thread"""
+        thread_session = getattr(self.__local, "session", None)
+        if thread_session is None:
+            thread_session = session()
+            with self.__sessions_lock:
+                for url in (self.base_url, self.reporting_url, self.google_token_uri):
+                    parts = urlsplit(url)
+                    prefix = f"{parts.scheme}://{parts.netloc}/"
+                    if prefix not in self.__adapters:
+                        # Blocking pool: at most `pool_size` connections per host
+                        self.__adapters[prefix] = HTTPAdapter(
+                            pool_connections=1,
+                            pool_maxsize=self.pool_size,
+                            pool_block=True,
+                        )
+                    thread_session.mount(prefix, self.__adapters[prefix])
+                self.__sessions.append(thread_session)
+            self.__local.session = thread_session
+        return thread_session
+
+    def close(self) -> None:
+        """Close the sessions of all threads and their connection pools"""
+        with self.__sessions_lock:
+            for thread_session in self.__sessions:
+                thread_session.close()
+            self.__sessions.clear()
+            for adapter in self.__adapters.values():
+                adapter.close()
+            self.__adapters.clear()
+        self.__local = threading.local()
+
+    def reset_connections(self, url: str) -> None:
+        """Drop the pooled connections to the host of `url`; the next
+        request to it opens a new one."""
+        self._session.get_adapter(url).close()
+
     def __enter__(self):
         self.check_api_credentials()
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
-        self._session.close()
+        self.close()
+        if self.async_engine:
+            self.async_engine.close()
+        if self.report_pool:
+            if sys.version_info >= (3, 9):
+                self.report_pool.shutdown(cancel_futures=True)
+            else:
+                # No `cancel_futures` before Python 3.9; a stream cancels
+                # the shards it leaves, so the pool has no work queued
+                self.report_pool.shutdown()
+        if self.entity_store:
+            self.entity_store.close()
 
-    @backoff.on_exception(backoff.expo,
-                        YoutubeAnalyticsBackoffError,
-                        max_tries=5,
-                        factor=2)
     def check_api_credentials(self) -> None:
-        if self.__access_token is not None and self.__expires > datetime.now(timezone.utc):
+        if self.__token_is_valid():
             return
 
+        with self.__token_lock:
+            # Another thread may have refreshed the token while we waited
+            if not self.__token_is_valid():
+                self.__refresh_access_token()
+
+    def __token_is_valid(self) -> bool:
+        # The expiry is set before the token, so a token implies an expiry
+        if self.__access_token is None:
+            return False
+        return self.__expires > datetime.now(timezone.utc)
+
+    @retried("token")
+    def __refresh_access_token(self) -> None:
         headers = {}
         if self.config["user_agent"]:
             headers["User-Agent"] = self.config["user_agent"]
@@ -90,18 +238,32 @@ class Client:
             })
 
         if response.status_code >= 500:
-            raise YoutubeAnalyticsBackoffError()
+            raise_for_error(response)
 
         if response.status_code != 200:
             raise_for_error(response)
 
         data = response.json()
-        self.__access_token = data["access_token"]
         # Make this timezone-aware as well
         # Use timezone-aware datetime to ensure correct comparison and avoid bugs from mixing naive and aware datetimes.
         self.__expires = datetime.now(timezone.utc) + timedelta(seconds=data["expires_in"])
+        self.__access_token = data["access_token"]
         LOGGER.info(f"Authorized, token expires = {self.__expires}")
 
+    def _raise_for_rate_limit(self, url: str, response: requests.Response) -> None:
+        """On a rate-limited response (429, or 403 with a rate limit reason),
+        pause the requests of every thread to its host and raise
+        `YoutubeAnalyticsRateLimitError`, which is retried."""
+        if response.status_code not in (403, 429):
+            return
+        try:
+            response_json = response.json()
+        except Exception:
+            response_json = {}
+        if self.rate_limiter.is_rate_limited(response.status_code, response_json):
+            self.rate_limiter.throttle(url, response.headers.get("Retry-After"))
+            raise YoutubeAnalyticsRateLimitError()
+
     def get(self, path=None, url=None, **kwargs):
         """Calls the make_request method with a prefixed method type `GET`"""
         return self.__make_request("GET", path=path, url=url, **kwargs)
@@ -127,25 +289,16 @@ class Client:
 
         kwargs.setdefault("stream", True)
 
-        @backoff.on_exception(
-            wait_gen=backoff.expo,
-            exception=(
-                ConnectionResetError,
-                ConnectionError,
-                ChunkedEncodingError,
-                Timeout,
-                YoutubeAnalyticsBackoffError,
-            ),
-            max_tries=7,
-            factor=3,
-        )
+        @self.retry_policy.retrying(endpoint or "download", download=True)
+        @self.concurrency.limit("download")
         def _fetch_rows() -> List[Dict[str, Any]]:
             """Make the HTTP request, read all CSV rows into a list, and return them.
 
-            Using a regular (non-generator) function so that the backoff decorator
+            Using a regular (non-generator) function so that the retry decorator
             wraps the actual network I/O and row-reading work, not just the creation
             of a generator object (which would be a no-op with respect to retries).
             """
+            self.rate_limiter.acquire(url)
             with metrics.http_request_timer(endpoint) as timer:
                 with self._session.request(
                     "GET",
@@ -156,10 +309,9 @@ class Client:
                     timer.tags[metrics.Tag.http_status_code] = response.status_code
 
                     if response.status_code >= 500:
-                        raise YoutubeAnalyticsBackoffError()
+                        raise_for_error(response)
 
-                    if response.status_code == 429:
-                        raise YoutubeAnalyticsRateLimitError()
+                    self._raise_for_rate_limit(url, response)
 
                     if response.status_code != 200:
                         raise_for_error(response)
@@ -173,18 +325,160 @@ class Client:
 
         yield from _fetch_rows()
 
-    @backoff.on_exception(
-        wait_gen=backoff.expo,
-        exception=(
-            ConnectionResetError,
-            ConnectionError,
-            ChunkedEncodingError,
-            Timeout,
-            YoutubeAnalyticsBackoffError
-        ),
-        max_tries=7,
-        factor=3,
-    )
+    def get_report_from(
+        self,
+        url: str,
+        position: Optional[Dict[str, Any]] = None,
+        endpoint: str = None,
+    ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Download a CSV report and yield (row, position) from a position.
+        ~~~
+        A position is `{"rows": rows read, "offset": byte offset of the next
+        row, "header": CSV header line}`. Resuming from one requests the bytes
+        after `offset` with a `Range` header; when the server answers with
+        the whole report instead, or with a range starting elsewhere, the
+        rows already read are skipped in the whole report.
+
+        The report is requested with `Accept-Encoding: identity`: offsets
+        count the bytes of the report itself, which a `Range` of a
+        compressed response would not address.
+        """
+        self.check_api_credentials()
+
+        @self.retry_policy.retrying(endpoint or "download", download=True)
+        @self.concurrency.limit("download")
+        def _fetch_rows(ranged: bool) -> Optional[Tuple[Optional[str], List[Tuple[Dict[str, Any], int, int]]]]:
+            """Read the rows after `position` with their row numbers and end
+            offsets; the rows are read in full before any is yielded, as in
+            `get_report`. Returns None when a ranged read does not start at
+            the offset of `position`."""
+            headers = {"Authorization": f"Bearer {self.__access_token}", "Accept-Encoding": "identity"}
+            if self.config.get("user_agent"):
+                headers["User-Agent"] = self.config["user_agent"]
+            if ranged:
+                headers["Range"] = f"bytes={position['offset']}-"
+
+            self.rate_limiter.acquire(url)
+            with metrics.http_request_timer(endpoint) as timer:
+                with self._session.request(
+                    "GET", url, headers=headers, timeout=self.request_timeout, stream=True
+                ) as response:
+                    timer.tags[metrics.Tag.http_status_code] = response.status_code
+
+                    if response.status_code == 416 and ranged:
+                        # Nothing after the range start: the report was read
+                        return position["header"], []
+
+                    if response.status_code >= 500:
+                        raise_for_error(response)
+
+                    self._raise_for_rate_limit(url, response)
+
+                    if response.status_code not in (200, 206):
+                        raise_for_error(response)
+
+                    header, row_number, offset = None, 0, 0
+                    if response.status_code == 206 and ranged:
+                        # `Content-Range: bytes <first>-<last>/<size>`
+                        content_range = response.headers.get("Content-Range", "")
+                        if content_range.partition(" ")[2].split("-")[0] != str(position["offset"]):
+                            return None
+                        header, row_number, offset = position["header"], position["rows"], position["offset"]
+                    skip_rows = (position or {}).get("rows", 0)
+                    fieldnames = next(csv.reader([header])) if header else None
+
+                    rows = []
+                    chunks = response.iter_content(chunk_size=1024 * 1024)
+                    for line, end in iter_report_lines(chunks, offset):
+                        text = line.decode("utf-8").rstrip("\r")
+                        if header is None:
+                            header, fieldnames = text, next(csv.reader([text]), [])
+                            continue
+                        if not text:
+                            continue
+                        row_number += 1
+                        if row_number <= skip_rows:
+                            continue
+                        rows.append((dict(zip(fieldnames, next(csv.reader([text])))), row_number, end))
+                    return header, rows
+
+        ranged = bool(position and position.get("offset") and position.get("header"))
+        fetched = _fetch_rows(ranged)
+        if fetched is None:
+            LOGGER.warning(f"Range answer for {endpoint or url} does not start at offset {position['offset']}; "
+                           "reading the whole report")
+            fetched = _fetch_rows(False)
+        header, rows = fetched
+        for row, row_number, end in rows:
+            yield row, {"rows": row_number, "offset": end, "header": header}
+
+    @retried("download", download=True)
+    @limited("download")
+    def download_report_file(self, url: str, path: str, endpoint: str = None, open_file=open) -> int:
+        """Download a CSV report to a local file, as is, and return its size
+        in bytes. A retried download rewrites the file from the start.
+
+        `open_file(path, "wb")` opens the file, e.g. to compress or hash the
+        bytes while they are written."""
+        self.check_api_credentials()
+
+        headers = {"Authorization": f"Bearer {self.__access_token}"}
+        if self.config.get("user_agent"):
+            headers["User-Agent"] = self.config["user_agent"]
+
+        self.rate_limiter.acquire(url)
+        with metrics.http_request_timer(endpoint) as timer:
+            with self._session.request(
+                "GET", url, headers=headers, timeout=self.request_timeout, stream=True
+            ) as response:
+                timer.tags[metrics.Tag.http_status_code] = response.status_code
+
+                if response.status_code >= 500:
+                    raise_for_error(response)
+
+                self._raise_for_rate_limit(url, response)
+
+                if response.status_code != 200:
+                    raise_for_error(response)
+
+                size = 0
+                with open_file(path, "wb") as file:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        file.write(chunk)
+                        size += len(chunk)
+                return size
+
+    @retried("download")
+    @limited("download")
+    def report_size(self, url: str, endpoint: str = None) -> Optional[int]:
+        """Size in bytes of a report, from the `Content-Length` of a HEAD
+        request, without downloading it; None when the size is not sent."""
+        self.check_api_credentials()
+
+        headers = {"Authorization": f"Bearer {self.__access_token}"}
+        if self.config.get("user_agent"):
+            headers["User-Agent"] = self.config["user_agent"]
+
+        self.rate_limiter.acquire(url)
+        with metrics.http_request_timer(endpoint) as timer:
+            response = self._session.request(
+                "HEAD", url, headers=headers, timeout=self.request_timeout, allow_redirects=True
+            )
+            timer.tags[metrics.Tag.http_status_code] = response.status_code
+
+        if response.status_code >= 500:
+            raise_for_error(response)
+
+        self._raise_for_rate_limit(url, response)
+
+        if response.status_code != 200:
+            raise_for_error(response)
+
+        content_length = response.headers.get("Content-Length")
+        return int(content_length) if content_length and content_length.isdigit() else None
+
+    @retried("download", download=True)
+    @limited("download")
     def __make_request_raw(self, method: str, url=None, **kwargs) -> Optional[str]:
         """Performs HTTP Operations for raw data (like CSV)"""
         self.check_api_credentials()
@@ -202,33 +496,23 @@ class Client:
         if self.config["user_agent"]:
             kwargs["headers"]["User-Agent"] = self.config["user_agent"]
 
+        self.rate_limiter.acquire(url)
         with metrics.http_request_timer(endpoint) as timer:
             response = self._session.request(method, url, timeout=self.request_timeout, **kwargs)
             timer.tags[metrics.Tag.http_status_code] = response.status_code
 
         if response.status_code >= 500:
-            raise YoutubeAnalyticsBackoffError()
+            raise_for_error(response)
 
-        if response.status_code == 429:
-            raise YoutubeAnalyticsRateLimitError()
+        self._raise_for_rate_limit(url, response)
 
         if response.status_code != 200:
             raise_for_error(response)
 
         return response.text
 
-    @backoff.on_exception(
-        wait_gen=backoff.expo,
-        exception=(
-            ConnectionResetError,
-            ConnectionError,
-            ChunkedEncodingError,
-            Timeout,
-            YoutubeAnalyticsBackoffError
-        ),
-        max_tries=7,
-        factor=3,
-    )
+    @retried("api")
+    @limited("api")
     def __make_request(self, method: str, path=None, url=None, **kwargs) -> Optional[Mapping[Any, Any]]:
         """Performs HTTP Operations
         Args:
@@ -265,22 +549,49 @@ class Client:
         if method == "POST":
             kwargs["headers"]["Content-Type"] = "application/json"
 
-        if kwargs.get("data"):
-            kwargs["data"] = json.dumps(kwargs["data"])
+        if url.startswith(self.base_url):
+            self.quota.charge(url)
 
-        with metrics.http_request_timer(endpoint) as timer:
-            response = self._session.request(method, url, timeout=self.request_timeout, **kwargs)
-            timer.tags[metrics.Tag.http_status_code] = response.status_code
+        # Conditional request for Data API resources we have seen before
+        request_key = None
+        if self.entity_store and method == "GET" and url.startswith(self.base_url):
+            request_key = self.entity_store.request_key(url, kwargs.get("params"))
+            etag = self.entity_store.get_etag(request_key)
+            if etag:
+                kwargs["headers"]["If-None-Match"] = etag
 
-        if response.status_code >= 500:
-            raise YoutubeAnalyticsBackoffError()
+        if kwargs.get("data"):
+            kwargs["data"] = json.dumps(kwargs["data"])
 
-        #Use retry functionality in backoff to wait and retry if
-        #response code equals 429 because rate limit has been exceeded
-        if response.status_code == 429:
-            raise YoutubeAnalyticsRateLimitError()
+        while True:
+            self.rate_limiter.acquire(url)
+            with metrics.http_request_timer(endpoint) as timer:
+                response = self._session.request(method, url, timeout=self.request_timeout, **kwargs)
+                timer.tags[metrics.Tag.http_status_code] = response.status_code
+
+            if response.status_code >= 500:
+                raise_for_error(response)
+
+            #Raise a retried error if the request was rate limited (429, or 403 with a rate limit reason)
+            self._raise_for_rate_limit(url, response)
+
+            if response.status_code != 304 or not request_key:
+                break
+            stored_response = self.entity_store.load_response(request_key)
+            if stored_response is not None:
+                return stored_response
+            if "If-None-Match" not in kwargs["headers"]:
+                break
+            # The store kept the etag but lost the response: request it in full
+            LOGGER.warning(f"No stored response for a 304 from {url}; requesting it again")
+            del kwargs["headers"]["If-None-Match"]
+            self.quota.charge(url)
 
         if response.status_code != 200:
             raise_for_error(response)
 
-        return response.json()
+        data = response.json()
+        if request_key:
+            self.entity_store.save_response(
+                request_key, data, variant=self.entity_store.variant(kwargs.get("params")))
+        return data
@@ -0,0 +1,143 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, Mapping, Optional
+
+from requests.exceptions import ConnectionError, Timeout
+from singer import get_logger, metrics
+
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsBackoffError
+
+LOGGER = get_logger()
+# Errors that signal an overloaded API: 429 and 5xx (`YoutubeAnalyticsBackoffError`
+# and its `YoutubeAnalyticsRateLimitError`), timeouts and dropped connections
+CONGESTION_ERRORS = (YoutubeAnalyticsBackoffError, Timeout, ConnectionError, ConnectionResetError)
+DEFAULT_INITIAL_LIMIT = 2
+DEFAULT_API_LATENCY_SECONDS = 2.0
+DECREASE_FACTOR = 0.5
+# Congestion errors within this time of a decrease cut the limit only once
+DECREASE_COOLDOWN_SECONDS = 1.0
+
+
+class AIMDLimit:
+    """Limit of requests in flight, adjusted by additive increase and
+    multiplicative decrease.
+    ~~~
+    - a request that succeeds within `latency_target` (any latency when
+      None) raises the limit by 1/limit, so about 1 per limit's worth of
+      requests, up to `maximum`
+    - a congestion error halves the limit, down to `minimum`; errors of
+      requests that were in flight together cut it once
+    - slow requests and other errors leave the limit as is
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: float,
+        minimum: float = 1,
+        maximum: float = 10,
+        latency_target: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = min(max(initial, minimum), self.maximum)
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, congested: bool = False, succeeded: bool = True) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            previous = int(self.limit)
+            now = time.monotonic()
+            if congested:
+                if now - self.last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                    self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+                    self.last_decrease = now
+            elif succeeded and (self.latency_target is None or latency <= self.latency_target):
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            changed = int(self.limit) != previous
+            self.condition.notify_all()
+
+        if changed:
+            self.log_limit()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the requests in flight for the duration of the block."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except CONGESTION_ERRORS:
+            self.release(time.monotonic() - started, congested=True)
+            raise
+        except BaseException:
+            self.release(time.monotonic() - started, succeeded=False)
+            raise
+        self.release(time.monotonic() - started)
+
+    def log_limit(self) -> None:
+        metrics.log(LOGGER, metrics.Point("gauge", "concurrency_limit", int(self.limit), {"pool": self.name}))
+
+
+class ConcurrencyController:
+    """Adaptive limits of the requests a client has in flight, with
+    `adaptive_concurrency`: one for the JSON APIs (`api`: the Data and
+    Reporting APIs) and one for report downloads (`download`). Without it,
+    slots are not limited."""
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        self.enabled = bool(config.get("adaptive_concurrency"))
+        maximum = int(config.get("adaptive_concurrency_max") or config.get("http_pool_size") or 10)
+        initial = int(config.get("adaptive_concurrency_initial") or DEFAULT_INITIAL_LIMIT)
+        latency = config.get("adaptive_latency_seconds")
+        self.limits: Dict[str, AIMDLimit] = {
+            "api": AIMDLimit(
+                "api", initial, maximum=maximum,
+                latency_target=float(latency) if latency else DEFAULT_API_LATENCY_SECONDS,
+            ),
+            # Download time grows with the report size, so only errors count
+            "download": AIMDLimit("download", initial, maximum=maximum),
+        }
+
+    def slot(self, pool: str) -> ContextManager:
+        return self.limits[pool].slot() if self.enabled else nullcontext()
+
+    def limit(self, pool: str) -> Callable:
+        """Decorator running each call of a function in a slot of `pool`."""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.slot(pool):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def log_limits(self) -> None:
+        if self.enabled:
+            for limit in self.limits.values():
+                limit.log_limit()
+
+
+def limited(pool: str) -> Callable:
+    """Decorator running each call of a `Client` method in a slot of the
+    client's concurrency controller; placed under `retried`, so every
+    attempt takes a slot."""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.concurrency.slot(pool):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+from singer import get_logger
+
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsDeadlineError
+
+LOGGER = get_logger()
+
+
+class RunDeadline:
+    """Time budget of a sync, `max_run_seconds` from the start of the tap.
+    ~~~
+    Past the deadline no new unit of work starts: streams, report
+    downloads and pages of the Data API. Units in flight finish, so the
+    streams stop at a point their bookmarks describe. Without
+    `max_run_seconds` the deadline is never reached.
+    """
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        max_run_seconds = config.get("max_run_seconds")
+        self.max_run_seconds = float(max_run_seconds) if max_run_seconds else None
+        self.started = time.monotonic()
+        # Set once a unit of work was not started because of the deadline
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        if self.max_run_seconds is None:
+            return None
+        return self.started + self.max_run_seconds - time.monotonic()
+
+    def reached(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def stop_before(self, unit: str) -> bool:
+        """True when `unit` must not start because the deadline passed."""
+        if not self.reached():
+            return False
+        with self.lock:
+            if not self.stopped:
+                LOGGER.info(f"Run deadline of {self.max_run_seconds:.0f}s reached, stopping before the next {unit}")
+            self.stopped = True
+        return True
+
+    def check(self, unit: str) -> None:
+        """Raise `YoutubeAnalyticsDeadlineError` when `unit` must not start."""
+        if self.stop_before(unit):
+            raise YoutubeAnalyticsDeadlineError(f"Run deadline of {self.max_run_seconds:.0f}s reached before a {unit}")
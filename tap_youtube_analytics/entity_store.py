@@ -0,0 +1,168 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+
+ENTITY_STORE_MODES = ("emit", "skip")
+
+
+class EntityStore:
+    """SQLite backed store of YouTube Data API resources and list responses.
+    ~~~
+    Holds:
+     - the last `etag` and serialized resource per (kind, id) and variant,
+       the `part`/`fields` mask the resource was requested with
+     - the last `etag` of every list request, with the ids of its items, so
+       that a `304 Not Modified` can be answered from the store
+    """
+
+    def __init__(self, path: str, mode: str = "emit") -> None:
+        if mode not in ENTITY_STORE_MODES:
+            raise ValueError(
+                f"Invalid entity_store_mode '{mode}', expected one of {ENTITY_STORE_MODES}"
+            )
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entities (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                etag TEXT,
+                record TEXT NOT NULL,
+                PRIMARY KEY (kind, id, variant)
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                request_key TEXT PRIMARY KEY,
+                variant TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                body TEXT NOT NULL,
+                item_keys TEXT NOT NULL
+            );
+            """
+        )
+        self.unchanged = set()
+        self.stats = {"requests": 0, "hits": 0, "entities": 0, "unchanged_entities": 0}
+
+    @staticmethod
+    def request_key(url: str, params: Optional[Mapping[str, Any]]) -> str:
+        """Identify a list request by its URL and query parameters."""
+        return json.dumps([url, sorted((params or {}).items())], default=str)
+
+    @staticmethod
+    def variant(params: Optional[Mapping[str, Any]]) -> str:
+        """Identify the representation requested by the `part` and `fields`
+        parameters; the same resource differs between masks."""
+        params = params or {}
+        return json.dumps([params.get("part"), params.get("fields")])
+
+    @staticmethod
+    def entity_key(record: Mapping[str, Any]) -> Optional[Tuple[str, str]]:
+        """Return the (kind, id) of a resource, or None for resources such as
+        search results whose id is not a plain string."""
+        resource_id = record.get("id")
+        if not isinstance(resource_id, str):
+            return None
+        return record.get("kind", ""), resource_id
+
+    def get_etag(self, request_key: str) -> Optional[str]:
+        """Return the etag of the last stored response for a request."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag FROM responses WHERE request_key = ?", (request_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_response(self, request_key: str) -> Optional[Dict]:
+        """Rebuild the last stored response for a request from the store and
+        mark all of its items as unchanged."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, item_keys, variant FROM responses WHERE request_key = ?", (request_key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            body = json.loads(row[0])
+            items = []
+            for kind, resource_id in json.loads(row[1]):
+                entity = self._connection.execute(
+                    "SELECT record FROM entities WHERE kind = ? AND id = ? AND variant = ?",
+                    (kind, resource_id, row[2]),
+                ).fetchone()
+                if entity:
+                    items.append(json.loads(entity[0]))
+                    self.unchanged.add((kind, resource_id))
+
+            self.stats["requests"] += 1
+            self.stats["hits"] += 1
+            self.stats["entities"] += len(items)
+            self.stats["unchanged_entities"] += len(items)
+
+        body["items"] = items
+        return body
+
+    def save_response(self, request_key: str, response: Dict, variant: str = "") -> None:
+        """Store a fresh response and its items, recording which items kept
+        the etag they had on the previous run."""
+        items = response.get("items") or []
+        item_keys = []
+
+        with self._lock:
+            self.stats["requests"] += 1
+            for item in items:
+                key = self.entity_key(item)
+                if key is None:
+                    continue
+                item_keys.append(key)
+                self.stats["entities"] += 1
+
+                previous = self._connection.execute(
+                    "SELECT etag FROM entities WHERE kind = ? AND id = ? AND variant = ?",
+                    (*key, variant),
+                ).fetchone()
+                if previous and item.get("etag") and previous[0] == item.get("etag"):
+                    self.unchanged.add(key)
+                    self.stats["unchanged_entities"] += 1
+                    continue
+
+                self.unchanged.discard(key)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entities (kind, id, variant, etag, record) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key[0], key[1], variant, item.get("etag"), json.dumps(item)),
+                )
+
+            if response.get("etag"):
+                body = {k: v for k, v in response.items() if k != "items"}
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (request_key, variant, etag, body, item_keys) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (request_key, variant, response["etag"], json.dumps(body), json.dumps(item_keys)),
+                )
+            self._connection.commit()
+
+    def is_unchanged(self, record: Mapping[str, Any]) -> bool:
+        """True if the resource has the same etag as on the previous run."""
+        key = self.entity_key(record)
+        return key is not None and key in self.unchanged
+
+    def log_metrics(self) -> None:
+        """Emit hit-rate metrics for the conditional requests of this run."""
+        for name, value in self.stats.items():
+            metrics.log(LOGGER, metrics.Point("counter", f"entity_store_{name}", value, {}))
+        if self.stats["requests"]:
+            hit_rate = self.stats["hits"] / self.stats["requests"]
+            metrics.log(LOGGER, metrics.Point("gauge", "entity_store_hit_rate", round(hit_rate, 4), {}))
+
+    def close(self) -> None:
+        self.log_metrics()
+        with self._lock:
+            self._connection.close()
@@ -24,6 +24,22 @@ class YoutubeAnalyticsForbiddenError(YoutubeAnalyticsError):
     """Class representing 403 status code."""
     pass
 
+class YoutubeAnalyticsQuotaExceededError(YoutubeAnalyticsForbiddenError):
+    """Class representing 403 status code with reason quotaExceeded or dailyLimitExceeded."""
+    pass
+
+class YoutubeAnalyticsQuotaBudgetError(YoutubeAnalyticsError):
+    """Class representing a Data API request over the configured quota budget."""
+    pass
+
+class YoutubeAnalyticsCircuitOpenError(YoutubeAnalyticsError):
+    """Class representing a call failed fast by the open circuit breaker of its endpoint."""
+    pass
+
+class YoutubeAnalyticsDeadlineError(YoutubeAnalyticsError):
+    """Class representing work not started because the `max_run_seconds` deadline passed."""
+    pass
+
 class YoutubeAnalyticsNotFoundError(YoutubeAnalyticsError):
     """Class representing 404 status code."""
     pass
@@ -56,6 +72,10 @@ class YoutubeAnalyticsServiceUnavailableError(YoutubeAnalyticsBackoffError):
     """Class representing 503 status code."""
     pass
 
+class YoutubeAnalyticsGatewayTimeoutError(YoutubeAnalyticsBackoffError):
+    """Class representing 504 status code."""
+    pass
+
 ERROR_CODE_EXCEPTION_MAPPING = {
     400: {
         "raise_exception": YoutubeAnalyticsBadRequestError,
@@ -101,5 +121,9 @@ ERROR_CODE_EXCEPTION_MAPPING = {
     503: {
         "raise_exception": YoutubeAnalyticsServiceUnavailableError,
         "message": "API service is currently unavailable."
+    },
+    504: {
+        "raise_exception": YoutubeAnalyticsGatewayTimeoutError,
+        "message": "The server did not receive a timely response from an upstream server."
     }
 }
@@ -0,0 +1,124 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from singer import get_logger, utils
+
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsError
+from tap_youtube_analytics.report_transform import normalize_datetime, transform_report_record
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+LOGGER = get_logger()
+# Columns added to every report row by `transform_report_record`
+REPORT_COLUMNS = ["report_id", "report_type_id", "report_name", "create_time", "dimensions_hash_key"]
+PARTITION_COLUMN = "date"
+DEFAULT_PARQUET_COMPRESSION = "snappy"
+
+
+def arrow_type(property_schema: Dict):
+    """Arrow type of a stream schema property."""
+    types = property_schema.get("type", [])
+    types = [types] if isinstance(types, str) else types
+    if "integer" in types:
+        return pyarrow.int64()
+    if "number" in types:
+        return pyarrow.float64()
+    if "boolean" in types:
+        return pyarrow.bool_()
+    if property_schema.get("format") == "date-time":
+        return pyarrow.timestamp("us", tz="UTC")
+    return pyarrow.string()
+
+
+def convert_value(value: Any, column_type) -> Any:
+    """Convert a CSV value to the Python value of an Arrow column."""
+    if value is None or value == "":
+        return None
+    if pyarrow.types.is_int64(column_type):
+        return int(float(value))
+    if pyarrow.types.is_float64(column_type):
+        return float(value)
+    if pyarrow.types.is_boolean(column_type):
+        return str(value).lower() == "true"
+    if pyarrow.types.is_timestamp(column_type):
+        return utils.strptime_to_utc(normalize_datetime(value))
+    return str(value)
+
+
+def partition_date(value: Any) -> Optional[str]:
+    """`YYYY-MM-DD` date of a report row's `date`, which the Reporting API
+    gives as `YYYYMMDD`; None without a date."""
+    value = str(value or "")
+    if len(value) == 8 and value.isdigit():
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return value[:10] or None
+
+
+class ParquetExporter:
+    """Writes the rows of a report stream to Parquet files.
+    ~~~
+    - columns: the report metadata columns, then the stream's `dimensions`
+      and `metrics`, limited to the fields selected in the catalog, typed
+      after the stream schema (`reports.json`)
+    - rows get the same dimension lookups and `dimensions_hash_key` as
+      RECORD messages
+    - files are partitioned by report date:
+      `<parquet_dir>/<stream>/date=<YYYY-MM-DD>/<report id>.parquet`
+    """
+
+    def __init__(self, stream, output_dir: str, compression: str = DEFAULT_PARQUET_COMPRESSION) -> None:
+        if pyarrow is None:
+            raise YoutubeAnalyticsError(
+                "The parquet report output requires pyarrow: pip install 'tap-youtube-analytics[parquet]'"
+            )
+        self.stream_name = stream.tap_stream_id
+        self.dimensions = getattr(stream, "dimensions", [])
+        self.compression = compression
+        self.output_dir = os.path.join(output_dir, self.stream_name)
+
+        properties = stream.schema.get("properties", {})
+        columns = REPORT_COLUMNS + self.dimensions + getattr(stream, "metrics", [])
+        self.schema = pyarrow.schema([
+            pyarrow.field(name, arrow_type(properties[name]))
+            for name in dict.fromkeys(columns)
+            if name in properties and stream.is_field_selected(("properties", name))
+        ])
+
+    @property
+    def encoding(self) -> Dict[str, str]:
+        return {"format": "parquet", "compression": self.compression}
+
+    def export_report(self, rows: List[Dict], report: Dict) -> List[str]:
+        """Write the rows of a report, one file per report date, and return
+        the file URIs."""
+        partitions: Dict[Optional[str], List[Dict]] = {}
+        for row in rows:
+            record = transform_report_record(row, self.dimensions, report)
+            partitions.setdefault(partition_date(record.get(PARTITION_COLUMN)), []).append(record)
+
+        uris = []
+        for date, records in partitions.items():
+            directory = os.path.join(self.output_dir, f"{PARTITION_COLUMN}={date or '__unknown__'}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{report.get('id')}.parquet")
+
+            table = pyarrow.table(
+                {
+                    field.name: pyarrow.array(
+                        [convert_value(record.get(field.name), field.type) for record in records],
+                        type=field.type,
+                    )
+                    for field in self.schema
+                },
+                schema=self.schema,
+            )
+            pyarrow.parquet.write_table(table, path, compression=self.compression)
+            uris.append(Path(path).resolve().as_uri())
+
+        LOGGER.info(f"Exported {len(rows)} rows of report {report.get('id')} to {len(uris)} parquet files")
+        return uris
@@ -0,0 +1,152 @@
+import contextvars
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+# Items a stage may have waiting in its input queue
+DEFAULT_QUEUE_DEPTH = 1000
+_DONE = object()
+
+Stage = Tuple[str, Callable[[Any], Optional[Any]]]
+
+
+def is_pipeline_enabled(config: Dict) -> bool:
+    """True when the config runs stream syncs as staged pipelines."""
+    return bool(config.get("pipeline"))
+
+
+class StageQueue:
+    """Bounded queue in front of a stage, sampling how full it is whenever
+    the stage takes an item."""
+
+    def __init__(self, stage: str, depth: int, stop: threading.Event) -> None:
+        self.stage = stage
+        self.depth = depth
+        self.stop = stop
+        self.items = queue.Queue(maxsize=depth)
+        self.samples = 0
+        self.occupied = 0
+
+    def put(self, item) -> bool:
+        """Wait for room in the queue; False if the pipeline stopped."""
+        while not self.stop.is_set():
+            try:
+                self.items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """Wait for the next item; the end marker if the pipeline stopped."""
+        self.samples += 1
+        self.occupied += self.items.qsize()
+        while not self.stop.is_set():
+            try:
+                return self.items.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    @property
+    def occupancy(self) -> float:
+        """Average share of the queue that was filled, from 0 to 1."""
+        if not self.samples:
+            return 0.0
+        return round(self.occupied / self.samples / self.depth, 3)
+
+
+class Pipeline:
+    """Runs `source -> stages -> sink` with each step on its own thread,
+    connected by bounded queues.
+    ~~~
+    - the source (e.g. downloads) and every stage run on a background thread;
+      the sink (the writer) runs on the calling thread
+    - a stage returns the item for the next stage, or None to drop it
+    - items keep their order; a full queue holds back the steps before it
+    - the first error stops every step and is raised by `run`, also one
+      ending a step's thread (e.g. `SystemExit`)
+    - the average occupancy of each stage's input queue is logged as the
+      `pipeline_queue_occupancy` gauge: a stage whose queue stays full is
+      the bottleneck, one whose queue stays empty waits on the steps before
+    """
+
+    def __init__(self, stream_name: str, depths: Optional[Dict[str, int]] = None) -> None:
+        self.stream_name = stream_name
+        self.depths = depths or {}
+
+    def run(self, source: Iterable, stages: List[Stage], sink: Callable[[Any], None], sink_name: str = "write") -> None:
+        stop = threading.Event()
+        errors = []
+        names = [name for name, _ in stages] + [sink_name]
+        queues = [
+            StageQueue(name, int(self.depths.get(name) or DEFAULT_QUEUE_DEPTH), stop)
+            for name in names
+        ]
+
+        # Errors, including e.g. a SystemExit, are raised by `run`; the end
+        # marker is always passed on, so the sink never waits forever
+        def produce() -> None:
+            try:
+                for item in source:
+                    if not queues[0].put(item):
+                        return
+            except BaseException as err:  # pylint: disable=broad-except
+                errors.append(err)
+            finally:
+                queues[0].put(_DONE)
+
+        def work(function: Callable, inbox: StageQueue, outbox: StageQueue) -> None:
+            try:
+                while True:
+                    item = inbox.get()
+                    if item is _DONE:
+                        break
+                    result = function(item)
+                    if result is not None and not outbox.put(result):
+                        return
+            except BaseException as err:  # pylint: disable=broad-except
+                errors.append(err)
+            finally:
+                outbox.put(_DONE)
+
+        # Each thread runs in a copy of the caller's context, so the requests
+        # it makes are charged to the stream syncing
+        threads = [threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(produce,),
+            name=f"{self.stream_name}-fetch",
+            daemon=True,
+        )]
+        for index, (name, function) in enumerate(stages):
+            threads.append(threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(work, function, queues[index], queues[index + 1]),
+                name=f"{self.stream_name}-{name}",
+                daemon=True,
+            ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                sink(item)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.log_occupancy(queues)
+
+        if errors:
+            raise errors[0]
+
+    def log_occupancy(self, queues: List[StageQueue]) -> None:
+        for stage_queue in queues:
+            tags = {"stream": self.stream_name, "stage": stage_queue.stage}
+            metrics.log(LOGGER, metrics.Point("gauge", "pipeline_queue_occupancy", stage_queue.occupancy, tags))
@@ -0,0 +1,214 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import singer
+from requests.exceptions import RequestException
+
+from tap_youtube_analytics import streams
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsError
+from tap_youtube_analytics.streams.abstracts import ReportStream, get_page_size
+from tap_youtube_analytics.streams.channels import MAX_CHANNEL_IDS_PER_REQUEST, Channels
+
+LOGGER = singer.get_logger()
+# Counts of a stream that are known before its sync
+EXACT = "exact"
+# Counts of a stream that stops at its bookmark, which only the sync finds
+UPPER_BOUND = "upper_bound"
+# Videos requested per videos.list request of the `videos` stream
+VIDEO_IDS_PER_REQUEST = 50
+TOTAL_KEYS = ("reports", "bytes", "requests", "quota_units")
+# Streams of the Data API, planned by `SyncPlanner.plan_<stream>`
+DATA_API_STREAMS = ("channels", "playlists", "playlist_items", "videos")
+
+
+def page_count(items: int, page_size: int) -> int:
+    """Requests listing `items` items, one at least."""
+    return max(1, math.ceil(items / page_size))
+
+
+class SyncPlanner:
+    """Estimates the work of a sync of the selected streams without running
+    it: no RECORD, SCHEMA or STATE message is written.
+    ~~~
+    - report streams: their reports are listed (metadata only) in the sync
+      window of the state, i.e. from the bookmark moved back to the
+      attribution window, or the window of an interrupted sync after its
+      last report, plus the reports that failed to download; each report
+      is sized by the `Content-Length` of a HEAD request. No reporting job
+      is created. Exact; they use no Data API quota.
+    - Data API streams: the request counts are derived from the video
+      count of each channel and the item count of each playlist, listed
+      with a few requests, and priced with the quota costs of the client.
+      `videos` and `playlist_items` stop at their bookmarks during a sync,
+      so theirs are upper bounds.
+    """
+
+    def __init__(self, client, catalog: singer.Catalog, state: Dict) -> None:
+        self.client = client
+        self.catalog = catalog
+        self.state = state
+        self.channel_ids = Channels.parse_channel_ids(client.config)
+        # Requests sent to make the plan
+        self.requests = 0
+        self._channels = None
+        self._playlists = None
+
+    def cost(self, path: str) -> int:
+        return self.client.quota.cost(f"{self.client.base_url}/{path}")
+
+    def get(self, path: str, params: Dict) -> Dict:
+        self.requests += 1
+        return self.client.get(path=path, params=params, endpoint=f"plan_{path}") or {}
+
+    def channels(self) -> Dict[str, Dict]:
+        """The configured channels with their video counts, by id."""
+        if self._channels is None:
+            self._channels = {}
+            params = {"part": "id,statistics", "fields": "items(id,statistics(videoCount))"}
+            for i in range(0, len(self.channel_ids), MAX_CHANNEL_IDS_PER_REQUEST):
+                batch = self.channel_ids[i:i + MAX_CHANNEL_IDS_PER_REQUEST]
+                for item in self.get(Channels.path, {**params, "id": ",".join(batch)}).get("items", []):
+                    self._channels[item["id"]] = item
+        return self._channels
+
+    def playlists(self) -> Tuple[int, List[int]]:
+        """The requests listing the playlists of the configured channels, and
+        the item count of each playlist."""
+        if self._playlists is None:
+            requests, item_counts = 0, []
+            for channel_id in self.channel_ids:
+                params = {
+                    "part": "id,contentDetails",
+                    "fields": "nextPageToken,items(id,contentDetails(itemCount))",
+                    "maxResults": get_page_size(self.client.config, "playlists"),
+                    "channelId": channel_id,
+                }
+                while True:
+                    response = self.get("playlists", params)
+                    requests += 1
+                    item_counts.extend(
+                        int(item.get("contentDetails", {}).get("itemCount") or 0)
+                        for item in response.get("items", [])
+                    )
+                    if not response.get("nextPageToken"):
+                        break
+                    params = {**params, "pageToken": response["nextPageToken"]}
+            self._playlists = requests, item_counts
+        return self._playlists
+
+    def plan_channels(self) -> Dict:
+        requests = math.ceil(len(self.channel_ids) / MAX_CHANNEL_IDS_PER_REQUEST)
+        return {"requests": requests, "quota_units": requests * self.cost("channels"), "estimate": EXACT}
+
+    def plan_playlists(self) -> Dict:
+        requests, _ = self.playlists()
+        return {"requests": requests, "quota_units": requests * self.cost("playlists"), "estimate": EXACT}
+
+    def plan_playlist_items(self) -> Dict:
+        """The items of every playlist; the playlists are listed by the
+        `playlists` stream, synced with it."""
+        _, item_counts = self.playlists()
+        page_size = get_page_size(self.client.config, "playlist_items")
+        requests = sum(page_count(items, page_size) for items in item_counts)
+        return {"requests": requests, "quota_units": requests * self.cost("playlistItems"), "estimate": UPPER_BOUND}
+
+    def plan_videos(self) -> Dict:
+        """A search of the videos of each channel, then their details."""
+        page_size = get_page_size(self.client.config, "search_videos")
+        searches, lookups = 0, 0
+        for channel_id in self.channel_ids:
+            channel = self.channels().get(channel_id) or {}
+            videos = int(channel.get("statistics", {}).get("videoCount") or 0)
+            searches += page_count(videos, page_size)
+            lookups += math.ceil(videos / VIDEO_IDS_PER_REQUEST)
+        return {
+            "requests": searches + lookups,
+            "quota_units": searches * self.cost("search") + lookups * self.cost("videos"),
+            "estimate": UPPER_BOUND,
+        }
+
+    def plan_report_stream(self, stream: ReportStream) -> Dict:
+        effective_start_dttm, _ = stream._load_window(self.state)
+        stream.url_endpoint = stream.get_url_endpoint()
+        stream.update_params(updated_since=stream.effective_start)
+
+        job_id = stream._find_job_id(create=False)
+        reports = [report for report, _ in stream._iter_new_reports(job_id, effective_start_dttm)] if job_id else []
+        listing_requests = sum(stats["requests"] for stats in stream.page_stats.values())
+        self.requests += listing_requests
+
+        size, unsized = 0, 0
+        for report in reports:
+            report_size = self.report_size(report)
+            if report_size is None:
+                unsized += 1
+            else:
+                size += report_size
+
+        return {
+            "reports": len(reports),
+            "bytes": size,
+            "reports_without_size": unsized,
+            # The sync creates the missing job, then lists its reports
+            "requests": listing_requests + len(reports) + (0 if job_id else 1),
+            "quota_units": 0,
+            "estimate": EXACT,
+        }
+
+    def report_size(self, report: Dict) -> Optional[int]:
+        self.requests += 1
+        try:
+            return self.client.report_size(report["downloadUrl"], endpoint="plan_report_size")
+        except (YoutubeAnalyticsError, RequestException) as err:
+            LOGGER.warning(f"Could not size report {report.get('id')}: {err}")
+            return None
+
+    def plan_stream(self, stream_name: str) -> Optional[Dict]:
+        if stream_name in DATA_API_STREAMS:
+            return getattr(self, f"plan_{stream_name}")()
+        catalog_entry = self.catalog.get_stream(stream_name)
+        if catalog_entry is None:
+            LOGGER.warning(f"Stream '{stream_name}' not found in catalog; skipping.")
+            return None
+        return self.plan_report_stream(streams.STREAMS[stream_name](self.client, catalog_entry))
+
+    def streams_to_plan(self) -> List[str]:
+        """The selected streams, and the parents the selected children are
+        synced under, as the sync orders them."""
+        streams_to_plan = []
+        for catalog_entry in self.catalog.get_selected_streams(self.state):
+            stream_name = catalog_entry.stream
+            if stream_name not in streams.STREAMS:
+                LOGGER.warning(f"Stream '{stream_name}' not found in STREAMS; skipping.")
+                continue
+            parent = streams.STREAMS[stream_name].parent
+            if parent and parent not in streams_to_plan:
+                streams_to_plan.append(parent)
+            if stream_name not in streams_to_plan:
+                streams_to_plan.append(stream_name)
+        return streams_to_plan
+
+    def plan(self) -> Dict:
+        stream_plans = {}
+        totals = dict.fromkeys(TOTAL_KEYS, 0)
+        for stream_name in self.streams_to_plan():
+            LOGGER.info(f"Planning stream: {stream_name}")
+            stream_plan = self.plan_stream(stream_name)
+            if stream_plan is None:
+                continue
+            stream_plan = {**dict.fromkeys(TOTAL_KEYS, 0), **stream_plan}
+            stream_plans[stream_name] = stream_plan
+            for key in TOTAL_KEYS:
+                totals[key] += stream_plan[key]
+
+        return {
+            "streams": stream_plans,
+            "totals": totals,
+            # What making the plan took
+            "planning": {"requests": self.requests, "quota_units": self.client.quota.units},
+        }
+
+
+def plan(client, catalog: singer.Catalog, state: Dict) -> Dict:
+    """Plan a sync of the selected streams of the catalog from the state."""
+    return SyncPlanner(client, catalog, state).plan()
@@ -0,0 +1,67 @@
+import contextvars
+import queue
+import threading
+from typing import Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Look-ahead is bounded so a slow consumer never holds more than this many
+# unprocessed pages in memory
+MAX_PREFETCH_DEPTH = 2
+_DONE = object()
+
+
+def prefetch(iterator: Iterator[T], depth: int) -> Iterator[T]:
+    """Consume `iterator` in a background thread, at most `depth` items ahead
+    of the caller.
+
+    Used for paginated listings: as soon as a page (and so its
+    `nextPageToken`) is known, the next page is requested while the caller
+    still processes the current one. Exceptions raised by the iterator,
+    including retries given up by the client, are re-raised to the caller in
+    order, and so are those that end the thread (e.g. `SystemExit`). The
+    thread runs in a copy of the caller's context, so its requests are
+    charged to the caller's stream. With a depth of 0 the iterator is
+    consumed inline.
+    """
+    depth = min(max(int(depth or 0), 0), MAX_PREFETCH_DEPTH)
+    if not depth:
+        yield from iterator
+        return
+
+    buffer = queue.Queue()
+    slots = threading.Semaphore(depth)
+    stop = threading.Event()
+
+    def produce() -> None:
+        error = None
+        try:
+            while not stop.is_set():
+                if not slots.acquire(timeout=0.1):
+                    continue
+                item = next(iterator, _DONE)
+                if item is _DONE:
+                    return
+                buffer.put((item, None))
+        except BaseException as err:  # pylint: disable=broad-except
+            # Also e.g. a SystemExit, so the consumer never waits forever
+            error = err
+        finally:
+            buffer.put((_DONE, error))
+
+    thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(produce,), name="page-prefetch", daemon=True
+    )
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            slots.release()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        # The producer finishes at most its in-flight request, then exits
+        stop.set()
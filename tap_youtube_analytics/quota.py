@@ -0,0 +1,122 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlsplit
+
+from singer import get_logger, metrics
+
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsQuotaBudgetError
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:  # pragma: no cover - no tz database
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+LOGGER = get_logger()
+# Data API quota units per request, by resource
+# (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "playlists": 1,
+    "playlistItems": 1,
+    "channels": 1,
+}
+DEFAULT_QUOTA_COST = 1
+# State key of the units used on the current quota day
+QUOTA_USAGE_KEY = "quota_usage"
+UNATTRIBUTED = "other"
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """The Data API quota day, which resets at midnight Pacific time."""
+    return (now or datetime.now(timezone.utc)).astimezone(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+
+class QuotaAccountant:
+    """Counts the Data API quota units spent by a sync and enforces budgets.
+    ~~~
+    - every Data API request, retries included, is charged its resource's
+      cost (`QUOTA_COSTS`, overridden by the `quota_costs` config)
+    - a request that would exceed `quota_run_budget` (units in this run) or
+      `quota_daily_budget` (units on the quota day, carried across runs in
+      the state key `quota_usage`) raises `YoutubeAnalyticsQuotaBudgetError`
+      instead of being sent
+    - units are attributed to the stream the calling context syncs (the
+      worker threads of a stream copy its context), or to the only stream
+      syncing; logged as the `quota_units` counter per stream
+    """
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        self.costs = {**QUOTA_COSTS, **(config.get("quota_costs") or {})}
+        self.run_budget = int(config["quota_run_budget"]) if config.get("quota_run_budget") else None
+        self.daily_budget = int(config["quota_daily_budget"]) if config.get("quota_daily_budget") else None
+        self.lock = threading.Lock()
+        self.units = 0
+        self.stream_units = {}
+        self.state = None
+        self.active_streams = []
+        self.synced_stream = contextvars.ContextVar("quota_stream", default=None)
+
+    def load_state(self, state: Dict) -> None:
+        """Track the daily budget in the state of the sync."""
+        if self.daily_budget is not None:
+            self.state = state
+
+    def cost(self, url: str) -> int:
+        resource = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+        return int(self.costs.get(resource, DEFAULT_QUOTA_COST))
+
+    def _daily_usage(self) -> Dict:
+        usage = self.state.get(QUOTA_USAGE_KEY)
+        today = quota_day()
+        if not isinstance(usage, dict) or usage.get("date") != today:
+            usage = self.state[QUOTA_USAGE_KEY] = {"date": today, "units": 0}
+        return usage
+
+    def charge(self, url: str) -> None:
+        """Charge a Data API request, or raise if it is over budget."""
+        cost = self.cost(url)
+        with self.lock:
+            if self.run_budget is not None and self.units + cost > self.run_budget:
+                raise YoutubeAnalyticsQuotaBudgetError(
+                    f"Quota run budget of {self.run_budget} units reached ({self.units} used)"
+                )
+            usage = self._daily_usage() if self.state is not None else None
+            if usage is not None and usage["units"] + cost > self.daily_budget:
+                raise YoutubeAnalyticsQuotaBudgetError(
+                    f"Quota daily budget of {self.daily_budget} units reached ({usage['units']} used)"
+                )
+
+            self.units += cost
+            if usage is not None:
+                usage["units"] += cost
+            stream = self.current_stream()
+            self.stream_units[stream] = self.stream_units.get(stream, 0) + cost
+
+    def current_stream(self) -> str:
+        stream = self.synced_stream.get()
+        if stream:
+            return stream
+        return self.active_streams[0] if len(self.active_streams) == 1 else UNATTRIBUTED
+
+    @contextmanager
+    def stream(self, stream_name: str) -> Iterator[None]:
+        """Attribute the requests made while syncing a stream to it."""
+        with self.lock:
+            self.active_streams.append(stream_name)
+        token = self.synced_stream.set(stream_name)
+        try:
+            yield
+        finally:
+            self.synced_stream.reset(token)
+            with self.lock:
+                self.active_streams.remove(stream_name)
+
+    def log_usage(self) -> None:
+        for stream, units in sorted(self.stream_units.items()):
+            metrics.log(LOGGER, metrics.Point("counter", "quota_units", units, {"stream": stream}))
+        LOGGER.info(f"Data API quota units used: {self.units}")
@@ -0,0 +1,152 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional
+from urllib.parse import urlsplit
+
+from singer import get_logger, metrics
+
+LOGGER = get_logger()
+# Google error reasons of a rate limited request (403 or 429)
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+# Pause of a host rate limited without a `Retry-After` header
+DEFAULT_THROTTLE_SECONDS = 5.0
+
+
+def google_error_reasons(response_json: Any) -> List[str]:
+    """The `reason` of each entry of a Google API error response,
+    `{"error": {"errors": [{"reason": ...}], "status": ...}}`."""
+    error = response_json.get("error") if isinstance(response_json, dict) else None
+    if not isinstance(error, dict):
+        return []
+    return [item.get("reason") for item in error.get("errors") or [] if isinstance(item, dict) and item.get("reason")]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header, given in seconds or as
+    an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+class TokenBucket:
+    """Token bucket of one host: `rate` requests per second with bursts of
+    up to `burst`; `rate` None does not limit. Also holds every request to
+    the host while it is paused after a rate-limited response."""
+
+    def __init__(self, rate: Optional[float] = None, burst: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.started = self.updated
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.requests += 1
+            start = max(now, self.paused_until)
+            if self.rate:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                self.tokens -= 1
+                if self.tokens < 0:
+                    start = max(start, now - self.tokens / self.rate)
+            wait = start - now
+            if wait > 0:
+                self.wait_seconds += wait
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request to the host for `seconds`."""
+        with self.lock:
+            self.throttled += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Paces the requests of every caller of a client, per host.
+    ~~~
+    - each host has a token bucket: `rate_limits` maps a host to requests
+      per second, `rate_limit_rps` applies to the other hosts (default: no
+      limit) and `rate_limit_burst` is the burst size
+    - a 429, or a 403 with reason `rateLimitExceeded`/`userRateLimitExceeded`,
+      pauses every request to the host for the `Retry-After` of the response,
+      or `rate_limit_pause_seconds`, so callers back off together
+    - requests per second and the time requests waited are logged per host
+      by `log_stats` as the `requests_per_second` and `throttle_wait_seconds`
+      metrics
+    """
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        self.rates = {host: float(rate) for host, rate in (config.get("rate_limits") or {}).items()}
+        self.default_rate = float(config["rate_limit_rps"]) if config.get("rate_limit_rps") else None
+        self.burst = float(config.get("rate_limit_burst") or 1)
+        self.pause_seconds = float(config.get("rate_limit_pause_seconds") or DEFAULT_THROTTLE_SECONDS)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = host_of(url)
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rates.get(host, self.default_rate), self.burst)
+            return self.buckets[host]
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request to the host of `url`; returns the seconds to
+        wait before sending it (for callers that sleep on their own, e.g.
+        the event loop)."""
+        return self.bucket(url).reserve()
+
+    def acquire(self, url: str) -> None:
+        """Wait for the turn of a request to the host of `url`."""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    @staticmethod
+    def is_rate_limited(status_code: int, response_json: Any = None) -> bool:
+        if status_code == 429:
+            return True
+        return status_code == 403 and any(
+            reason in RATE_LIMIT_REASONS for reason in google_error_reasons(response_json)
+        )
+
+    def throttle(self, url: str, retry_after: Optional[str] = None) -> float:
+        """Pause the host of a rate-limited request; returns the pause."""
+        seconds = parse_retry_after(retry_after)
+        if seconds is None:
+            seconds = self.pause_seconds
+        self.bucket(url).pause(seconds)
+        LOGGER.warning(f"Rate limited by {host_of(url)}, pausing its requests for {seconds:.1f}s")
+        return seconds
+
+    def log_stats(self) -> None:
+        with self.lock:
+            buckets = dict(self.buckets)
+        for host, bucket in sorted(buckets.items()):
+            elapsed = max(time.monotonic() - bucket.started, 1e-6)
+            tags = {"host": host}
+            metrics.log(LOGGER, metrics.Point("gauge", "requests_per_second", round(bucket.requests / elapsed, 2), tags))
+            metrics.log(LOGGER, metrics.Point("counter", "throttle_wait_seconds", round(bucket.wait_seconds, 3), tags))
+            metrics.log(LOGGER, metrics.Point("counter", "rate_limited_responses", bucket.throttled, tags))
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from singer import get_logger
+
+LOGGER = get_logger()
+DEFAULT_CSV_DIR = "reports"
+CSV_COMPRESSIONS = ("none", "gzip")
+
+
+class ArchiveFile:
+    """Writable file that stores the bytes of a report as they arrive,
+    optionally gzip compressed, while counting them, hashing them (SHA-256)
+    and counting their line ends."""
+
+    def __init__(self, path: str, compression: str = "none") -> None:
+        self.path = path
+        self.file = gzip.open(path, "wb") if compression == "gzip" else open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+        self.lines = 0
+        self.last_byte = b""
+
+    def write(self, data: bytes) -> int:
+        self.file.write(data)
+        self.sha256.update(data)
+        self.bytes += len(data)
+        self.lines += data.count(b"\n")
+        if data:
+            self.last_byte = data[-1:]
+        return len(data)
+
+    @property
+    def row_count(self) -> int:
+        """Rows of the CSV report, not counting the header."""
+        lines = self.lines + (1 if self.last_byte not in (b"", b"\n") else 0)
+        return max(lines - 1, 0)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+
+class ReportArchiver:
+    """Stores the reports of a report stream as the original CSV files.
+    ~~~
+    - files: `<csv_dir>/<stream>/<report id>.csv` (`.csv.gz` when gzip
+      compressed), written to a `.part` file while the report downloads and
+      renamed once its manifest is written; rows are not parsed
+    - each file has a sidecar `<report id>.manifest.json` with the report
+      id, job id, `startTime`, `endTime`, `createTime`, the byte size, row
+      count and SHA-256 checksum of the original (uncompressed) bytes
+    """
+
+    def __init__(self, stream_name: str, output_dir: str = DEFAULT_CSV_DIR, compression: str = "none") -> None:
+        if compression not in CSV_COMPRESSIONS:
+            raise ValueError(f"Unsupported csv_compression {compression}; use one of {CSV_COMPRESSIONS}")
+        self.stream_name = stream_name
+        self.compression = compression
+        self.output_dir = os.path.join(output_dir, stream_name)
+        self.current = None
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def report_path(self, report: Dict) -> str:
+        extension = "csv.gz" if self.compression == "gzip" else "csv"
+        return os.path.join(self.output_dir, f"{report.get('id')}.{extension}")
+
+    def open_file(self, path: str, mode: str = "wb") -> ArchiveFile:
+        """Open the archive file of a report; passed to
+        `Client.download_report_file`, which reopens it on a retry."""
+        self.current = ArchiveFile(path, self.compression)
+        return self.current
+
+    def archive_report(self, client, report: Dict, job_id: Optional[str] = None) -> Dict:
+        """Download a report to its archive file, write its manifest and
+        return it.
+
+        The report downloads to `<file>.part`, renamed over the archive file
+        after the manifest is written, so an interrupted download never
+        leaves a truncated file under the final name.
+        """
+        download_url = report["downloadUrl"]
+        path = self.report_path(report)
+        part_path = f"{path}.part"
+        try:
+            client.download_report_file(download_url, part_path, endpoint=download_url, open_file=self.open_file)
+            archived = self.current
+
+            manifest = {
+                "report_id": report.get("id"),
+                "job_id": job_id or report.get("jobId"),
+                "start_time": report.get("startTime"),
+                "end_time": report.get("endTime"),
+                "create_time": report.get("createTime"),
+                "file": Path(path).resolve().as_uri(),
+                "compression": self.compression,
+                "bytes": archived.bytes,
+                "row_count": archived.row_count,
+                "sha256": archived.sha256.hexdigest(),
+            }
+            manifest_path = os.path.join(self.output_dir, f"{report.get('id')}.manifest.json")
+            with open(manifest_path, "w", encoding="utf-8") as file:
+                json.dump(manifest, file, indent=2)
+            os.replace(part_path, path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+        LOGGER.info(f"Archived report {report.get('id')}: {archived.bytes} bytes, {archived.row_count} rows")
+        return manifest
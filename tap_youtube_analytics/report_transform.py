@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+from typing import Dict, List
+
+from singer import get_logger
+
+LOGGER = get_logger()
+DIM_LOOKUP_MAP_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "streams", "dim_lookup_map.json"
+)
+
+_dim_lookup_map = None  # Module-level cache for dimension lookup map
+
+
+def normalize_datetime(value: str) -> str:
+    """Ensure datetime strings include a time component and timezone."""
+    if not value:
+        return value
+    if len(value) == 10 and "T" not in value:
+        value = f"{value}T00:00:00Z"
+    if "T" in value and not value.endswith("Z") and "+" not in value:
+        value = f"{value}Z"
+    return value
+
+
+def hash_data(data) -> str:
+    """Create MD5 hash key for data element
+    Prepare the project id hash"""
+    hash_id = hashlib.md5()
+    hash_id.update(repr(data).encode('utf-8'))
+
+    return hash_id.hexdigest()
+
+
+def load_dim_lookup_map() -> Dict:
+    """Load and cache the dimension lookup map"""
+    global _dim_lookup_map  # pylint: disable=global-statement
+    if _dim_lookup_map is None:
+        try:
+            if os.path.exists(DIM_LOOKUP_MAP_PATH):
+                with open(DIM_LOOKUP_MAP_PATH) as file:
+                    _dim_lookup_map = json.load(file)
+                    LOGGER.info("Loaded dimension lookup map from file")
+            else:
+                LOGGER.warning(f"Dimension lookup map file not found at {DIM_LOOKUP_MAP_PATH}, using empty map")
+                _dim_lookup_map = {}
+        except (IOError, json.JSONDecodeError) as e:
+            LOGGER.error(f"Failed to load dimension lookup map: {e}")
+            _dim_lookup_map = {}
+    return _dim_lookup_map
+
+
+# dim_lookup_map.json: code to description mapping dictionary for each dimension
+# Created from Dimensions lookup tables here:
+#   https://developers.google.com/youtube/reporting/v1/reports/dimensions#Annotation_Dimensions
+# Google Sheet for creating/maintaining dim_lookup_map.json:
+#   https://docs.google.com/spreadsheets/d/1qR1kCiqwcvkZL4z9e0hxWa1kokesCSRv4LLyPmnnuUI/edit?usp=sharing
+def transform_report_record(record: Dict, dimensions: List[str], report: Dict) -> Dict:
+    """Transform report records.
+
+    A module-level function so report worker processes can run it.
+    """
+    new_record = record.copy()
+    dim_lookup_map = load_dim_lookup_map()
+
+    dimension_values = {}
+
+    for key, val in list(record.items()):
+        # Add dimension key-val to dimension_values dictionary
+        if key in dimensions:
+            dimension_values[key] = val
+
+        # Transform dim values from codes to names using dim_lookup_map
+        if key in dim_lookup_map:
+            # lookup new_val, with a default for existing val (if not found)
+            new_val = dim_lookup_map[key].get(val, val)
+            if val == new_val:
+                LOGGER.warning(f"dim_lookup_map value not found; key: {key}, value: {val}")
+            new_record[key] = new_val
+        else:
+            new_record[key] = val
+
+    # Add report fields to data
+    new_record['report_id'] = report.get('id')
+    new_record['report_type_id'] = report.get('reportTypeId')
+    new_record['report_name'] = report.get('name')
+    new_record['create_time'] = report.get('createTime')
+
+    # Create unique md5 hash key for dimension_values
+    dims_md5 = str(hash_data(json.dumps(dimension_values, sort_keys=True)))
+    new_record['dimensions_hash_key'] = dims_md5
+
+    return new_record
@@ -0,0 +1,120 @@
+import csv
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from singer import RecordMessage, Transformer, format_message, get_logger, utils
+
+from tap_youtube_analytics.report_transform import normalize_datetime, transform_report_record
+from tap_youtube_analytics.writer import dumps
+
+LOGGER = get_logger()
+# Staged reports are split into shards of about this size, at line ends
+DEFAULT_SHARD_BYTES = 16 * 1024 * 1024
+
+_POOL_LOCK = threading.Lock()
+
+
+def get_report_pool(client, workers: int) -> ProcessPoolExecutor:
+    """Return the report worker pool of a `Client`, started on first use and
+    shut down with the client, so the streams of a sync share it.
+
+    Workers are spawned rather than forked: by then the tap runs threads
+    (the async engine loop, page prefetch, parallel streams) whose locks a
+    forked child would inherit in whatever state they were.
+    """
+    with _POOL_LOCK:
+        if client.report_pool is None:
+            client.report_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return client.report_pool
+
+
+def read_header(path: str) -> Tuple[List[str], int]:
+    """Return the CSV header of a staged report and the offset of its first row."""
+    with open(path, "rb") as file:
+        header = file.readline()
+    fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+    return fieldnames, len(header)
+
+
+def shard_file(path: str, start: int, size: int, shard_bytes: int = DEFAULT_SHARD_BYTES) -> List[Tuple[int, int]]:
+    """Split the byte range [start, size) of a file into (start, end) shards
+    of about `shard_bytes`, each ending right after a newline.
+
+    Report rows hold no quoted line breaks, so a line is a row.
+    """
+    shards = []
+    with open(path, "rb") as file:
+        while start < size:
+            file.seek(min(start + shard_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def transform_shard(task: Dict[str, Any]) -> Tuple[List[str], int, Optional[str]]:
+    """Parse, transform and serialize the rows of one shard of a staged report.
+
+    Runs in a worker process; `task` holds the shard (`path`, `start`, `end`,
+    `fieldnames`) and what `ReportStream.sync` needs to transform a row
+    (`stream`, `schema`, `metadata`, `dimensions`, `report`,
+    `replication_key`, `effective_start`), and `bare_records` when the
+    writer takes the records without their message.
+
+    Returns the records serialized as JSON lines for `write_lines`, the number of rows read and
+    the latest replication value of the emitted records.
+    """
+    with open(task["path"], "rb") as file:
+        file.seek(task["start"])
+        data = file.read(task["end"] - task["start"])
+
+    effective_start = utils.strptime_to_utc(task["effective_start"])
+    lines = []
+    row_count = 0
+    max_dttm = None
+
+    with Transformer() as transformer:
+        # Only `\n` and `\r` end a row; `str.splitlines` also splits on e.g.
+        # `\x85` or `\u2028` inside a cell
+        reader = csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=task["fieldnames"])
+        for row in reader:
+            if not row:
+                continue
+            row_count += 1
+
+            record = transformer.transform(
+                transform_report_record(row, task["dimensions"], task["report"]),
+                task["schema"],
+                task["metadata"],
+            )
+
+            record_time_raw = record.get(task["replication_key"])
+            record_dttm = None
+            if record_time_raw:
+                try:
+                    record_dttm = utils.strptime_to_utc(normalize_datetime(record_time_raw))
+                except Exception as err:  # pylint: disable=broad-except
+                    LOGGER.warning(
+                        "Failed to parse record timestamp %s for stream %s: %s",
+                        record_time_raw,
+                        task["stream"],
+                        err,
+                    )
+
+            if record_dttm and record_dttm < effective_start:
+                continue
+            if record_dttm and (max_dttm is None or record_dttm > max_dttm):
+                max_dttm = record_dttm
+
+            if task.get("bare_records"):
+                lines.append(dumps(record) + "\n")
+            else:
+                lines.append(format_message(RecordMessage(stream=task["stream"], record=record)) + "\n")
+
+    return lines, row_count, utils.strftime(max_dttm) if max_dttm else None
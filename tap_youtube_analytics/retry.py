@@ -0,0 +1,265 @@
+import contextvars
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlsplit
+
+from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout
+from singer import get_logger, metrics
+
+from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsBackoffError,
+    YoutubeAnalyticsNotImplementedError,
+    YoutubeAnalyticsRateLimitError,
+)
+
+LOGGER = get_logger()
+# Google error reasons of a 403 that no retry fixes before the quota resets
+QUOTA_EXCEEDED_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+NETWORK_ERRORS = (ConnectionResetError, ConnectionError, ChunkedEncodingError, Timeout)
+DEFAULT_MAX_TRIES = 7
+DEFAULT_BASE_DELAY_SECONDS = 3.0
+DEFAULT_MAX_DELAY_SECONDS = 60.0
+DEFAULT_REQUEST_DEADLINE_SECONDS = 300.0
+# Retries allowed per first attempt, on top of `DEFAULT_BUDGET_MIN_RETRIES`
+DEFAULT_BUDGET_RATIO = 0.2
+DEFAULT_BUDGET_MIN_RETRIES = 10
+# State of an open circuit breaker (see `circuit_breaker`)
+OPEN = "open"
+
+
+def classify(error: BaseException) -> Optional[str]:
+    """The retry class of an error, or None when it is not retried.
+    ~~~
+    - `rate_limited`: a 429, or a 403 with reason `rateLimitExceeded`/
+      `userRateLimitExceeded`
+    - `server_error`: a 5xx other than 501, or a 422
+    - `network`: a timeout or a dropped connection
+    - not retried: other 4xx, including a 403 with reason `quotaExceeded`/
+      `dailyLimitExceeded`, a 501 and any other error
+    """
+    if isinstance(error, YoutubeAnalyticsRateLimitError):
+        return "rate_limited"
+    if isinstance(error, YoutubeAnalyticsNotImplementedError):
+        return None
+    if isinstance(error, YoutubeAnalyticsBackoffError):
+        return "server_error"
+    if isinstance(error, NETWORK_ERRORS):
+        return "network"
+    return None
+
+
+def endpoint_name(endpoint: Optional[str], download: bool = False) -> str:
+    """Key of an endpoint for the retry stats and circuit breakers: a URL
+    by its path (e.g. `/youtube/v3/videos`), and a report download URL,
+    one per report, by its host."""
+    if endpoint and "://" in endpoint:
+        url = urlsplit(endpoint)
+        return url.netloc if download else url.path or url.netloc
+    return endpoint or "other"
+
+
+class RetryStats:
+    def __init__(self) -> None:
+        self.retries = 0
+        self.seconds = 0.0
+        self.reasons: Dict[str, int] = {}
+
+
+class RetryPolicy:
+    """Retries the requests of every thread of a client.
+    ~~~
+    - errors are retried by their class (see `classify`), up to
+      `retry_max_tries` attempts per request
+    - the waits use decorrelated jitter: each is random between
+      `retry_base_delay_seconds` and three times the previous one, capped at
+      `retry_max_delay_seconds`
+    - a request is not retried past `retry_request_deadline_seconds` from
+      its first attempt, nor past `retry_stream_deadline_seconds` from the
+      start of the stream it syncs, nor past the run deadline
+      (`max_run_seconds`); a report download, which may take
+      longer than the request deadline by itself, is held to
+      `retry_download_deadline_seconds` instead, unset by default
+    - the run shares a retry budget: `retry_budget_min_retries` retries plus
+      `retry_budget_ratio` retries per request; once it is spent, errors
+      are raised at once
+    - with circuit breakers, each attempt goes through the breaker of its
+      endpoint, so an open circuit ends the retries at once
+    - retries (per endpoint and class) and the time spent waiting on them
+      (per endpoint) are logged by `log_stats` as the `retry_count` and
+      `retry_seconds` metrics
+    """
+
+    def __init__(self, config: Mapping[str, Any], breakers=None, run_deadline=None) -> None:
+        # `CircuitBreakers` every attempt goes through, when enabled
+        self.breakers = breakers if breakers is not None and breakers.enabled else None
+        # `RunDeadline` of the sync, when the client has one
+        self.run_deadline = run_deadline
+        self.max_tries = int(config.get("retry_max_tries") or DEFAULT_MAX_TRIES)
+        self.base_delay = float(config.get("retry_base_delay_seconds") or DEFAULT_BASE_DELAY_SECONDS)
+        self.max_delay = max(float(config.get("retry_max_delay_seconds") or DEFAULT_MAX_DELAY_SECONDS), self.base_delay)
+        self.request_deadline = float(
+            config.get("retry_request_deadline_seconds") or DEFAULT_REQUEST_DEADLINE_SECONDS
+        )
+        download_deadline = config.get("retry_download_deadline_seconds")
+        self.download_deadline = float(download_deadline) if download_deadline else None
+        stream_deadline = config.get("retry_stream_deadline_seconds")
+        self.stream_deadline = float(stream_deadline) if stream_deadline else None
+        ratio = config.get("retry_budget_ratio")
+        self.budget_ratio = float(ratio) if ratio is not None else DEFAULT_BUDGET_RATIO
+        min_retries = config.get("retry_budget_min_retries")
+        self.budget_min_retries = int(min_retries) if min_retries is not None else DEFAULT_BUDGET_MIN_RETRIES
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.stats: Dict[str, RetryStats] = {}
+        self.stream_deadlines: Dict[str, float] = {}
+        self.synced_deadline = contextvars.ContextVar("stream_deadline", default=None)
+
+    def next_delay(self, previous: float) -> float:
+        return min(self.max_delay, random.uniform(self.base_delay, max(previous, self.base_delay) * 3))
+
+    def current_deadline(self) -> Optional[float]:
+        """Deadline of the stream the calling context syncs (the worker
+        threads of a stream copy its context), or of the only stream syncing."""
+        deadline = self.synced_deadline.get()
+        if deadline is not None:
+            return deadline
+        with self.lock:
+            if len(self.stream_deadlines) == 1:
+                return next(iter(self.stream_deadlines.values()))
+        return None
+
+    @contextmanager
+    def stream(self, stream_name: str) -> Iterator[None]:
+        """Hold the retries of the requests made while syncing a stream to
+        the stream deadline."""
+        if self.stream_deadline is None:
+            yield
+            return
+        deadline = time.monotonic() + self.stream_deadline
+        with self.lock:
+            self.stream_deadlines[stream_name] = deadline
+        token = self.synced_deadline.set(deadline)
+        try:
+            yield
+        finally:
+            self.synced_deadline.reset(token)
+            with self.lock:
+                self.stream_deadlines.pop(stream_name, None)
+
+    def _take_retry(self) -> bool:
+        with self.lock:
+            if self.retries >= self.budget_min_retries + self.budget_ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+    def _record(self, endpoint: str, reason: str, delay: float) -> None:
+        with self.lock:
+            stats = self.stats.setdefault(endpoint, RetryStats())
+            stats.retries += 1
+            stats.seconds += delay
+            stats.reasons[reason] = stats.reasons.get(reason, 0) + 1
+
+    def call(self, endpoint: Optional[str], function: Callable, *args, **kwargs) -> Any:
+        """Call `function` for `endpoint`, retrying the errors the policy
+        retries."""
+        return self._call(endpoint, function, args, kwargs)
+
+    def call_download(self, endpoint: Optional[str], function: Callable, *args, **kwargs) -> Any:
+        """`call` for a report download, held to the download deadline."""
+        return self._call(endpoint, function, args, kwargs, download=True)
+
+    def _call(
+        self,
+        endpoint: Optional[str],
+        function: Callable,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        download: bool = False,
+    ) -> Any:
+        """`call` with the arguments of `function` passed as they are, so
+        that they may include an `endpoint` keyword of their own."""
+        request_deadline = self.download_deadline if download else self.request_deadline
+        endpoint = endpoint_name(endpoint, download)
+        with self.lock:
+            self.requests += 1
+        deadline = time.monotonic() + request_deadline if request_deadline else float("inf")
+        stream_deadline = self.current_deadline()
+        if stream_deadline is not None:
+            deadline = min(deadline, stream_deadline)
+        remaining = self.run_deadline.remaining() if self.run_deadline is not None else None
+        if remaining is not None:
+            deadline = min(deadline, time.monotonic() + remaining)
+
+        breaker = self.breakers.breaker(endpoint) if self.breakers else None
+        delay = self.base_delay
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if breaker is None:
+                    return function(*args, **kwargs)
+                with breaker.call():
+                    return function(*args, **kwargs)
+            except Exception as err:
+                reason = classify(err)
+                if reason is None:
+                    raise
+                if breaker is not None and breaker.state == OPEN:
+                    raise breaker.open_error() from err
+                if attempt >= self.max_tries:
+                    LOGGER.warning(f"Giving up on {endpoint} after {attempt} tries: {err!r}")
+                    raise
+                delay = self.next_delay(delay)
+                if time.monotonic() + delay > deadline:
+                    LOGGER.warning(f"Giving up on {endpoint}: retrying would pass its deadline: {err!r}")
+                    raise
+                if not self._take_retry():
+                    LOGGER.warning(f"Giving up on {endpoint}: the retry budget of the run is spent: {err!r}")
+                    raise
+                self._record(endpoint, reason, delay)
+                LOGGER.info(f"Retrying {endpoint} in {delay:.1f}s (try {attempt + 1}, {reason}): {err!r}")
+                time.sleep(delay)
+
+    def retrying(self, endpoint: Optional[str] = None, download: bool = False) -> Callable:
+        """Decorator retrying each call of a function by the policy; with
+        `download`, as a report download."""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                return self._call(endpoint, function, args, kwargs, download)
+            return wrapper
+        return decorator
+
+    def log_stats(self) -> None:
+        with self.lock:
+            stats = dict(self.stats)
+        for endpoint, endpoint_stats in sorted(stats.items()):
+            for reason, retries in sorted(endpoint_stats.reasons.items()):
+                tags = {"endpoint": endpoint, "reason": reason}
+                metrics.log(LOGGER, metrics.Point("counter", "retry_count", retries, tags))
+            tags = {"endpoint": endpoint}
+            metrics.log(LOGGER, metrics.Point("counter", "retry_seconds", round(endpoint_stats.seconds, 3), tags))
+        if self.retries:
+            LOGGER.info(f"Retries: {self.retries} of {self.requests} requests")
+
+
+def retried(default_endpoint: str, download: bool = False) -> Callable:
+    """Decorator retrying each call of a `Client` method by the client's
+    retry policy, with `download` as a report download; the `endpoint`
+    keyword of the call, when given, names the endpoint in place of
+    `default_endpoint`."""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            endpoint = kwargs.get("endpoint") or default_endpoint
+            return self.retry_policy._call(  # pylint: disable=protected-access
+                endpoint, method, (self,) + args, kwargs, download
+            )
+        return wrapper
+    return decorator
@@ -1,9 +1,12 @@
-import hashlib
-import json
+import asyncio
 import os
+import tempfile
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 
 import humps
 from singer import (
@@ -14,11 +17,39 @@ from singer import (
     metrics,
     utils,
     write_bookmark,
+)
+
+from tap_youtube_analytics.async_client import (
+    DEFAULT_BUFFER_ROWS,
+    DEFAULT_REPORTS_AHEAD,
+    get_async_engine,
+    is_async_engine,
+)
+from tap_youtube_analytics.parquet_export import DEFAULT_PARQUET_COMPRESSION, ParquetExporter
+from tap_youtube_analytics.pipeline import Pipeline, is_pipeline_enabled
+from tap_youtube_analytics.prefetch import prefetch
+from tap_youtube_analytics.report_archive import DEFAULT_CSV_DIR, ReportArchiver
+from tap_youtube_analytics.report_workers import (
+    DEFAULT_SHARD_BYTES,
+    get_report_pool,
+    read_header,
+    shard_file,
+    transform_shard,
+)
+from tap_youtube_analytics.report_transform import hash_data, normalize_datetime, transform_report_record
+from tap_youtube_analytics.writer import (
+    bare_records,
+    serialize_record,
+    state_lock,
+    write_batch,
+    write_lines,
     write_record,
     write_schema,
+    write_state,
 )
-
 from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsCircuitOpenError,
+    YoutubeAnalyticsDeadlineError,
     YoutubeAnalyticsError,
     YoutubeAnalyticsForbiddenError,
     YoutubeAnalyticsNotFoundError,
@@ -26,8 +57,50 @@ from tap_youtube_analytics.exceptions import (
 
 LOGGER = get_logger()
 ATTRIBUTION_DAYS = 7
+# Bookmark key of the position of a report stream sync that has not finished
+IN_PROGRESS_KEY = "in_progress"
+# Bookmark key of the reports that failed to download and are not resolved
+FAILED_REPORTS_KEY = "failed_reports"
+# Marks the end of a report's items in the stages of `ReportStream._sync_pipeline`
+REPORT_DONE = object()
+# Runs a report may fail to download in before it is given up on
+DEFAULT_FAILED_REPORT_ATTEMPTS = 5
+# The Reporting API documents no maximum pageSize for jobs and reports
 DEFAULT_REPORT_PAGE_SIZE = 50
 
+# Page size per endpoint label. Data API endpoints use their documented
+# maximum `maxResults`, which is also the upper bound of overrides.
+PAGE_SIZES = {
+    "channels": 50,
+    "playlists": 50,
+    "playlist_items": 50,
+    "search_videos": 50,
+    "jobs": DEFAULT_REPORT_PAGE_SIZE,
+    "reports": DEFAULT_REPORT_PAGE_SIZE,
+}
+MAX_PAGE_SIZES = {
+    "channels": 50,
+    "playlists": 50,
+    "playlist_items": 50,
+    "search_videos": 50,
+}
+
+
+def get_page_size(config: Dict, endpoint: str) -> int:
+    """Return the page size for an endpoint, honouring the `page_sizes`
+    config overrides (e.g. {"playlists": 25})."""
+    page_size = PAGE_SIZES.get(endpoint, DEFAULT_REPORT_PAGE_SIZE)
+    override = (config.get("page_sizes") or {}).get(endpoint)
+    if override:
+        page_size = int(override)
+        max_page_size = MAX_PAGE_SIZES.get(endpoint)
+        if max_page_size and page_size > max_page_size:
+            LOGGER.warning(
+                f"Page size {page_size} for {endpoint} exceeds the API maximum; using {max_page_size}"
+            )
+            page_size = max_page_size
+    return page_size
+
 
 class BaseStream(ABC):
     """A Base Class providing structure and boilerplate for generic streams
@@ -48,7 +121,11 @@ class BaseStream(ABC):
     parent = ""
     data_key = ""
     parent_bookmark_key = ""
-    _dim_lookup_map = None  # Class-level cache for dimension lookup map
+    # Data API `part`s the stream can request; `field_mask_params` picks the
+    # ones backing the fields selected in the catalog
+    api_parts = ()
+    # Top-level properties denested from a part by `transform_data_record`
+    derived_fields = {"published_at": ("snippet", "publishedAt")}
 
     def __init__(self, client=None, catalog=None) -> None:
         self.client = client
@@ -57,6 +134,8 @@ class BaseStream(ABC):
         self.metadata = metadata.to_map(catalog.metadata)
         self.child_to_sync = []
         self.params = {}
+        # endpoint label -> {"requests": count, "items": count}
+        self.page_stats = {}
 
     @property
     @abstractmethod
@@ -86,6 +165,122 @@ class BaseStream(ABC):
     def is_selected(self):
         return metadata.get(self.metadata, (), "selected")
 
+    @staticmethod
+    def parse_channel_ids(config: Dict) -> List[str]:
+        """Return the configured channel ids, deduplicated in config order."""
+        channel_ids = [cid.strip() for cid in config["channel_ids"].split(",")]
+        return list(dict.fromkeys(cid for cid in channel_ids if cid))
+
+    def is_field_selected(self, breadcrumb: Tuple) -> bool:
+        """Mirror singer.Transformer: a field is only dropped when it is
+        explicitly deselected or unsupported."""
+        inclusion = metadata.get(self.metadata, breadcrumb, "inclusion")
+        if inclusion == "automatic":
+            return True
+        selected = metadata.get(self.metadata, breadcrumb, "selected")
+        return selected is not False and inclusion != "unsupported"
+
+    def _selected_subfields(self, schema: Dict, breadcrumb: Tuple) -> Optional[List[str]]:
+        """Return the camelCase `fields` entries for the selected sub-fields
+        of an object property, or None when all of them are selected."""
+        properties = schema.get("properties")
+        if not properties:
+            return None
+
+        fields = []
+        complete = True
+        for name, sub_schema in properties.items():
+            sub_breadcrumb = breadcrumb + ("properties", name)
+            if not self.is_field_selected(sub_breadcrumb):
+                complete = False
+                continue
+
+            nested = self._selected_subfields(sub_schema, sub_breadcrumb)
+            if nested is None:
+                fields.append(humps.camelize(name))
+            else:
+                complete = False
+                if nested:
+                    fields.append(f"{humps.camelize(name)}({','.join(nested)})")
+
+        return None if complete else fields
+
+    def field_mask_params(self) -> Dict[str, str]:
+        """Build the `part` and `fields` parameters of a Data API request
+        from the fields selected in the catalog.
+
+        Key and replication fields are always requested; an unselected stream
+        (one only synced to drive its children) requests nothing else.
+        """
+        if not self.api_parts:
+            return {}
+
+        required = {*self.key_properties, *(self.replication_keys or [])}
+        stream_selected = self.is_selected()
+        # part -> list of sub-field entries, or None for the whole part
+        parts: Dict[str, Optional[List[str]]] = {"id": None}
+
+        for name, prop_schema in self.schema.get("properties", {}).items():
+            if name in ("kind", "etag", "id"):
+                continue
+
+            breadcrumb = ("properties", name)
+            if name not in required and not (stream_selected and self.is_field_selected(breadcrumb)):
+                continue
+
+            if name in self.derived_fields:
+                part, subfields = self.derived_fields[name][0], [self.derived_fields[name][1]]
+            else:
+                part, subfields = humps.camelize(name), self._selected_subfields(prop_schema, breadcrumb)
+                if part not in self.api_parts or subfields == []:
+                    continue
+
+            if part in parts and parts[part] is None:
+                continue
+            if subfields is None:
+                parts[part] = None
+            else:
+                merged = parts.setdefault(part, [])
+                merged.extend(field for field in subfields if field not in merged)
+
+        ordered_parts = [part for part in self.api_parts if part in parts]
+        item_fields = ["kind", "etag", "id"] + [
+            part if parts[part] is None else f"{part}({','.join(parts[part])})"
+            for part in ordered_parts if part != "id"
+        ]
+        return {
+            "part": ",".join(ordered_parts),
+            "fields": f"etag,nextPageToken,pageInfo,items({','.join(item_fields)})",
+        }
+
+    def get_page_size(self, endpoint: str = None) -> int:
+        """Page size of the stream's endpoint, or of the given one."""
+        return get_page_size(self.client.config, endpoint or self.endpoint)
+
+    def record_page(self, endpoint: str, items: int) -> None:
+        """Account for one request to an endpoint and the items it returned."""
+        stats = self.page_stats.setdefault(endpoint, {"requests": 0, "items": 0})
+        stats["requests"] += 1
+        stats["items"] += items
+
+    def log_page_stats(self) -> None:
+        """Emit the request count and items per page of every endpoint used
+        by the stream and its children."""
+        for endpoint, stats in self.page_stats.items():
+            tags = {"stream": self.tap_stream_id, metrics.Tag.endpoint: endpoint}
+            metrics.log(LOGGER, metrics.Point("counter", "request_count", stats["requests"], tags))
+            metrics.log(LOGGER, metrics.Point(
+                "gauge", "items_per_page", round(stats["items"] / stats["requests"], 2), tags
+            ))
+        for child in self.child_to_sync:
+            child.log_page_stats()
+
+    def is_unchanged(self, record: Dict) -> bool:
+        """True if the entity store is set to skip unchanged resources and
+        the raw API record kept its etag since the previous run."""
+        store = self.client.entity_store
+        return store is not None and store.mode == "skip" and store.is_unchanged(record)
+
     @abstractmethod
     def sync(
         self,
@@ -107,34 +302,88 @@ class BaseStream(ABC):
          - https://github.com/singer-io/getting-started/blob/master/docs/SYNC_MODE.md
         """
 
+    def _fetch_pages(
+        self,
+        url: str,
+        params: Dict,
+        endpoint: str,
+        path: str = None,
+        paginate: bool = True,
+    ) -> Iterator[Dict]:
+        """Request the pages of a listing one after another, following
+        `nextPageToken`."""
+        params = dict(params)
+        request_kwargs = {"path": path} if path else {}
+        while True:
+            self.client.deadline.check("page")
+            response = self.client.get(url=url, params=params, endpoint=endpoint, **request_kwargs)
+            yield response
+
+            page_token = (response or {}).get(self.next_page_key)
+            if not paginate or not page_token:
+                return
+            params = {**params, "pageToken": page_token}
+
+    async def _afetch_pages(
+        self,
+        client,
+        url: str,
+        params: Dict,
+        endpoint: str,
+        path: str = None,
+        paginate: bool = True,
+    ) -> AsyncIterator[Dict]:
+        """`_fetch_pages` on the `AsyncClient` of the async engine."""
+        params = dict(params)
+        request_kwargs = {"path": path} if path else {}
+        while True:
+            self.client.deadline.check("page")
+            response = await client.get(url=url, params=params, endpoint=endpoint, **request_kwargs)
+            yield response
+
+            page_token = (response or {}).get(self.next_page_key)
+            if not paginate or not page_token:
+                return
+            params = {**params, "pageToken": page_token}
+
+    def iter_pages(
+        self,
+        url: str,
+        params: Dict,
+        endpoint: str,
+        path: str = None,
+        paginate: bool = True,
+    ) -> Iterator[Dict]:
+        """Yield the responses of a listing. With the `prefetch_pages`
+        config set, the next page is requested in the background while the
+        current one is processed; with the `async` engine, pages are
+        requested on its event loop."""
+        if is_async_engine(self.client.config):
+            return get_async_engine(self.client).iterate(
+                lambda client: self._afetch_pages(client, url, params, endpoint, path=path, paginate=paginate)
+            )
+        return prefetch(
+            self._fetch_pages(url, params, endpoint, path=path, paginate=paginate),
+            self.client.config.get("prefetch_pages") or 0,
+        )
+
     def get_records(self, isreport=False) -> List:
         """Interacts with api client interaction and pagination."""
         total_count = 0
         page = 1
-        is_next_page = True
-        page_token = ""
         consecutive_empty_pages = 0
         max_empty_pages = 3  # Prevent infinite loops
 
-        while is_next_page:
-            if page > 1:
-                self.params["pageToken"] = page_token
+        if isreport:
+            url = self.client.reporting_url
+            # YouTube Analytics API doesn't use data_key, data is in 'rows'
+            data_key = "rows"
+        else:
+            url = self.client.base_url
+            data_key = self.data_key
 
-            if isreport:
-                url = self.client.reporting_url
-                # YouTube Analytics API doesn't use data_key, data is in 'rows'
-                data_key = "rows"
-            else:
-                url = self.client.base_url
-                data_key = self.data_key
-
-            response = {}
-            response = self.client.get(
-                url=url,
-                path=self.path,
-                params=self.params,
-                endpoint=self.url_endpoint
-            )
+        # YouTube Analytics API doesn't support pagination like YouTube Data API
+        for response in self.iter_pages(url, self.params, self.url_endpoint, path=self.path, paginate=not isreport):
             if not response or response is None or response == {}:
                 LOGGER.info("Data not found for endpoint: %s", self.url_endpoint)
                 break
@@ -160,6 +409,7 @@ class BaseStream(ABC):
                 results = response.get(data_key, [])
 
             results_count = len(results)
+            self.record_page(self.endpoint, results_count)
             from_count = total_count + 1
             total_count = total_count + results_count
             to_count = total_count
@@ -179,14 +429,6 @@ class BaseStream(ABC):
                     continue
                 yield result
 
-            # YouTube Analytics API doesn't support pagination like YouTube Data API
-            if isreport:
-                is_next_page = False
-            else:
-                # Pagination: increment the offset by the limit (batch-size)
-                page_token = response.get("nextPageToken")
-                if page_token is None:
-                    is_next_page = False
             page += 1
 
     def write_schema(self) -> None:
@@ -226,67 +468,11 @@ class BaseStream(ABC):
     def hash_data(self, data):
         """Create MD5 hash key for data element
         Prepare the project id hash"""
-        hash_id = hashlib.md5()
-        hash_id.update(repr(data).encode('utf-8'))
-
-        return hash_id.hexdigest()
+        return hash_data(data)
 
-    def _load_dim_lookup_map(self):
-        """Load and cache the dimension lookup map"""
-        if BaseStream._dim_lookup_map is None:
-            map_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'dim_lookup_map.json')
-            try:
-                if os.path.exists(map_path):
-                    with open(map_path) as file:
-                        BaseStream._dim_lookup_map = json.load(file)
-                        LOGGER.info("Loaded dimension lookup map from file")
-                else:
-                    LOGGER.warning(f"Dimension lookup map file not found at {map_path}, using empty map")
-                    BaseStream._dim_lookup_map = {}
-            except (IOError, json.JSONDecodeError) as e:
-                LOGGER.error(f"Failed to load dimension lookup map: {e}")
-                BaseStream._dim_lookup_map = {}
-        return BaseStream._dim_lookup_map
-
-    # dim_lookup_map.json: code to description mapping dictionary for each dimension
-    # Created from Dimensions lookup tables here:
-    #   https://developers.google.com/youtube/reporting/v1/reports/dimensions#Annotation_Dimensions
-    # Google Sheet for creating/maintaining dim_lookup_map.json:
-    #   https://docs.google.com/spreadsheets/d/1qR1kCiqwcvkZL4z9e0hxWa1kokesCSRv4LLyPmnnuUI/edit?usp=sharing
     def transform_report_record(self, record, dimensions, report):
         """Transform report records"""
-
-        new_record = record.copy()
-        dim_lookup_map = self._load_dim_lookup_map()
-
-        dimension_values = {}
-
-        for key, val in list(record.items()):
-            # Add dimension key-val to dimension_values dictionary
-            if key in dimensions:
-                dimension_values[key] = val
-
-            # Transform dim values from codes to names using dim_lookup_map
-            if key in dim_lookup_map:
-                # lookup new_val, with a default for existing val (if not found)
-                new_val = dim_lookup_map[key].get(val, val)
-                if val == new_val:
-                    LOGGER.warning(f"dim_lookup_map value not found; key: {key}, value: {val}")
-                new_record[key] = new_val
-            else:
-                new_record[key] = val
-
-        # Add report fields to data
-        new_record['report_id'] = report.get('id')
-        new_record['report_type_id'] = report.get('reportTypeId')
-        new_record['report_name'] = report.get('name')
-        new_record['create_time'] = report.get('createTime')
-
-        # Create unique md5 hash key for dimension_values
-        dims_md5 = str(self.hash_data(json.dumps(dimension_values, sort_keys=True)))
-        new_record['dimensions_hash_key'] = dims_md5
-
-        return new_record
+        return transform_report_record(record, dimensions, report)
 
     def append_times_to_dates(self, record: Dict) -> None:
         """Append time portion to date-only fields to ensure proper datetime format.
@@ -337,12 +523,13 @@ class IncrementalStream(BaseStream):
             return state
 
         bookmark_key = key or self.replication_keys[0]
-        self._migrate_legacy_bookmark(state, stream, bookmark_key)
-        current_bookmark = get_bookmark(state, stream, bookmark_key, self.client.config["start_date"])
-        value = max(current_bookmark, value)
-        return write_bookmark(
-            state, stream, bookmark_key, value
-        )
+        with state_lock:
+            self._migrate_legacy_bookmark(state, stream, bookmark_key)
+            current_bookmark = get_bookmark(state, stream, bookmark_key, self.client.config["start_date"])
+            value = max(current_bookmark, value)
+            return write_bookmark(
+                state, stream, bookmark_key, value
+            )
 
     def _migrate_legacy_bookmark(self, state: dict, stream: str, key: Any) -> None:
         """Upgrade legacy flat bookmarks to the nested structure expected by Singer."""
@@ -381,7 +568,7 @@ class IncrementalStream(BaseStream):
 
                 record_timestamp = transformed_record[self.replication_keys[0]]
                 if record_timestamp >= bookmark_date:
-                    if self.is_selected():
+                    if self.is_selected() and not self.is_unchanged(record):
                         write_record(self.tap_stream_id, transformed_record)
                         counter.increment()
 
@@ -413,12 +600,15 @@ class FullTableStream(BaseStream):
         """Abstract implementation for `type: Fulltable` stream."""
         self.url_endpoint = self.get_url_endpoint(parent_obj)
         self.update_params()
+        if is_pipeline_enabled(self.client.config):
+            return self._sync_pipeline(state, transformer)
+
         with metrics.record_counter(self.tap_stream_id) as counter:
             for record in self.get_records():
                 transformed_record = transformer.transform(
                     self.transform_data_record(record), self.schema, self.metadata
                 )
-                if self.is_selected():
+                if self.is_selected() and not self.is_unchanged(record):
                     write_record(self.tap_stream_id, transformed_record)
                     counter.increment()
 
@@ -427,27 +617,61 @@ class FullTableStream(BaseStream):
 
             return counter.value
 
+    def _sync_pipeline(self, state: Dict, transformer: Transformer) -> int:
+        """`sync` as a fetch -> transform -> serialize -> write pipeline."""
+        with metrics.record_counter(self.tap_stream_id) as counter, Transformer() as stage_transformer:
+            def transform(record: Dict) -> Tuple[Dict, Dict]:
+                return record, stage_transformer.transform(
+                    self.transform_data_record(record), self.schema, self.metadata
+                )
+
+            def serialize(item: Tuple[Dict, Dict]) -> Tuple[Dict, str]:
+                record, transformed_record = item
+                return record, serialize_record(self.tap_stream_id, transformed_record)
+
+            def write(item: Tuple[Dict, str]) -> None:
+                record, line = item
+                if self.is_selected() and not self.is_unchanged(record):
+                    write_lines(self.tap_stream_id, [line])
+                    counter.increment()
+
+                for child in self.child_to_sync:
+                    child.sync(state=state, transformer=transformer, parent_obj=record)
+
+            Pipeline(self.tap_stream_id, self.client.config.get("pipeline_queue_depths")).run(
+                self.get_records(), [("transform", transform), ("serialize", serialize)], write
+            )
+            return counter.value
+
 
 class ReportStream(IncrementalStream):
+    # (create time, report id) of the last report an interrupted sync completed
+    resume_after: Optional[Tuple[str, str]] = None
+    # Position in the report an interrupted sync was emitting
+    resume_partial: Optional[Dict] = None
+    # Position of the last row yielded by `_download_reports`
+    row_position: Optional[Dict] = None
+    effective_start: Optional[str] = None
+    # Reports that failed to download, by id: retried after the others, and
+    # recorded in the bookmark until they are emitted (see `_defer_report`)
+    failed_reports: Optional[Dict[str, Dict]] = None
+    # Ids of the reports charged a failed attempt in this run
+    _charged_reports: Optional[Set[str]] = None
+    # Set when the run deadline stopped the sync before its last report
+    stopped_at_deadline = False
+    _checkpoint_time = 0.0
+    _checkpoint_rows = 0
+
     def get_url_endpoint(self, parent_obj: Dict = None) -> str:
         return self.client.reporting_url
 
-    @staticmethod
-    def _normalize_datetime(value: str) -> str:
-        """Ensure datetime strings include a time component and timezone."""
-        if not value:
-            return value
-        if len(value) == 10 and "T" not in value:
-            value = f"{value}T00:00:00Z"
-        if "T" in value and not value.endswith("Z") and "+" not in value:
-            value = f"{value}Z"
-        return value
+    _normalize_datetime = staticmethod(normalize_datetime)
 
     def update_params(self, **kwargs) -> None:
         """Update params for YouTube Reporting API requests"""
         super().update_params(**kwargs)
 
-        params: Dict[str, Any] = {"pageSize": DEFAULT_REPORT_PAGE_SIZE}
+        params: Dict[str, Any] = {"pageSize": self.get_page_size("reports")}
 
         if hasattr(self, "report_type"):
             params["reportTypeId"] = self.report_type
@@ -473,146 +697,22 @@ class ReportStream(IncrementalStream):
             return super().get_records(isreport)
 
         # YouTube Reporting API workflow
-        # Step 1: List existing jobs for this report type
-        jobs_url = f"{self.client.reporting_url}/jobs"
-        jobs_params = {
-            "includeSystemManaged": "true",
-            "pageSize": DEFAULT_REPORT_PAGE_SIZE,
-        }
-
         try:
-            target_job = None
-            page_token = None
-            while True:
-                if page_token:
-                    jobs_params['pageToken'] = page_token
-
-                jobs_response = self.client.get(
-                    url=jobs_url,
-                    params=jobs_params,
-                    endpoint=f"{self.client.reporting_url}/jobs"
-                )
-
-                if not jobs_response:
-                    LOGGER.info(
-                        "No jobs found for report type: %s",
-                        getattr(self, 'report_type', 'unknown')
-                    )
-                    break
-
-                jobs = jobs_response.get('jobs', [])
-
-                for job in jobs:
-                    if job.get('reportTypeId') == getattr(self, 'report_type', None):
-                        target_job = job
-                        break
-
-                if target_job or 'nextPageToken' not in jobs_response:
-                    break
-
-                page_token = jobs_response.get('nextPageToken')
-
-            if not target_job and hasattr(self, 'report_type'):
-                report_type = getattr(self, 'report_type', None)
-                LOGGER.info(
-                    "No existing job for report type %s. Attempting to create new job.",
-                    report_type,
-                )
-                create_payload = {
-                    'name': self.tap_stream_id,
-                    'reportTypeId': report_type,
-                }
-                try:
-                    target_job = self.client.post(
-                        url=self.client.reporting_url,
-                        path='jobs',
-                        data=create_payload,
-                        endpoint='job_create'
-                    ) or {}
-                except YoutubeAnalyticsNotFoundError:
-                    # The YouTube Reporting API returns 404 when you attempt to
-                    # create a user-owned job for a system-managed report type
-                    # (e.g. content_owner_* types that YouTube manages on your
-                    # behalf). These types are already exposed through the jobs
-                    # list with includeSystemManaged=true, so if no match was
-                    # found above the type simply isn't available for this
-                    # account. Log and re-raise to halt the sync.
-                    LOGGER.warning(
-                        "Cannot create a reporting job for report type %s "
-                        "(system-managed types cannot have user-owned jobs; "
-                        "verify the report type is available for this account). "
-                        "Failing stream %s.",
-                        report_type,
-                        self.tap_stream_id,
-                    )
-                    raise
-
-            if not target_job:
-                LOGGER.info(
-                    "Unable to find or create reporting job for stream %s", self.tap_stream_id
-                )
-                return
-
-            job_id = target_job.get('id')
+            # Step 1: Find or create the job for this report type
+            job_id = self._find_job_id()
             if not job_id:
-                LOGGER.error("Job found but no job ID available")
                 return
 
             # Step 2: Get reports for this job
-            reports_url = f"{self.client.reporting_url}/jobs/{job_id}/reports"
-            reports_params = {"pageSize": DEFAULT_REPORT_PAGE_SIZE}
-
-            if 'createdAfter' in self.params:
-                reports_params['createdAfter'] = self.params['createdAfter']
-            if 'startTimeAtOrAfter' in self.params:
-                reports_params['startTimeAtOrAfter'] = self.params['startTimeAtOrAfter']
-            if 'startTimeBefore' in self.params:
-                reports_params['startTimeBefore'] = self.params['startTimeBefore']
-
-            page_token = None
-            while True:
-                if page_token:
-                    reports_params['pageToken'] = page_token
-
-                reports_response = self.client.get(
-                    url=reports_url,
-                    params=reports_params,
-                    endpoint=f"{self.client.reporting_url}/jobs/{job_id}/reports"
-                )
-
-                if not reports_response:
-                    LOGGER.info(f"No reports found for job: {job_id}")
-                    break
-
-                reports = reports_response.get('reports', [])
-                LOGGER.info(f"Found {len(reports)} reports for job {job_id}")
-
-                for report in reports:
-                    download_url = report.get('downloadUrl')
-                    if not download_url:
-                        LOGGER.warning(f"Report {report.get('id')} has no download URL")
-                        continue
-
-                    LOGGER.info(f"Downloading report {report.get('id')} from {download_url}")
-
-                    try:
-                        row_count = 0
-                        for record in self.client.get_report(url=download_url, endpoint=download_url):
-                            row_count += 1
-                            yield (record, report)
-
-                        if row_count == 0:
-                            LOGGER.info(f"Report {report.get('id')} returned empty data")
-                        else:
-                            LOGGER.info(f"Processed {row_count} rows from report {report.get('id')}")
-
-                    except Exception as e:
-                        LOGGER.error(f"Error downloading/parsing report {report.get('id')}: {e}")
-                        continue
-                page_token = reports_response.get('nextPageToken')
-                if not page_token:
-                    break
+            reports = self._iter_reports(job_id)
+            # Step 3: Download the reports
+            if is_async_engine(self.client.config):
+                yield from self._download_reports_async(list(reports))
+            else:
+                yield from self._download_reports(reports)
 
+        except YoutubeAnalyticsDeadlineError:
+            raise
         except YoutubeAnalyticsForbiddenError as err:
             LOGGER.error(
                 "YouTube Reporting API workflow failed with permission error: %s",
@@ -632,12 +732,746 @@ class ReportStream(IncrementalStream):
             )
             raise
 
-    def sync(
+    def _find_job_id(self, create: bool = True) -> Optional[str]:
+        """Return the id of the reporting job of the stream's report type,
+        creating the job when none exists yet and `create` is set."""
+        # List existing jobs for this report type
+        jobs_url = f"{self.client.reporting_url}/jobs"
+        jobs_params = {
+            "includeSystemManaged": "true",
+            "pageSize": self.get_page_size("jobs"),
+        }
+
+        target_job = None
+        for jobs_response in self.iter_pages(jobs_url, jobs_params, f"{self.client.reporting_url}/jobs"):
+            if not jobs_response:
+                LOGGER.info(
+                    "No jobs found for report type: %s",
+                    getattr(self, 'report_type', 'unknown')
+                )
+                break
+
+            jobs = jobs_response.get('jobs', [])
+            self.record_page("jobs", len(jobs))
+
+            for job in jobs:
+                if job.get('reportTypeId') == getattr(self, 'report_type', None):
+                    target_job = job
+                    break
+
+            if target_job:
+                break
+
+        if not target_job and create and hasattr(self, 'report_type'):
+            report_type = getattr(self, 'report_type', None)
+            LOGGER.info(
+                "No existing job for report type %s. Attempting to create new job.",
+                report_type,
+            )
+            create_payload = {
+                'name': self.tap_stream_id,
+                'reportTypeId': report_type,
+            }
+            try:
+                target_job = self.client.post(
+                    url=self.client.reporting_url,
+                    path='jobs',
+                    data=create_payload,
+                    endpoint='job_create'
+                ) or {}
+                self.record_page("job_create", 1)
+            except YoutubeAnalyticsNotFoundError:
+                # The YouTube Reporting API returns 404 when you attempt to
+                # create a user-owned job for a system-managed report type
+                # (e.g. content_owner_* types that YouTube manages on your
+                # behalf). These types are already exposed through the jobs
+                # list with includeSystemManaged=true, so if no match was
+                # found above the type simply isn't available for this
+                # account. Log and re-raise to halt the sync.
+                LOGGER.warning(
+                    "Cannot create a reporting job for report type %s "
+                    "(system-managed types cannot have user-owned jobs; "
+                    "verify the report type is available for this account). "
+                    "Failing stream %s.",
+                    report_type,
+                    self.tap_stream_id,
+                )
+                raise
+
+        if not target_job:
+            LOGGER.info(
+                "Unable to find or create reporting job for stream %s", self.tap_stream_id
+            )
+            return None
+
+        job_id = target_job.get('id')
+        if not job_id:
+            LOGGER.error("Job found but no job ID available")
+            return None
+        return job_id
+
+    def _iter_reports(self, job_id: str) -> Iterator[Dict]:
+        """Yield the reports of a job created in the sync window, oldest
+        first, after the last report completed by an interrupted sync."""
+        reports_url = f"{self.client.reporting_url}/jobs/{job_id}/reports"
+        reports_params = {"pageSize": self.get_page_size("reports")}
+
+        if 'createdAfter' in self.params:
+            reports_params['createdAfter'] = self.params['createdAfter']
+        if 'startTimeAtOrAfter' in self.params:
+            reports_params['startTimeAtOrAfter'] = self.params['startTimeAtOrAfter']
+        if 'startTimeBefore' in self.params:
+            reports_params['startTimeBefore'] = self.params['startTimeBefore']
+
+        reports_endpoint = f"{self.client.reporting_url}/jobs/{job_id}/reports"
+        job_reports = []
+        for reports_response in self.iter_pages(reports_url, reports_params, reports_endpoint):
+            if not reports_response:
+                LOGGER.info(f"No reports found for job: {job_id}")
+                break
+
+            reports = reports_response.get('reports', [])
+            self.record_page("reports", len(reports))
+            LOGGER.info(f"Found {len(reports)} reports for job {job_id}")
+
+            for report in reports:
+                if not report.get('downloadUrl'):
+                    LOGGER.warning(f"Report {report.get('id')} has no download URL")
+                    continue
+                job_reports.append(report)
+
+        # A checkpoint after a report then covers every report before it
+        job_reports.sort(key=self._report_position)
+        for report in job_reports:
+            if self.resume_after and self._report_position(report) <= self.resume_after:
+                continue
+            if self._stop_at_deadline():
+                return
+            yield report
+
+        yield from self._iter_failed_reports()
+
+    def _iter_failed_reports(self) -> Iterator[Dict]:
+        """Yield the reports that failed to download, in this run or an
+        earlier one, once more, oldest first and on new connections."""
+        with state_lock:
+            failed = sorted(
+                (self.failed_reports or {}).values(), key=lambda entry: (entry["create_time"] or "", entry["report_id"])
+            )
+        if failed:
+            LOGGER.info(f"Retrying {len(failed)} reports of stream {self.tap_stream_id} that failed to download")
+        for entry in failed:
+            if entry["report_id"] not in self.failed_reports:
+                # Emitted since, e.g. listed again in the sync window
+                continue
+            if self._stop_at_deadline():
+                return
+            self.client.reset_connections(entry["download_url"])
+            yield {"id": entry["report_id"], "createTime": entry["create_time"], "downloadUrl": entry["download_url"]}
+
+    def _stop_at_deadline(self) -> bool:
+        """True when the run deadline passed: no more reports are started,
+        and the sync keeps its `in_progress` marker to resume from."""
+        if self.client.deadline.stop_before("report"):
+            self.stopped_at_deadline = True
+        return self.stopped_at_deadline
+
+    def _defer_report(self, report: Dict, error: Exception) -> None:
+        """Queue a report that failed to download for a retry at the end of
+        the stream; it is recorded in the bookmark, which stays before it,
+        until it fails in `failed_report_attempts` runs (see
+        `_give_up_failed_reports`). A report failing again in the same run,
+        e.g. on its retry, is charged one attempt.
+
+        Takes `state_lock`: with the pipeline, reports are deferred on the
+        fetch thread while the writer copies them to the bookmark."""
+        report_id = str(report.get("id"))
+        with state_lock:
+            if self.failed_reports is None:
+                self.failed_reports = {}
+            if self._charged_reports is None:
+                self._charged_reports = set()
+            entry = self.failed_reports.get(report_id) or {
+                "report_id": report_id,
+                "create_time": self._report_position(report)[0] or None,
+                "download_url": report.get("downloadUrl"),
+                "attempts": 0,
+            }
+            if report_id not in self._charged_reports:
+                self._charged_reports.add(report_id)
+                entry["attempts"] += 1
+            entry["error"] = str(error)
+            LOGGER.warning(f"Deferring report {report_id} (failed in {entry['attempts']} runs): {error}")
+            self.failed_reports[report_id] = entry
+
+    def _give_up_failed_reports(self) -> None:
+        """Drop the reports that failed, retry included, in
+        `failed_report_attempts` runs; call once every report of the run
+        was tried."""
+        max_attempts = int(self.client.config.get("failed_report_attempts") or DEFAULT_FAILED_REPORT_ATTEMPTS)
+        with state_lock:
+            for report_id, entry in list((self.failed_reports or {}).items()):
+                if entry["attempts"] >= max_attempts:
+                    LOGGER.error(
+                        f"Giving up on report {report_id} after failing in {max_attempts} runs: {entry['error']}"
+                    )
+                    del self.failed_reports[report_id]
+
+    def _resolve_report(self, report: Dict) -> None:
+        with state_lock:
+            resolved = self.failed_reports and self.failed_reports.pop(str(report.get("id")), None) is not None
+        if resolved:
+            LOGGER.info(f"Report {report.get('id')} downloaded after an earlier failure")
+
+    def _bookmark_value(self, current_max_dttm: datetime) -> str:
+        """The bookmark, held before the oldest report that failed to
+        download, so the sync window of the next run still lists it."""
+        create_times = [entry["create_time"] for entry in (self.failed_reports or {}).values() if entry["create_time"]]
+        if create_times:
+            oldest = utils.strptime_to_utc(min(create_times)) - timedelta(seconds=1)
+            current_max_dttm = min(current_max_dttm, oldest)
+        return utils.strftime(current_max_dttm)
+
+    def _record_failed_reports(self, state: Dict) -> None:
+        """Copy the failed reports to the bookmark; call under `state_lock`."""
+        bookmark = state.setdefault("bookmarks", {}).setdefault(self.tap_stream_id, {})
+        if self.failed_reports:
+            bookmark[FAILED_REPORTS_KEY] = sorted(self.failed_reports.values(), key=lambda entry: entry["report_id"])
+        else:
+            bookmark.pop(FAILED_REPORTS_KEY, None)
+
+    def _report_position(self, report: Dict) -> Tuple[str, str]:
+        """Sort key of a report: its create time, then its id."""
+        create_time = report.get("createTime")
+        if create_time:
+            create_time = utils.strftime(utils.strptime_to_utc(self._normalize_datetime(create_time)))
+        return create_time or "", str(report.get("id") or "")
+
+    def _log_report_rows(self, report: Dict, row_count: int) -> None:
+        self.record_page("report_download", row_count)
+        if row_count == 0:
+            LOGGER.info(f"Report {report.get('id')} returned empty data")
+        else:
+            LOGGER.info(f"Processed {row_count} rows from report {report.get('id')}")
+
+    def _download_reports(self, reports: Iterator[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+        """Download reports one after another, yielding (row, report)."""
+        for report in reports:
+            download_url = report['downloadUrl']
+            LOGGER.info(f"Downloading report {report.get('id')} from {download_url}")
+
+            try:
+                row_count = 0
+                if self.client.config.get("report_resume_rows"):
+                    position = None
+                    if self.resume_partial and self.resume_partial.get("report_id") == report.get("id"):
+                        position = {
+                            "rows": self.resume_partial.get("rows_emitted") or 0,
+                            "offset": self.resume_partial.get("offset"),
+                            "header": self.resume_partial.get("header"),
+                        }
+                        LOGGER.info(f"Resuming report {report.get('id')} after row {position['rows']}")
+                    for record, self.row_position in self.client.get_report_from(
+                        download_url, position, endpoint=download_url
+                    ):
+                        row_count += 1
+                        yield (record, report)
+                else:
+                    for record in self.client.get_report(url=download_url, endpoint=download_url):
+                        row_count += 1
+                        yield (record, report)
+
+                self._log_report_rows(report, row_count)
+                self._resolve_report(report)
+
+            except YoutubeAnalyticsCircuitOpenError:
+                # The download host is down: stop rather than skip every report
+                raise
+            except Exception as e:
+                LOGGER.error(f"Error downloading/parsing report {report.get('id')}: {e}")
+                self._defer_report(report, e)
+                continue
+
+    def _download_reports_async(self, reports: List[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+        """Download reports concurrently on the async engine, yielding
+        (row, report) in report order."""
+        engine = get_async_engine(self.client)
+        # One downloaded report waits for the output; `_adownload_reports`
+        # bounds the ones downloaded ahead of it
+        downloads = engine.iterate(lambda client: self._adownload_reports(client, reports), buffer_size=1)
+        for report, rows in downloads:
+            if isinstance(rows, Exception):
+                self._defer_report(report, rows)
+                continue
+            for record in rows:
+                yield (record, report)
+            self._log_report_rows(report, len(rows))
+            self._resolve_report(report)
+
+    async def _adownload_reports(self, client, reports: List[Dict]) -> AsyncIterator[Tuple[Dict, Any]]:
+        """Yield (report, rows, or the error of a failed download) in report
+        order. Up to `async_reports_ahead` downloads (at most
+        `async_max_in_flight`) run ahead of the consumer, and none starts
+        while the finished ones waiting hold `async_buffer_rows` rows.
+        `reports` is listed in full before the first download, so the run
+        deadline is checked again before each one starts."""
+        async def download(report: Dict) -> Any:
+            LOGGER.info(f"Downloading report {report.get('id')} from {report['downloadUrl']}")
+            try:
+                return await client.get_report(report['downloadUrl'], endpoint=report['downloadUrl'])
+            except Exception as e:  # pylint: disable=broad-except
+                LOGGER.error(f"Error downloading/parsing report {report.get('id')}: {e}")
+                return e
+
+        config = self.client.config
+        reports_ahead = min(int(config.get("async_reports_ahead") or DEFAULT_REPORTS_AHEAD), client.max_in_flight)
+        buffer_rows = int(config.get("async_buffer_rows") or DEFAULT_BUFFER_ROWS)
+
+        def rows_waiting() -> int:
+            return sum(
+                len(task.result()) for _, task in pending
+                if task.done() and not task.cancelled() and isinstance(task.result(), list)
+            )
+
+        pending = deque()
+        try:
+            for report in reports:
+                while pending and (len(pending) >= reports_ahead or rows_waiting() >= buffer_rows):
+                    report_ahead, task = pending.popleft()
+                    yield report_ahead, await task
+                if self._stop_at_deadline():
+                    break
+                pending.append((report, asyncio.ensure_future(download(report))))
+            while pending:
+                report, task = pending.popleft()
+                yield report, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def _transform_report_item(
+        self,
+        item,
+        transformer: Transformer,
+        effective_start_dttm: datetime,
+    ) -> Optional[Tuple[Dict, Dict, Optional[datetime]]]:
+        """Transform a (row, report) item of `get_records`; None for rows
+        before the sync window."""
+        if not item:
+            return None
+
+        # Support either (row, report) tuples or just row dicts
+        if isinstance(item, tuple) and len(item) == 2:
+            record, report = item
+        else:
+            record, report = item, {}
+
+        dims = getattr(self, "dimensions", [])
+
+        transformed_record = transformer.transform(
+            self.transform_report_record(record, dims, report),
+            self.schema,
+            self.metadata
+        )
+
+        record_time_raw = transformed_record.get(self.replication_keys[0])
+        record_dttm = None
+        if record_time_raw:
+            try:
+                normalized_time = self._normalize_datetime(record_time_raw)
+                record_dttm = utils.strptime_to_utc(normalized_time)
+            except Exception as err:
+                LOGGER.warning(
+                    "Failed to parse record timestamp %s for stream %s: %s",
+                    record_time_raw,
+                    self.tap_stream_id,
+                    err,
+                )
+
+        if record_dttm and record_dttm < effective_start_dttm:
+            return None
+        return record, transformed_record, record_dttm
+
+    def _sync_records(
         self,
         state: Dict,
         transformer: Transformer,
-        parent_obj: Dict = None,
-    ) -> Dict:
+        effective_start_dttm: datetime,
+        current_max_dttm: datetime,
+        counter,
+    ) -> datetime:
+        """Emit the report rows as RECORD messages, with a checkpoint after
+        each report and, with `report_resume_rows`, every that many rows of
+        a report."""
+        resume_rows = int(self.client.config.get("report_resume_rows") or 0)
+        report_in_progress, report_rows = None, 0
+        for item in self.get_records(isreport=True):
+            report = item[1] if isinstance(item, tuple) and len(item) == 2 else None
+            if report is not report_in_progress:
+                if report_in_progress is not None:
+                    self._write_report_checkpoint(state, current_max_dttm, report_in_progress, report_rows)
+                report_in_progress, report_rows = report, 0
+            report_rows += 1
+
+            result = self._transform_report_item(item, transformer, effective_start_dttm)
+            if result is not None:
+                record, transformed_record, record_dttm = result
+                if record_dttm and record_dttm > current_max_dttm:
+                    current_max_dttm = record_dttm
+
+                if self.is_selected():
+                    write_record(self.tap_stream_id, transformed_record)
+                    counter.increment()
+
+                for child in self.child_to_sync:
+                    child.sync(state=state, transformer=transformer, parent_obj=record)
+
+            if resume_rows and report is not None and self.row_position and report_rows % resume_rows == 0:
+                self._write_partial_checkpoint(state, report, self.row_position)
+
+        if report_in_progress is not None:
+            self._write_report_checkpoint(state, current_max_dttm, report_in_progress, report_rows)
+        return current_max_dttm
+
+    def _sync_pipeline(
+        self,
+        state: Dict,
+        transformer: Transformer,
+        effective_start_dttm: datetime,
+        current_max_dttm: datetime,
+        counter,
+    ) -> datetime:
+        """Sync the report rows through a fetch -> transform -> serialize ->
+        write pipeline. Fetch covers the download and CSV parsing done by
+        the client; the write step checkpoints after each report."""
+        max_dttm = [current_max_dttm]
+
+        def fetch() -> Iterator:
+            """The (row, report) items, each report followed by a
+            `(REPORT_DONE, report, rows)` marker that every stage passes
+            on, so a report is checkpointed even when no row of it is
+            written."""
+            report_in_progress, report_rows = None, 0
+            for item in self.get_records(isreport=True):
+                report = item[1] if isinstance(item, tuple) and len(item) == 2 else None
+                if report is not report_in_progress:
+                    if report_in_progress is not None:
+                        yield REPORT_DONE, report_in_progress, report_rows
+                    report_in_progress, report_rows = report, 0
+                report_rows += 1
+                yield item
+            if report_in_progress is not None:
+                yield REPORT_DONE, report_in_progress, report_rows
+
+        def is_report_done(item) -> bool:
+            return isinstance(item, tuple) and item[0] is REPORT_DONE
+
+        with Transformer() as stage_transformer:
+            def transform(item) -> Optional[Tuple[Optional[Dict], Tuple[Dict, Dict, Optional[datetime]]]]:
+                if is_report_done(item):
+                    return item
+                result = self._transform_report_item(item, stage_transformer, effective_start_dttm)
+                if result is None:
+                    return None
+                report = item[1] if isinstance(item, tuple) and len(item) == 2 else None
+                return report, result
+
+            def serialize(item) -> Tuple[Optional[Dict], Dict, str, Optional[datetime]]:
+                if is_report_done(item):
+                    return item
+                report, (record, transformed_record, record_dttm) = item
+                return report, record, serialize_record(self.tap_stream_id, transformed_record), record_dttm
+
+            def write(item: Tuple[Optional[Dict], Dict, str, Optional[datetime]]) -> None:
+                if is_report_done(item):
+                    _, report, report_rows = item
+                    self._write_report_checkpoint(state, max_dttm[0], report, report_rows)
+                    return
+                _, record, line, record_dttm = item
+                if record_dttm and record_dttm > max_dttm[0]:
+                    max_dttm[0] = record_dttm
+
+                if self.is_selected():
+                    write_lines(self.tap_stream_id, [line])
+                    counter.increment()
+
+                for child in self.child_to_sync:
+                    child.sync(state=state, transformer=transformer, parent_obj=record)
+
+            Pipeline(self.tap_stream_id, self.client.config.get("pipeline_queue_depths")).run(
+                fetch(), [("transform", transform), ("serialize", serialize)], write
+            )
+        return max_dttm[0]
+
+    def _sync_with_report_workers(
+        self,
+        state: Dict,
+        workers: int,
+        effective_start_dttm: datetime,
+        current_max_dttm: datetime,
+        counter,
+    ) -> datetime:
+        """Sync the reports with CSV parsing, transform and serialization
+        done by a pool of `workers` processes.
+
+        Each report is downloaded to a staging file and split into shards at
+        line ends; the shards of a report are processed while the next
+        report downloads. Records are emitted in report and row order, and
+        the bookmark is written after each report.
+        """
+        job_id = self._find_job_id()
+        if not job_id:
+            return current_max_dttm
+
+        task = {
+            "stream": self.tap_stream_id,
+            "schema": self.schema,
+            "metadata": self.metadata,
+            "dimensions": getattr(self, "dimensions", []),
+            "replication_key": self.replication_keys[0],
+            "effective_start": utils.strftime(effective_start_dttm),
+            "bare_records": bare_records(),
+        }
+        shard_bytes = int(self.client.config.get("report_shard_bytes") or DEFAULT_SHARD_BYTES)
+
+        # Reports staged and submitted, at most one ahead of the one emitted
+        pending = deque()
+        executor = get_report_pool(self.client, workers)
+        try:
+            for report in self._iter_reports(job_id):
+                staged = self._stage_report(report, executor, task, shard_bytes)
+                if staged:
+                    pending.append(staged)
+                while len(pending) > 1:
+                    current_max_dttm = self._emit_staged_report(state, pending.popleft(), current_max_dttm, counter)
+            while pending:
+                current_max_dttm = self._emit_staged_report(state, pending.popleft(), current_max_dttm, counter)
+        finally:
+            for _, path, futures in pending:
+                for future in futures:
+                    future.cancel()
+                os.remove(path)
+
+        return current_max_dttm
+
+    def _stage_report(
+        self,
+        report: Dict,
+        executor: ProcessPoolExecutor,
+        task: Dict,
+        shard_bytes: int,
+    ) -> Optional[Tuple[Dict, str, List[Future]]]:
+        """Download a report to a staging file and submit its shards."""
+        download_url = report['downloadUrl']
+        LOGGER.info(f"Downloading report {report.get('id')} from {download_url}")
+
+        file_descriptor, path = tempfile.mkstemp(
+            prefix=f"{self.tap_stream_id}-", suffix=".csv", dir=self.client.config.get("staging_dir")
+        )
+        os.close(file_descriptor)
+        try:
+            size = self.client.download_report_file(download_url, path, endpoint=download_url)
+            fieldnames, first_row = read_header(path)
+        except YoutubeAnalyticsCircuitOpenError:
+            os.remove(path)
+            raise
+        except Exception as e:
+            LOGGER.error(f"Error downloading/parsing report {report.get('id')}: {e}")
+            os.remove(path)
+            self._defer_report(report, e)
+            return None
+
+        futures = [
+            executor.submit(transform_shard, {
+                **task, "report": report, "path": path, "start": start, "end": end, "fieldnames": fieldnames,
+            })
+            for start, end in shard_file(path, first_row, size, shard_bytes)
+        ]
+        return report, path, futures
+
+    def _emit_staged_report(
+        self,
+        state: Dict,
+        staged: Tuple[Dict, str, List[Future]],
+        current_max_dttm: datetime,
+        counter,
+    ) -> datetime:
+        """Write the records of a staged report in shard order, then its bookmark."""
+        report, path, futures = staged
+        row_count = 0
+        try:
+            for future in futures:
+                lines, rows, max_time = future.result()
+                row_count += rows
+                if self.is_selected() and lines:
+                    write_lines(self.tap_stream_id, lines)
+                    counter.increment(len(lines))
+                if max_time:
+                    current_max_dttm = max(current_max_dttm, utils.strptime_to_utc(max_time))
+        finally:
+            os.remove(path)
+
+        self._log_report_rows(report, row_count)
+        self._resolve_report(report)
+        self._write_report_checkpoint(state, current_max_dttm, report, row_count)
+        return current_max_dttm
+
+    def _write_partial_checkpoint(self, state: Dict, report: Dict, position: Dict) -> None:
+        """Record in the `in_progress` marker how far the report being
+        emitted was read, and write a STATE message."""
+        with state_lock:
+            bookmark = state.setdefault("bookmarks", {}).setdefault(self.tap_stream_id, {})
+            marker = bookmark.setdefault(IN_PROGRESS_KEY, {"effective_start": self.effective_start})
+            marker["partial"] = {
+                "report_id": report.get("id"),
+                "rows_emitted": position["rows"],
+                "offset": position["offset"],
+                "header": position["header"],
+            }
+            write_state(state)
+
+    def _write_report_checkpoint(
+        self,
+        state: Dict,
+        current_max_dttm: datetime,
+        report: Optional[Dict] = None,
+        row_count: int = 0,
+    ) -> None:
+        """Update the bookmark after a completed report, with the report's
+        position as the `in_progress` marker, and write a STATE message.
+
+        With `report_checkpoint_seconds` or `report_checkpoint_rows`, the
+        STATE message is only written once that much time has passed, or
+        that many rows were read, since the previous one.
+        """
+        self._checkpoint_rows += row_count
+        seconds = float(self.client.config.get("report_checkpoint_seconds") or 0)
+        rows = int(self.client.config.get("report_checkpoint_rows") or 0)
+        due = not (seconds or rows) or bool(
+            (seconds and time.monotonic() - self._checkpoint_time >= seconds)
+            or (rows and self._checkpoint_rows >= rows)
+        )
+
+        with state_lock:
+            self.write_bookmark(state, self.tap_stream_id, value=self._bookmark_value(current_max_dttm))
+            self._record_failed_reports(state)
+            marker = state["bookmarks"][self.tap_stream_id].get(IN_PROGRESS_KEY) or {}
+            position = self._report_position(report) if report is not None else None
+            # Reports retried after the others do not move the marker back
+            if position is not None and position > (marker.get("create_time") or "", marker.get("report_id") or ""):
+                create_time, report_id = position
+                state["bookmarks"][self.tap_stream_id][IN_PROGRESS_KEY] = {
+                    "effective_start": self.effective_start,
+                    "create_time": create_time,
+                    "report_id": report_id,
+                }
+            if due:
+                write_state(state)
+                self._checkpoint_time = time.monotonic()
+                self._checkpoint_rows = 0
+
+    def _iter_new_reports(self, job_id: str, effective_start_dttm: datetime) -> Iterator[Tuple[Dict, Optional[datetime]]]:
+        """Yield (report, create time) for the reports of a job created in
+        the sync window."""
+        for report in self._iter_reports(job_id):
+            create_dttm = None
+            if report.get("createTime"):
+                create_dttm = utils.strptime_to_utc(self._normalize_datetime(report["createTime"]))
+            if create_dttm and create_dttm < effective_start_dttm and str(report.get("id")) not in (self.failed_reports or {}):
+                continue
+            yield report, create_dttm
+
+    def _sync_parquet(
+        self,
+        state: Dict,
+        effective_start_dttm: datetime,
+        current_max_dttm: datetime,
+        counter,
+    ) -> datetime:
+        """Export the reports to Parquet files, announced with BATCH
+        messages, instead of emitting RECORD messages."""
+        config = self.client.config
+        exporter = ParquetExporter(
+            self,
+            config.get("parquet_dir") or "parquet",
+            compression=config.get("parquet_compression") or DEFAULT_PARQUET_COMPRESSION,
+        )
+        job_id = self._find_job_id()
+        if not job_id:
+            return current_max_dttm
+
+        for report, create_dttm in self._iter_new_reports(job_id, effective_start_dttm):
+            download_url = report['downloadUrl']
+            LOGGER.info(f"Downloading report {report.get('id')} from {download_url}")
+            try:
+                rows = list(self.client.get_report(url=download_url, endpoint=download_url))
+            except YoutubeAnalyticsCircuitOpenError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Error downloading/parsing report {report.get('id')}: {e}")
+                self._defer_report(report, e)
+                continue
+
+            self._log_report_rows(report, len(rows))
+            self._resolve_report(report)
+            if rows and self.is_selected():
+                write_batch(self.tap_stream_id, exporter.encoding, exporter.export_report(rows, report))
+                counter.increment(len(rows))
+
+            if create_dttm and create_dttm > current_max_dttm:
+                current_max_dttm = create_dttm
+            self._write_report_checkpoint(state, current_max_dttm, report, len(rows))
+
+        return current_max_dttm
+
+    def _sync_csv(
+        self,
+        state: Dict,
+        effective_start_dttm: datetime,
+        current_max_dttm: datetime,
+        counter,
+    ) -> datetime:
+        """Store the reports as their original CSV files, with a manifest
+        each, instead of emitting RECORD messages. Rows are not parsed."""
+        config = self.client.config
+        archiver = ReportArchiver(
+            self.tap_stream_id,
+            config.get("csv_dir") or DEFAULT_CSV_DIR,
+            compression=config.get("csv_compression") or "none",
+        )
+        job_id = self._find_job_id()
+        if not job_id:
+            return current_max_dttm
+
+        for report, create_dttm in self._iter_new_reports(job_id, effective_start_dttm):
+            row_count = 0
+            if self.is_selected():
+                LOGGER.info(f"Downloading report {report.get('id')} from {report['downloadUrl']}")
+                try:
+                    manifest = archiver.archive_report(self.client, report, job_id)
+                except YoutubeAnalyticsCircuitOpenError:
+                    raise
+                except Exception as e:
+                    LOGGER.error(f"Error downloading report {report.get('id')}: {e}")
+                    self._defer_report(report, e)
+                    continue
+
+                row_count = manifest["row_count"]
+                self.record_page("report_download", row_count)
+                counter.increment(row_count)
+            self._resolve_report(report)
+
+            if create_dttm and create_dttm > current_max_dttm:
+                current_max_dttm = create_dttm
+            self._write_report_checkpoint(state, current_max_dttm, report, row_count)
+
+        return current_max_dttm
+
+    def _load_window(self, state: Dict) -> Tuple[datetime, datetime]:
+        """Set the sync window of the stream from the state: from the
+        bookmark, moved back to the attribution window, or the window of an
+        interrupted sync to resume; and the reports that failed to download
+        in earlier runs. Returns the start of the window and the bookmark."""
         bookmark_value = self._normalize_datetime(self.get_bookmark(state, self.tap_stream_id))
 
         try:
@@ -652,64 +1486,70 @@ class ReportStream(IncrementalStream):
             bookmark_dttm = utils.now() - timedelta(days=ATTRIBUTION_DAYS)
 
         attribution_cutoff = utils.now() - timedelta(days=ATTRIBUTION_DAYS)
-        if attribution_cutoff < bookmark_dttm:
+        in_progress = (state.get("bookmarks", {}).get(self.tap_stream_id) or {}).get(IN_PROGRESS_KEY)
+        if in_progress and in_progress.get("effective_start"):
+            # Resume the interrupted sync: same window, after its last report
+            effective_start = in_progress["effective_start"]
+            effective_start_dttm = utils.strptime_to_utc(effective_start)
+            self.resume_after = (in_progress.get("create_time") or "", in_progress.get("report_id") or "")
+            self.resume_partial = in_progress.get("partial")
+            LOGGER.info(
+                "Resuming stream %s after report %s created at %s",
+                self.tap_stream_id,
+                self.resume_after[1],
+                self.resume_after[0],
+            )
+        elif attribution_cutoff < bookmark_dttm:
             effective_start_dttm = attribution_cutoff
             effective_start = utils.strftime(effective_start_dttm)
         else:
             effective_start_dttm = bookmark_dttm
             effective_start = bookmark_value
 
-        current_max_dttm = bookmark_dttm
+        self.effective_start = effective_start
+        failed = (state.get("bookmarks", {}).get(self.tap_stream_id) or {}).get(FAILED_REPORTS_KEY) or []
+        self.failed_reports = {entry["report_id"]: dict(entry) for entry in failed}
+        self._charged_reports = set()
+        return effective_start_dttm, bookmark_dttm
+
+    def sync(
+        self,
+        state: Dict,
+        transformer: Transformer,
+        parent_obj: Dict = None,
+    ) -> Dict:
+        effective_start_dttm, current_max_dttm = self._load_window(state)
+        self.stopped_at_deadline = False
+        self._checkpoint_time = time.monotonic()
+        self._checkpoint_rows = 0
 
         self.url_endpoint = self.get_url_endpoint(parent_obj)
-        self.update_params(updated_since=effective_start)
+        self.update_params(updated_since=self.effective_start)
 
         with metrics.record_counter(self.tap_stream_id) as counter:
             try:
-                for item in self.get_records(isreport=True):
-                    if not item:
-                        continue
-
-                    # Support either (row, report) tuples or just row dicts
-                    if isinstance(item, tuple) and len(item) == 2:
-                        record, report = item
-                    else:
-                        record, report = item, {}
-
-                    dims = getattr(self, "dimensions", [])
-
-                    transformed_record = transformer.transform(
-                        self.transform_report_record(record, dims, report),
-                        self.schema,
-                        self.metadata
+                report_output = self.client.config.get("report_output") or "records"
+                report_workers = int(self.client.config.get("report_workers") or 0)
+                if report_output == "parquet":
+                    current_max_dttm = self._sync_parquet(
+                        state, effective_start_dttm, current_max_dttm, counter
+                    )
+                elif report_output == "csv":
+                    current_max_dttm = self._sync_csv(
+                        state, effective_start_dttm, current_max_dttm, counter
+                    )
+                elif report_workers > 1:
+                    current_max_dttm = self._sync_with_report_workers(
+                        state, report_workers, effective_start_dttm, current_max_dttm, counter
+                    )
+                elif is_pipeline_enabled(self.client.config):
+                    current_max_dttm = self._sync_pipeline(
+                        state, transformer, effective_start_dttm, current_max_dttm, counter
+                    )
+                else:
+                    current_max_dttm = self._sync_records(
+                        state, transformer, effective_start_dttm, current_max_dttm, counter
                     )
-
-                    record_time_raw = transformed_record.get(self.replication_keys[0])
-                    record_dttm = None
-                    if record_time_raw:
-                        try:
-                            normalized_time = self._normalize_datetime(record_time_raw)
-                            record_dttm = utils.strptime_to_utc(normalized_time)
-                        except Exception as err:
-                            LOGGER.warning(
-                                "Failed to parse record timestamp %s for stream %s: %s",
-                                record_time_raw,
-                                self.tap_stream_id,
-                                err,
-                            )
-
-                    if record_dttm and record_dttm < effective_start_dttm:
-                        continue
-
-                    if record_dttm and record_dttm > current_max_dttm:
-                        current_max_dttm = record_dttm
-
-                    if self.is_selected():
-                        write_record(self.tap_stream_id, transformed_record)
-                        counter.increment()
-
-                    for child in self.child_to_sync:
-                        child.sync(state=state, transformer=transformer, parent_obj=record)
 
             except YoutubeAnalyticsForbiddenError as err:
                 LOGGER.warning(
@@ -721,9 +1561,24 @@ class ReportStream(IncrementalStream):
                 )
                 raise
 
-            state = self.write_bookmark(
-                state,
-                self.tap_stream_id,
-                value=utils.strftime(current_max_dttm),
-            )
+            if self.stopped_at_deadline:
+                # Write the last checkpoint, even if throttled, and resume
+                # from it on the next run
+                with state_lock:
+                    self.write_bookmark(state, self.tap_stream_id, value=self._bookmark_value(current_max_dttm))
+                    self._record_failed_reports(state)
+                    write_state(state)
+                raise YoutubeAnalyticsDeadlineError(f"Stream {self.tap_stream_id} stopped at the run deadline")
+
+            self._give_up_failed_reports()
+            with state_lock:
+                state.get("bookmarks", {}).get(self.tap_stream_id, {}).pop(IN_PROGRESS_KEY, None)
+                state = self.write_bookmark(
+                    state,
+                    self.tap_stream_id,
+                    value=self._bookmark_value(current_max_dttm),
+                )
+                self._record_failed_reports(state)
+            self.resume_after = None
+            self.resume_partial = None
             return counter.value
@@ -1,24 +1,69 @@
-from typing import Dict, Iterator, List
+from typing import Callable, Dict, Iterator, List
+
 from singer import get_logger
 from tap_youtube_analytics.streams.abstracts import FullTableStream
 
 LOGGER = get_logger()
 
+# channels.list accepts at most 50 ids per request
+MAX_CHANNEL_IDS_PER_REQUEST = 50
+
+
+def fetch_channel_batches(
+    client,
+    channel_ids: List[str],
+    params: Dict,
+    endpoint: str = None,
+    record_page: Callable[[str, int], None] = None,
+) -> Iterator[Dict]:
+    """List channels in batches of up to 50 ids, one batch after the other,
+    and yield the channel resources in batch order. Past the run deadline no
+    new batch is requested."""
+    batches = [
+        channel_ids[i:i + MAX_CHANNEL_IDS_PER_REQUEST]
+        for i in range(0, len(channel_ids), MAX_CHANNEL_IDS_PER_REQUEST)
+    ]
+    LOGGER.info(f"Listing {len(channel_ids)} channels in {len(batches)} batches")
+    for batch in batches:
+        client.deadline.check("channel batch")
+        response = client.get(
+            url=client.base_url,
+            path=Channels.path,
+            params={**params, "id": ",".join(batch)},
+            endpoint=endpoint or Channels.endpoint,
+        )
+        items = (response or {}).get("items", [])
+        if record_page:
+            record_page(Channels.endpoint, len(items))
+        yield from items
+
 
 class Channels(FullTableStream):
     tap_stream_id = "channels"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
-    params = {"maxResults": 50, "part": "id,contentDetails,snippet,statistics,status"}
+    params = {"part": "id,contentDetails,snippet,statistics,status"}
+    api_parts = ("id", "contentDetails", "snippet", "statistics", "status")
     data_key = "items"
     path = "channels"
     endpoint = "channels"
 
     def update_params(self) -> Dict:
-        """Update the params for the request."""
-        channel_ids = self.client.config["channel_ids"]
+        """Update the params for the request; the channel ids are added per
+        batch by `get_records`."""
         self.params = {
             **self.__class__.params,
-            "id": channel_ids,
+            **self.field_mask_params(),
+            "maxResults": self.get_page_size(),
         }
         return self.params
+
+    def get_records(self, isreport=False) -> Iterator[Dict]:
+        """List the configured channels, 50 ids per request."""
+        yield from fetch_channel_batches(
+            self.client,
+            self.parse_channel_ids(self.client.config),
+            self.params,
+            endpoint=self.url_endpoint,
+            record_page=self.record_page,
+        )
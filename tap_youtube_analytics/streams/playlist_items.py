@@ -1,10 +1,15 @@
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 
-from singer import Transformer, get_logger, metrics, utils, write_bookmark, write_record
+from singer import Transformer, get_logger, metrics, utils
 from tap_youtube_analytics.streams.abstracts import IncrementalStream
+from tap_youtube_analytics.writer import write_record
+from tap_youtube_analytics.streams.playlists import Playlists
 
 LOGGER = get_logger()
 
+# Standalone syncs only need the playlist ids from the playlists listing
+PLAYLIST_ID_MASK = {"part": "id", "fields": "etag,nextPageToken,pageInfo,items(kind,etag,id)"}
+
 
 class PlaylistItems(IncrementalStream):
     tap_stream_id = "playlist_items"
@@ -13,82 +18,117 @@ class PlaylistItems(IncrementalStream):
     replication_keys = ["published_at"]
     path = "playlistItems"
     endpoint = "playlist_items"
+    params = {"part": "id,contentDetails,snippet,status"}
+    api_parts = ("id", "contentDetails", "snippet", "status")
+    parent = "playlists"
     parent_stream_id = "playlists"
 
+    def __init__(self, client=None, catalog=None) -> None:
+        super().__init__(client, catalog)
+        # Bookmark read once per sync; the stream is called once per playlist
+        # when it fans out from `playlists`, and must not filter later
+        # playlists against a bookmark advanced by earlier ones.
+        self.sync_start_date = None
+
+    def list_playlists(self) -> Iterable[Dict]:
+        """List playlists for every configured channel.
+
+        Only used when the stream is synced standalone; during a regular sync
+        the playlists are supplied one at a time by the parent stream.
+        """
+        channel_list = self.parse_channel_ids(self.client.config)
+
+        for channel_id in channel_list:
+            self.path = Playlists.path
+            self.endpoint = Playlists.endpoint
+            self.data_key = Playlists.data_key
+            self.params = {
+                **Playlists.params,
+                **PLAYLIST_ID_MASK,
+                "maxResults": self.get_page_size(Playlists.endpoint),
+                "channelId": channel_id,
+            }
+            yield from list(self.get_records())
+
     def sync(
         self,
         state: Dict,
         transformer: Transformer,
         parent_obj: Dict = None,
     ) -> Dict:
-        """Incrementally sync videos for all configured channel IDs."""
+        """Incrementally sync items of the parent playlist, or of every
+        configured channel's playlists when no parent is given."""
         self.url_endpoint = self.get_url_endpoint(parent_obj)
-        bookmark_date = self.get_bookmark(state, self.tap_stream_id)
+        if self.sync_start_date is None:
+            self.sync_start_date = self.get_bookmark(state, self.tap_stream_id)
+        bookmark_date = self.sync_start_date
         last_dttm = utils.strptime_to_utc(bookmark_date)
         current_max_bookmark_date = bookmark_date
 
-        channel_ids = self.client.config["channel_ids"]
-        channel_list = [cid.strip() for cid in channel_ids.split(",")]
+        playlists = [parent_obj] if parent_obj is not None else self.list_playlists()
 
         with metrics.record_counter(self.tap_stream_id) as counter:
-            for channel_id in channel_list:
-                playlist_params = {
-                    "channelId": channel_id,
-                    "maxResults": 50,
-                    "part": "id,contentDetails,player,snippet,status"
-                }
-
-                self.path = "playlists"
-                self.endpoint = "playlists"
-                self.data_key = "items"
-                self.params = playlist_params
-
-                playlists = self.get_records()
-                for playlist in playlists:
-                    playlist_id = playlist.get("id")
-                    self.params = {
-                        "maxResults": 50,
-                        "part": "id,contentDetails,snippet,status",
-                    }
-                    self.params["playlistId"] = playlist_id
-                    self.path = "playlistItems"
-                    self.endpoint = "playlist_items"
-                    self.data_key = "items"
-
-                    records = self.get_records()
-                    exhausted_playlist = False
-                    for record in records:
-                        for key in self.key_properties:
-                            if not record.get(key):
-                                raise ValueError(f"Stream: {self.tap_stream_id}, Missing key: {key}")
-
-
-                        transformed_record = transformer.transform(
-                            self.transform_data_record(record),
-                            self.schema,
-                            self.metadata,
-                        )
-                        record_timestamp = transformed_record[self.replication_keys[0]]
-
-                        record_dttm = utils.strptime_to_utc(record_timestamp)
-                        if record_dttm >= last_dttm:
-                            if self.is_selected():
-                                write_record(self.tap_stream_id, transformed_record)
-                                counter.increment()
-
-                            current_max_bookmark_date = max(
-                                current_max_bookmark_date, record_timestamp
-                            )
-
-                            for child in self.child_to_sync:
-                                child.sync(state=state, transformer=transformer, parent_obj=record)
-                        else:
-                            exhausted_playlist = True
-                            break
-
-                    if exhausted_playlist:
-                        continue
-
+            for playlist in playlists:
+                current_max_bookmark_date = self._sync_playlist_items(
+                    playlist_id=playlist.get("id"),
+                    last_dttm=last_dttm,
+                    current_max_bookmark_date=current_max_bookmark_date,
+                    transformer=transformer,
+                    counter=counter,
+                    state=state,
+                )
 
             state = self.write_bookmark(state, self.tap_stream_id, value=current_max_bookmark_date)
             return counter.value
+
+    def _sync_playlist_items(
+        self,
+        playlist_id: str,
+        last_dttm: Any,
+        current_max_bookmark_date: str,
+        transformer: Transformer,
+        counter: metrics.Counter,
+        state: Dict,
+    ) -> str:
+        """Emit the items of one playlist newer than the bookmark.
+
+        Returns the updated current_max_bookmark_date.
+        """
+        self.params = {
+            **self.__class__.params,
+            **self.field_mask_params(),
+            "maxResults": self.get_page_size(),
+            "playlistId": playlist_id,
+        }
+        self.path = self.__class__.path
+        self.endpoint = self.__class__.endpoint
+        self.data_key = "items"
+
+        for record in self.get_records():
+            for key in self.key_properties:
+                if not record.get(key):
+                    raise ValueError(f"Stream: {self.tap_stream_id}, Missing key: {key}")
+
+            transformed_record = transformer.transform(
+                self.transform_data_record(record),
+                self.schema,
+                self.metadata,
+            )
+            record_timestamp = transformed_record[self.replication_keys[0]]
+
+            record_dttm = utils.strptime_to_utc(record_timestamp)
+            if record_dttm < last_dttm:
+                break
+
+            if self.is_selected() and not self.is_unchanged(record):
+                write_record(self.tap_stream_id, transformed_record)
+                counter.increment()
+
+            current_max_bookmark_date = max(
+                current_max_bookmark_date, record_timestamp
+            )
+
+            for child in self.child_to_sync:
+                child.sync(state=state, transformer=transformer, parent_obj=record)
+
+        return current_max_bookmark_date
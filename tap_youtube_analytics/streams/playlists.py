@@ -1,8 +1,9 @@
 from typing import Dict
 
-from singer import Transformer, get_logger, metrics, write_record
+from singer import Transformer, get_logger, metrics
 
 from tap_youtube_analytics.streams.abstracts import FullTableStream
+from tap_youtube_analytics.writer import write_record
 
 LOGGER = get_logger()
 
@@ -11,11 +12,13 @@ class Playlists(FullTableStream):
     tap_stream_id = "playlists"
     key_properties = ["id"]
     replication_method = "FULL_TABLE"
-    params = {"maxResults": 1, "part": "id,contentDetails,player,snippet,status"}
-    # "channelId": "{parent_id}",
+    params = {"part": "id,contentDetails,player,snippet,status"}
+    api_parts = ("id", "contentDetails", "player", "snippet", "status")
     data_key = "items"
     path = "playlists"
     endpoint = "playlists"
+    # playlist_items fans out from this listing so playlists are only listed once per sync
+    children = ["playlist_items"]
 
     def sync(
         self,
@@ -25,19 +28,23 @@ class Playlists(FullTableStream):
     ) -> Dict:
         """Abstract implementation for `type: Fulltable` stream."""
         self.url_endpoint = self.get_url_endpoint(parent_obj)
-        channel_ids = self.client.config["channel_ids"]
-        channel_list = [cid.strip() for cid in channel_ids.split(",")]
+        channel_list = self.parse_channel_ids(self.client.config)
 
         with metrics.record_counter(self.tap_stream_id) as counter:
             for channel_id in channel_list:
-                self.params["channelId"] = channel_id
+                self.params = {
+                    **self.__class__.params,
+                    **self.field_mask_params(),
+                    "maxResults": self.get_page_size(),
+                    "channelId": channel_id,
+                }
                 for record in self.get_records():
                     if record is None:
                         continue
                     transformed_record = transformer.transform(
                         self.transform_data_record(record), self.schema, self.metadata
                     )
-                    if self.is_selected():
+                    if self.is_selected() and not self.is_unchanged(record):
                         write_record(self.tap_stream_id, transformed_record)
                         counter.increment()
 
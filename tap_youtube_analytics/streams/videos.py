@@ -1,10 +1,14 @@
 from typing import Any, Dict, Iterable, List, Tuple
 
-from singer import Transformer, get_logger, metrics, utils, write_bookmark, write_record
+from singer import Transformer, get_logger, metrics, utils
 from tap_youtube_analytics.streams.abstracts import IncrementalStream
+from tap_youtube_analytics.writer import write_record
 
 LOGGER = get_logger()
 
+# Only the video id and publish date of search results are used
+SEARCH_FIELDS = "etag,nextPageToken,pageInfo,items(id/videoId,snippet/publishedAt)"
+
 
 class Videos(IncrementalStream):
     tap_stream_id = "videos"
@@ -14,6 +18,7 @@ class Videos(IncrementalStream):
     data_key = "items"
     path = "search"
     endpoint = "search_videos"
+    api_parts = ("id", "contentDetails", "player", "snippet", "statistics", "status")
 
     def chunks(self, items: Iterable[str], cnt: int) -> Iterable[List[str]]:
         """Yield successive n-sized chunks from any iterable."""
@@ -33,8 +38,7 @@ class Videos(IncrementalStream):
         last_dttm = utils.strptime_to_utc(bookmark_date)
         current_max_bookmark_date = bookmark_date
 
-        channel_ids = self.client.config["channel_ids"]
-        channel_list = [cid.strip() for cid in channel_ids.split(",")]
+        channel_list = self.parse_channel_ids(self.client.config)
 
         total_written = 0
 
@@ -45,8 +49,9 @@ class Videos(IncrementalStream):
                     "channelId": channel_id,
                     "order": "date",
                     "type": "video",
-                    "maxResults": 50,
+                    "maxResults": self.get_page_size("search_videos"),
                     "publishedAfter": bookmark_date,
+                    "fields": SEARCH_FIELDS,
                 }
 
                 self.path = "search"
@@ -112,6 +117,7 @@ class Videos(IncrementalStream):
         for video_id_chunk in video_id_chunks:
             videos_params = {
                 "part": "id,snippet",
+                **self.field_mask_params(),
                 "id": ",".join(video_id_chunk)
             }
 
@@ -136,7 +142,7 @@ class Videos(IncrementalStream):
 
                 record_dttm = utils.strptime_to_utc(record_timestamp)
                 if record_dttm >= last_dttm:
-                    if self.is_selected():
+                    if self.is_selected() and not self.is_unchanged(record):
                         write_record(self.tap_stream_id, transformed_record)
                         counter.increment()
                         total_written += 1
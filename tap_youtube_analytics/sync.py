@@ -1,19 +1,48 @@
 import singer
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Dict, List, Optional
 
 from tap_youtube_analytics import streams
 from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsCircuitOpenError,
+    YoutubeAnalyticsDeadlineError,
+    YoutubeAnalyticsQuotaBudgetError,
+)
+from tap_youtube_analytics import writer
+from tap_youtube_analytics.writer import state_lock, write_state
 
 LOGGER = singer.get_logger()
 
+# State key listing the streams being synced by a parallel sync; the
+# counterpart of `currently_syncing` when several streams are in flight
+IN_FLIGHT_STREAMS_KEY = "currently_syncing_streams"
+
 
 def update_currently_syncing(state: Dict, stream_name: Optional[str]) -> None:
     """Update currently_syncing in state and write it"""
-    if not stream_name and singer.get_currently_syncing(state):
-        del state["currently_syncing"]
-    else:
-        singer.set_currently_syncing(state, stream_name)
-    singer.write_state(state)
+    with state_lock:
+        if not stream_name and singer.get_currently_syncing(state):
+            del state["currently_syncing"]
+        else:
+            singer.set_currently_syncing(state, stream_name)
+        write_state(state)
+
+
+def update_in_flight_streams(state: Dict, stream_name: str, in_flight: bool) -> None:
+    """Add or remove a stream from the in-flight streams in state and write it"""
+    with state_lock:
+        in_flight_streams = set(state.get(IN_FLIGHT_STREAMS_KEY) or [])
+        if in_flight:
+            in_flight_streams.add(stream_name)
+        else:
+            in_flight_streams.discard(stream_name)
+
+        if in_flight_streams:
+            state[IN_FLIGHT_STREAMS_KEY] = sorted(in_flight_streams)
+        else:
+            state.pop(IN_FLIGHT_STREAMS_KEY, None)
+        write_state(state)
 
 
 def write_schema(stream, client, streams_to_sync, catalog) -> None:
@@ -27,22 +56,145 @@ def write_schema(stream, client, streams_to_sync, catalog) -> None:
             LOGGER.warning(f"Child stream '{child}' not found in STREAMS; skipping.")
             continue
 
-        child_obj = streams.STREAMS[child](client, catalog.get_stream(child))
+        child_catalog = catalog.get_stream(child)
+        if child_catalog is None:
+            LOGGER.warning(f"Child stream '{child}' not found in catalog; skipping.")
+            continue
+
+        child_obj = streams.STREAMS[child](client, child_catalog)
         write_schema(child_obj, client, streams_to_sync, catalog)
         if child in streams_to_sync:
             stream.child_to_sync.append(child_obj)
 
 
+def prioritize_streams(streams_to_sync: List[str], config: Dict, state: Dict) -> List[str]:
+    """Order the streams by `quota_priority`, so the Data API quota budget
+    is spent on them first; the stream interrupted by the previous run
+    still comes first."""
+    priority = config.get("quota_priority") or []
+    if isinstance(priority, str):
+        priority = [name.strip() for name in priority.split(",") if name.strip()]
+    if not priority:
+        return streams_to_sync
+
+    currently_syncing = singer.get_currently_syncing(state)
+    return sorted(streams_to_sync, key=lambda name: (
+        name != currently_syncing,
+        priority.index(name) if name in priority else len(priority),
+    ))
+
+
+def run_stream(stream, state: Dict, transformer: singer.Transformer) -> Optional[int]:
+    """Sync a stream, charging its Data API requests to it and holding
+    their retries to its deadline. A stream stopped by the quota budget is
+    skipped, so other streams (e.g. report streams, which use no Data API
+    quota) still sync; so is a stream stopped by an open circuit, which
+    resumes from its bookmark on the next run."""
+    with stream.client.quota.stream(stream.tap_stream_id), stream.client.retry_policy.stream(stream.tap_stream_id):
+        try:
+            return stream.sync(state=state, transformer=transformer)
+        except (YoutubeAnalyticsQuotaBudgetError, YoutubeAnalyticsCircuitOpenError) as err:
+            LOGGER.warning(f"Skipping the rest of stream {stream.tap_stream_id}: {err}")
+            return None
+
+
+def sync_stream(stream, state: Dict) -> None:
+    """Sync one top-level stream on a worker of a parallel sync. A stream
+    stopped at the run deadline stays in flight in the state, so the next
+    run starts it first."""
+    stream_name = stream.tap_stream_id
+    if stream.client.deadline.stop_before("stream"):
+        return
+    LOGGER.info(f"START Syncing: {stream_name}")
+    update_in_flight_streams(state, stream_name, True)
+
+    # singer.Transformer collects per-record diagnostics, one per worker
+    with singer.Transformer() as transformer:
+        try:
+            total_records = run_stream(stream, state, transformer)
+        except YoutubeAnalyticsDeadlineError as err:
+            LOGGER.info(f"STOPPED Syncing: {stream_name}: {err}")
+            update_in_flight_streams(state, stream_name, True)
+            return
+    stream.log_page_stats()
+
+    update_in_flight_streams(state, stream_name, False)
+    LOGGER.info(f"FINISHED Syncing: {stream_name}, total_records: {total_records}")
+
+
+def sync_parallel(client: Client, catalog: singer.Catalog, state: Dict,
+                  streams_to_sync: List[str], max_workers: int) -> None:
+    """Sync the top-level streams concurrently on a worker pool.
+
+    Schemas of every stream are written before any worker starts, so each
+    stream's SCHEMA precedes its RECORDs; all messages go through the
+    shared writer. Streams that were in flight when a previous run stopped
+    are started first.
+    """
+    top_level_streams = []
+    for stream_name in streams_to_sync:
+        if stream_name not in streams.STREAMS:
+            LOGGER.warning(f"Stream '{stream_name}' not found in STREAMS; skipping.")
+            continue
+
+        stream = streams.STREAMS[stream_name](client, catalog.get_stream(stream_name))
+        if stream.parent:
+            if stream.parent not in streams_to_sync:
+                streams_to_sync.append(stream.parent)
+            continue
+
+        write_schema(stream, client, streams_to_sync, catalog)
+        top_level_streams.append(stream)
+
+    interrupted = set(state.get(IN_FLIGHT_STREAMS_KEY) or [])
+    interrupted.add(singer.get_currently_syncing(state))
+    top_level_streams.sort(key=lambda stream: stream.tap_stream_id not in interrupted)
+    if singer.get_currently_syncing(state):
+        update_currently_syncing(state, None)
+
+    LOGGER.info(f"Syncing {len(top_level_streams)} streams with {max_workers} workers")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync") as executor:
+        futures = [executor.submit(sync_stream, stream, state) for stream in top_level_streams]
+        done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+        for future in done:
+            # Re-raise the first stream failure once running streams finished
+            future.result()
+
+
 def sync(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
     """Sync selected streams from catalog"""
+    writer.set_writer(writer.create_writer(config))
+    client.quota.load_state(state)
+    try:
+        sync_streams(client, config, catalog, state)
+        if client.deadline.stopped:
+            LOGGER.info("Stopped at the run deadline; the next run resumes from the last STATE")
+    finally:
+        writer.flush()
+        client.quota.log_usage()
+        client.rate_limiter.log_stats()
+        client.concurrency.log_limits()
+        client.retry_policy.log_stats()
+
+
+def sync_streams(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
+    """Sync the selected streams, in parallel when configured"""
     streams_to_sync = []
     for stream in catalog.get_selected_streams(state):
         streams_to_sync.append(stream.stream)
+    streams_to_sync = prioritize_streams(streams_to_sync, config, state)
     LOGGER.info(f"selected_streams: {streams_to_sync}")
 
     last_stream = singer.get_currently_syncing(state)
     LOGGER.info(f"last/currently syncing stream: {last_stream}")
 
+    max_parallel_streams = int(config.get("max_parallel_streams") or 1)
+    if max_parallel_streams > 1:
+        sync_parallel(client, catalog, state, streams_to_sync, max_parallel_streams)
+        return
+
     with singer.Transformer() as transformer:
         for stream_name in streams_to_sync:
             if stream_name not in streams.STREAMS:
@@ -58,9 +210,18 @@ def sync(client: Client, config: Dict, catalog: singer.Catalog, state) -> None:
 
             write_schema(stream, client, streams_to_sync, catalog)
 
+            if client.deadline.stop_before("stream"):
+                break
             LOGGER.info(f"START Syncing: {stream_name}")
             update_currently_syncing(state, stream_name)
-            total_records = stream.sync(state=state, transformer=transformer)
+            try:
+                total_records = run_stream(stream, state, transformer)
+            except YoutubeAnalyticsDeadlineError as err:
+                # Keep `currently_syncing`, so the next run resumes the stream
+                LOGGER.info(f"STOPPED Syncing: {stream_name}: {err}")
+                update_currently_syncing(state, stream_name)
+                break
+            stream.log_page_stats()
 
             update_currently_syncing(state, None)
             LOGGER.info(f"FINISHED Syncing: {stream_name}, total_records: {total_records}")
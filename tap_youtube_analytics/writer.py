@@ -0,0 +1,390 @@
+import copy
+import gzip
+import os
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Union
+
+import simplejson
+import singer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Bookmark updates and message writes share this lock, whichever writer is set
+state_lock = threading.RLock()
+
+DEFAULT_OUTPUT_BUFFER_BYTES = 1024 * 1024
+DEFAULT_OUTPUT_FLUSH_SECONDS = 1.0
+DEFAULT_BATCH_MAX_ROWS = 1000000
+DEFAULT_BATCH_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_BATCH_CHECKPOINT_SECONDS = 60.0
+BATCH_COMPRESSIONS = ("gzip", "zstd")
+
+
+def dumps(value: Any) -> str:
+    """Serialize to compact JSON, with orjson when installed; values orjson
+    cannot encode (e.g. `Decimal`) fall back to simplejson."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode("utf-8")
+        except TypeError:
+            pass
+    return simplejson.dumps(value, use_decimal=True, separators=(",", ":"))
+
+
+class MessageWriter:
+    """Single writer for the Singer messages of every stream.
+    ~~~
+    Streams may sync concurrently, so all messages go through one lock:
+     - stdout writes are never interleaved
+     - a STATE message is a consistent snapshot; bookmark updates take the
+       same lock (`state_lock`) so the state is not serialized mid-update
+    """
+
+    # `serialize_record` returns the record alone, without its RECORD message
+    bare_records = False
+
+    def __init__(self) -> None:
+        self.state_lock = state_lock
+
+    def write_record(self, stream_name: str, record: Dict, time_extracted=None) -> None:
+        with self.state_lock:
+            singer.write_record(stream_name, record, time_extracted=time_extracted)
+
+    def write_schema(
+        self,
+        stream_name: str,
+        schema: Dict,
+        key_properties: Union[str, List[str]],
+        bookmark_properties: Any = None,
+    ) -> None:
+        with self.state_lock:
+            singer.write_schema(stream_name, schema, key_properties, bookmark_properties)
+
+    def write_state(self, state: Dict) -> None:
+        with self.state_lock:
+            singer.write_state(copy.deepcopy(state))
+
+    def serialize_record(self, stream_name: str, record: Dict) -> str:
+        """Serialize a RECORD message as a newline-terminated JSON line."""
+        return singer.format_message(singer.RecordMessage(stream=stream_name, record=record)) + "\n"
+
+    def write_lines(self, stream_name: str, lines: List[str]) -> None:
+        """Write records of a stream serialized by `serialize_record`."""
+        with self.state_lock:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
+
+    def write_batch(self, stream_name: str, encoding: Dict, manifest: List[str]) -> None:
+        """Write a BATCH message announcing files of records of a stream."""
+        message = {"type": "BATCH", "stream": stream_name, "encoding": encoding, "manifest": manifest}
+        with self.state_lock:
+            sys.stdout.write(dumps(message) + "\n")
+            sys.stdout.flush()
+
+    def flush(self) -> None:
+        """Write out buffered messages; messages are not buffered here."""
+
+
+class BufferedMessageWriter(MessageWriter):
+    """Message writer that serializes records with orjson when installed
+    and writes them to stdout in large chunks.
+    ~~~
+    - the `{"type":"RECORD","stream":...,"record":` prefix is built once per
+      stream; only the record itself is serialized per message
+    - records orjson cannot encode (e.g. `Decimal`) fall back to simplejson
+    - the buffer is written out once it holds `buffer_bytes`, when a write
+      finds it older than `flush_seconds`, and always with a STATE message,
+      so a STATE never precedes the records it covers
+    """
+
+    def __init__(
+        self,
+        buffer_bytes: int = DEFAULT_OUTPUT_BUFFER_BYTES,
+        flush_seconds: float = DEFAULT_OUTPUT_FLUSH_SECONDS,
+        output=None,
+    ) -> None:
+        super().__init__()
+        self.buffer_bytes = buffer_bytes
+        self.flush_seconds = flush_seconds
+        self.output = output
+        self.buffer = []
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+        self.prefixes = {}
+
+    def serialize_record(self, stream_name: str, record: Dict) -> str:
+        prefix = self.prefixes.get(stream_name)
+        if prefix is None:
+            prefix = f'{{"type":"RECORD","stream":{dumps(stream_name)},"record":'
+            self.prefixes[stream_name] = prefix
+        return f"{prefix}{dumps(record)}}}\n"
+
+    def _append(self, lines: List[str], flush: bool = False) -> None:
+        with self.state_lock:
+            self.buffer.extend(lines)
+            self.buffered += sum(len(line) for line in lines)
+            if (
+                flush
+                or self.buffered >= self.buffer_bytes
+                or time.monotonic() - self.last_flush >= self.flush_seconds
+            ):
+                self.flush()
+
+    def flush(self) -> None:
+        with self.state_lock:
+            output = self.output or sys.stdout
+            if self.buffer:
+                output.write("".join(self.buffer))
+                self.buffer = []
+                self.buffered = 0
+            output.flush()
+            self.last_flush = time.monotonic()
+
+    def write_record(self, stream_name: str, record: Dict, time_extracted=None) -> None:
+        if time_extracted:
+            line = singer.format_message(
+                singer.RecordMessage(stream=stream_name, record=record, time_extracted=time_extracted)
+            ) + "\n"
+        else:
+            line = self.serialize_record(stream_name, record)
+        self._append([line])
+
+    def write_schema(
+        self,
+        stream_name: str,
+        schema: Dict,
+        key_properties: Union[str, List[str]],
+        bookmark_properties: Any = None,
+    ) -> None:
+        if isinstance(key_properties, str):
+            key_properties = [key_properties]
+        message = singer.SchemaMessage(
+            stream=stream_name,
+            schema=schema,
+            key_properties=key_properties,
+            bookmark_properties=bookmark_properties,
+        )
+        self._append([singer.format_message(message) + "\n"])
+
+    def write_state(self, state: Dict) -> None:
+        with self.state_lock:
+            self._append([dumps({"type": "STATE", "value": state}) + "\n"], flush=True)
+
+    def write_lines(self, stream_name: str, lines: List[str]) -> None:
+        self._append(lines)
+
+    def write_batch(self, stream_name: str, encoding: Dict, manifest: List[str]) -> None:
+        message = {"type": "BATCH", "stream": stream_name, "encoding": encoding, "manifest": manifest}
+        self._append([dumps(message) + "\n"])
+
+
+class BatchPart:
+    """An open, compressed JSONL part file of a stream."""
+
+    def __init__(self, path: str, compression: str) -> None:
+        self.path = path
+        self.rows = 0
+        self.bytes = 0
+        if compression == "zstd":
+            self.raw = open(path, "wb")
+            self.file = zstandard.ZstdCompressor().stream_writer(self.raw)
+        else:
+            self.raw = None
+            self.file = gzip.open(path, "wb")
+
+    def write(self, lines: List[str]) -> None:
+        data = "".join(lines).encode("utf-8")
+        self.file.write(data)
+        self.rows += len(lines)
+        self.bytes += len(data)
+
+    def close(self) -> None:
+        self.file.close()
+        if self.raw:
+            self.raw.close()
+
+
+class BatchMessageWriter(MessageWriter):
+    """Message writer for the BATCH output mode.
+    ~~~
+    Records are written to compressed JSONL part files, one record per line,
+    under `batch_dir`; stdout only carries SCHEMA, BATCH and STATE messages.
+    A part is closed and announced with a BATCH message (its `manifest`
+    lists the file URI) once it holds `max_rows` records or `max_bytes`
+    uncompressed bytes.
+
+    A STATE message never covers records of an unannounced file: while
+    parts hold records, a STATE is held back and only the latest one is
+    kept. It is written, after closing the open parts, once
+    `checkpoint_seconds` have passed since the previous STATE, when the
+    last open part rolls over, or on `flush`, so per-report checkpoints do
+    not each close a small part.
+    """
+
+    bare_records = True
+
+    def __init__(
+        self,
+        batch_dir: str,
+        compression: str = "gzip",
+        max_rows: int = DEFAULT_BATCH_MAX_ROWS,
+        max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+        checkpoint_seconds: float = DEFAULT_BATCH_CHECKPOINT_SECONDS,
+    ) -> None:
+        super().__init__()
+        if compression not in BATCH_COMPRESSIONS:
+            raise ValueError(f"Unsupported batch_compression {compression}; use one of {BATCH_COMPRESSIONS}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("batch_compression zstd requires zstandard: pip install 'tap-youtube-analytics[zstd]'")
+
+        self.batch_dir = batch_dir
+        self.compression = compression
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.checkpoint_seconds = checkpoint_seconds
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.extension = "jsonl.gz" if compression == "gzip" else "jsonl.zst"
+        self.parts = {}
+        self.part_numbers = {}
+        self.pending_state = None
+        self.last_state = time.monotonic()
+        os.makedirs(batch_dir, exist_ok=True)
+
+    def _write_records(self, stream_name: str, lines: List[str]) -> None:
+        with self.state_lock:
+            part = self.parts.get(stream_name)
+            if part is None:
+                number = self.part_numbers.get(stream_name, 0) + 1
+                self.part_numbers[stream_name] = number
+                path = os.path.join(self.batch_dir, f"{stream_name}-{self.run_id}-{number:05d}.{self.extension}")
+                part = self.parts[stream_name] = BatchPart(path, self.compression)
+
+            part.write(lines)
+            if part.rows >= self.max_rows or part.bytes >= self.max_bytes:
+                self._close_part(stream_name)
+                if self.pending_state is not None and not self._has_rows():
+                    self._write_pending_state()
+
+    def _has_rows(self) -> bool:
+        return any(part.rows for part in self.parts.values())
+
+    def _close_part(self, stream_name: str) -> None:
+        part = self.parts.pop(stream_name)
+        part.close()
+        super().write_batch(
+            stream_name,
+            {"format": "jsonl", "compression": self.compression},
+            [Path(part.path).resolve().as_uri()],
+        )
+
+    def write_record(self, stream_name: str, record: Dict, time_extracted=None) -> None:
+        self._write_records(stream_name, [self.serialize_record(stream_name, record)])
+
+    def serialize_record(self, stream_name: str, record: Dict) -> str:
+        return dumps(record) + "\n"
+
+    def write_lines(self, stream_name: str, lines: List[str]) -> None:
+        """Write serialized records to the part file of their stream as they are."""
+        self._write_records(stream_name, lines)
+
+    def _write_pending_state(self) -> None:
+        state, self.pending_state = self.pending_state, None
+        super().write_state(state)
+        self.last_state = time.monotonic()
+
+    def write_state(self, state: Dict) -> None:
+        with self.state_lock:
+            self.pending_state = copy.deepcopy(state)
+            if not self._has_rows() or time.monotonic() - self.last_state >= self.checkpoint_seconds:
+                self.flush()
+
+    def flush(self) -> None:
+        """Close the open part files, announce them, then write the held
+        back STATE message."""
+        with self.state_lock:
+            for stream_name in list(self.parts):
+                self._close_part(stream_name)
+            if self.pending_state is not None:
+                self._write_pending_state()
+
+
+def create_writer(config: Mapping[str, Any]) -> MessageWriter:
+    """Return the message writer selected by the config."""
+    if config.get("output_mode") == "batch":
+        return BatchMessageWriter(
+            batch_dir=config.get("batch_dir") or "batches",
+            compression=config.get("batch_compression") or "gzip",
+            max_rows=int(config.get("batch_max_rows") or DEFAULT_BATCH_MAX_ROWS),
+            max_bytes=int(config.get("batch_max_bytes") or DEFAULT_BATCH_MAX_BYTES),
+            checkpoint_seconds=float(config.get("batch_checkpoint_seconds") or DEFAULT_BATCH_CHECKPOINT_SECONDS),
+        )
+    if not config.get("buffered_output"):
+        return MessageWriter()
+    return BufferedMessageWriter(
+        buffer_bytes=int(config.get("output_buffer_bytes") or DEFAULT_OUTPUT_BUFFER_BYTES),
+        flush_seconds=float(config.get("output_flush_seconds") or DEFAULT_OUTPUT_FLUSH_SECONDS),
+    )
+
+
+WRITER = MessageWriter()
+
+
+def set_writer(writer: MessageWriter) -> None:
+    """Replace the shared writer, writing out the previous one first."""
+    global WRITER  # pylint: disable=global-statement
+    with state_lock:
+        WRITER.flush()
+        WRITER = writer
+
+
+def write_record(stream_name: str, record: Dict, time_extracted=None) -> None:
+    """Write a RECORD message through the shared writer."""
+    WRITER.write_record(stream_name, record, time_extracted=time_extracted)
+
+
+def write_schema(stream_name: str, schema: Dict, key_properties, bookmark_properties=None) -> None:
+    """Write a SCHEMA message through the shared writer."""
+    WRITER.write_schema(stream_name, schema, key_properties, bookmark_properties)
+
+
+def write_state(state: Dict) -> None:
+    """Write a snapshot of the state through the shared writer."""
+    WRITER.write_state(state)
+
+
+def serialize_record(stream_name: str, record: Dict) -> str:
+    """Serialize a RECORD message for `write_lines`."""
+    return WRITER.serialize_record(stream_name, record)
+
+
+def write_lines(stream_name: str, lines: List[str]) -> None:
+    """Write records of a stream serialized by `serialize_record` through
+    the shared writer."""
+    WRITER.write_lines(stream_name, lines)
+
+
+def bare_records() -> bool:
+    """Whether the shared writer serializes records without their message."""
+    return WRITER.bare_records
+
+
+def write_batch(stream_name: str, encoding: Dict, manifest: List[str]) -> None:
+    """Write a BATCH message through the shared writer."""
+    WRITER.write_batch(stream_name, encoding, manifest)
+
+
+def flush() -> None:
+    """Write out the messages buffered by the shared writer."""
+    WRITER.flush()
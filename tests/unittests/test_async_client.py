@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from unittest.mock import patch
+
+from tap_youtube_analytics import async_client
+from tap_youtube_analytics.async_client import AsyncClient, AsyncEngine, get_async_engine, is_async_engine
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.entity_store import EntityStore
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsError, YoutubeAnalyticsNotFoundError
+from test_client import StandInHandler
+
+CONFIG = {
+    "client_id": "test_client_id",
+    "client_secret": "test_client_secret",
+    "refresh_token": "test_refresh_token",
+    "user_agent": "test_user_agent",
+    "engine": "async",
+    "async_max_in_flight": 8,
+}
+
+
+class MissingPathHandler(StandInHandler):
+    def do_GET(self):
+        if self.path.startswith("/youtube/v3/missing"):
+            self.send_error(404)
+            return
+        if self.path.startswith("/youtube/v3/channels"):
+            with self.server.lock:
+                self.server.if_none_match.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match"):
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        super().do_GET()
+
+
+class TestAsyncEngineConfig(unittest.TestCase):
+    def test_engine_selection(self):
+        self.assertTrue(is_async_engine({"engine": "async"}))
+        self.assertFalse(is_async_engine({}))
+        self.assertFalse(is_async_engine({"engine": "sync"}))
+
+    @unittest.skipIf(async_client.aiohttp is not None, "aiohttp is installed")
+    def test_missing_aiohttp_is_reported(self):
+        with self.assertRaises(YoutubeAnalyticsError):
+            AsyncClient(CONFIG)
+
+
+class TestAsyncEngineHandoff(unittest.TestCase):
+    def setUp(self):
+        # The engine loop without an `AsyncClient`, which needs aiohttp
+        self.engine = AsyncEngine.__new__(AsyncEngine)
+        self.engine.buffer_size = 2
+        self.engine.client = None
+        self.engine.loop = asyncio.new_event_loop()
+        self.engine.thread = threading.Thread(target=self.engine.loop.run_forever, daemon=True)
+        self.engine.thread.start()
+
+    def tearDown(self):
+        self.engine.loop.call_soon_threadsafe(self.engine.loop.stop)
+        self.engine.thread.join()
+        self.engine.loop.close()
+
+    def test_producer_waits_on_a_full_buffer(self):
+        produced = []
+
+        async def numbers(_):
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        items = self.engine.iterate(numbers)
+        self.assertEqual(next(items), 0)
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), self.engine.loop).result()
+        # The item handed over, two buffered and one waiting to be put
+        self.assertEqual(len(produced), 4)
+        self.assertEqual(list(items), list(range(1, 10)))
+
+    def test_errors_ending_the_producer_reach_the_caller(self):
+        async def stopped(_):
+            yield 1
+            raise SystemExit("stopped")
+
+        items = self.engine.iterate(stopped)
+        self.assertEqual(next(items), 1)
+        with self.assertRaises(SystemExit):
+            next(items)
+        # The loop survived
+        self.assertTrue(self.engine.loop.is_running())
+
+    def test_cancelled_producer_wakes_the_caller(self):
+        started = threading.Event()
+
+        async def endless(_):
+            yield 1
+            started.set()
+            await asyncio.sleep(60)
+            yield 2
+
+        items = self.engine.iterate(endless)
+        self.assertEqual(next(items), 1)
+        started.wait(1)
+        for task in asyncio.all_tasks(self.engine.loop):
+            self.engine.loop.call_soon_threadsafe(task.cancel)
+        with self.assertRaises(asyncio.CancelledError):
+            next(items)
+
+
+@unittest.skipUnless(async_client.aiohttp is not None, "requires aiohttp")
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MissingPathHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.token_requests = 0
+        self.server.connections = set()
+        self.server.authorizations = set()
+        self.server.if_none_match = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = Client(CONFIG)
+        self.client.base_url = f"{url}/youtube/v3"
+        self.client.reporting_url = f"{url}/v1"
+        self.client.google_token_uri = f"{url}/token"
+
+    def tearDown(self):
+        self.client.async_engine.close()
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_concurrent_requests_share_one_token(self):
+        engine = get_async_engine(self.client)
+
+        async def fetch_all(client):
+            responses = await asyncio.gather(*[
+                client.get(path="videos", params={"i": i}, endpoint="videos") for i in range(100)
+            ])
+            for response in responses:
+                yield response
+
+        paths = [response["path"] for response in engine.iterate(fetch_all)]
+
+        self.assertEqual(paths, [f"/youtube/v3/videos?i={i}" for i in range(100)])
+        self.assertEqual(self.server.token_requests, 1)
+        self.assertEqual(self.server.authorizations, {"Bearer stand_in_token"})
+
+    def test_error_mapping(self):
+        engine = get_async_engine(self.client)
+
+        async def fetch_missing(client):
+            yield await client.get(path="missing", endpoint="missing")
+
+        with self.assertRaises(YoutubeAnalyticsNotFoundError):
+            list(engine.iterate(fetch_missing))
+
+    def test_304_without_stored_response_is_requested_again(self):
+        self.client.entity_store = EntityStore(":memory:")
+        engine = get_async_engine(self.client)
+
+        async def fetch_channels(client):
+            yield await client.get(path="channels", params={"id": "c1"}, endpoint="channels")
+
+        with patch.object(self.client.entity_store, "get_etag", return_value="page-etag"), \
+                patch.object(self.client.entity_store, "load_response", return_value=None):
+            responses = list(engine.iterate(fetch_channels))
+
+        self.assertEqual(responses, [{"path": "/youtube/v3/channels?id=c1"}])
+        self.assertEqual(self.server.if_none_match, ["page-etag", None])
+        self.assertEqual(self.client.quota.units, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
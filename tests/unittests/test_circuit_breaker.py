@@ -0,0 +1,97 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from requests.exceptions import ConnectionError
+
+from tap_youtube_analytics.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsCircuitOpenError,
+    YoutubeAnalyticsNotFoundError,
+    YoutubeAnalyticsQuotaBudgetError,
+)
+from tap_youtube_analytics.sync import run_stream
+
+
+def call(breaker, error=None):
+    with breaker.call():
+        if error:
+            raise error
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("download.test", failure_threshold=2, cooldown=60)
+        with self.assertRaises(ConnectionError):
+            call(breaker, ConnectionError())
+        call(breaker)
+        with self.assertRaises(ConnectionError):
+            call(breaker, ConnectionError())
+        self.assertEqual(breaker.state, CLOSED)
+
+        with self.assertRaises(ConnectionError):
+            call(breaker, ConnectionError())
+        self.assertEqual(breaker.state, OPEN)
+        with self.assertRaises(YoutubeAnalyticsCircuitOpenError):
+            call(breaker)
+
+    def test_errors_other_than_outages_do_not_count(self):
+        breaker = CircuitBreaker("videos", failure_threshold=1)
+        with self.assertRaises(YoutubeAnalyticsNotFoundError):
+            call(breaker, YoutubeAnalyticsNotFoundError())
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_half_opens_to_probe_after_the_cooldown(self):
+        breaker = CircuitBreaker("download.test", failure_threshold=1, cooldown=0.05)
+        with self.assertRaises(ConnectionError):
+            call(breaker, ConnectionError())
+        time.sleep(0.06)
+
+        # One probe at a time; a failed probe opens the circuit again
+        breaker.before_call()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        with self.assertRaises(YoutubeAnalyticsCircuitOpenError):
+            breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        time.sleep(0.06)
+        call(breaker)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.failures, 0)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(CircuitBreakers({}).enabled)
+        with patch.object(Client, "check_api_credentials"):
+            self.assertIsNone(Client({"user_agent": None}).retry_policy.breakers)
+
+
+@patch("tap_youtube_analytics.retry.time.sleep")
+class TestClientCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        with patch.object(Client, "check_api_credentials"):
+            self.client = Client({"user_agent": None, "circuit_breaker_failures": 3})
+        self.client._Client__access_token = "valid_token"
+        self.client._Client__expires = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    @patch("requests.Session.request", side_effect=ConnectionError())
+    def test_open_circuit_ends_retries_and_fails_later_calls_fast(self, request, sleep):
+        url = "https://download.test/r1"
+        with self.assertRaises(YoutubeAnalyticsCircuitOpenError):
+            list(self.client.get_report(url, endpoint=url))
+        self.assertEqual(request.call_count, 3)
+
+        with self.assertRaises(YoutubeAnalyticsCircuitOpenError):
+            list(self.client.get_report("https://download.test/r2", endpoint="https://download.test/r2"))
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+
+class TestRunStream(unittest.TestCase):
+    def test_stream_stopped_by_an_open_circuit_is_deferred(self):
+        stream = MagicMock(tap_stream_id="channel_basic")
+        for error in (YoutubeAnalyticsCircuitOpenError("down"), YoutubeAnalyticsQuotaBudgetError("spent")):
+            stream.sync.side_effect = error
+            self.assertIsNone(run_stream(stream, {}, MagicMock()))
@@ -1,4 +1,9 @@
+import gzip
+import json
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta, timezone
 from tap_youtube_analytics.client import Client
@@ -18,6 +23,13 @@ class TestClient(unittest.TestCase):
         with patch.object(Client, 'check_api_credentials'):
             self.client = Client(self.config)
 
+    def test_exit_shuts_the_report_pool_down_on_every_python(self):
+        for version, kwargs in (((3, 9), {"cancel_futures": True}), ((3, 7), {})):
+            self.client.report_pool = MagicMock()
+            with patch("tap_youtube_analytics.client.sys.version_info", version):
+                self.client.__exit__(None, None, None)
+            self.client.report_pool.shutdown.assert_called_once_with(**kwargs)
+
     @patch("requests.Session.post")
     def test_check_api_credentials_success(self, mock_post):
         """Test successful API credential check"""
@@ -62,7 +74,7 @@ class TestClient(unittest.TestCase):
         result = self.client.get(path="test_path")
         self.assertEqual(result, {"data": "test_data"})
 
-    @patch('backoff.expo', return_value=0)  # Disable backoff delays
+    @patch("tap_youtube_analytics.retry.time.sleep")  # Disable retry delays
     @patch("requests.Session.request")
     def test_make_request_rate_limit_error(self, mock_request, mock_backoff):
         """Test rate limit error handling"""
@@ -78,7 +90,7 @@ class TestClient(unittest.TestCase):
         with self.assertRaises(YoutubeAnalyticsRateLimitError):
             self.client.get(path="test_path")
 
-    @patch('backoff.expo', return_value=0)  # Disable backoff delays
+    @patch("tap_youtube_analytics.retry.time.sleep")  # Disable retry delays
     @patch("requests.Session.request")
     def test_make_request_server_error(self, mock_request, mock_backoff):
         """Test server error handling"""
@@ -93,3 +105,176 @@ class TestClient(unittest.TestCase):
 
         with self.assertRaises(YoutubeAnalyticsBackoffError):
             self.client.get(path="test_path")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Keep-alive stand-in for the token host and the Data API"""
+    protocol_version = "HTTP/1.1"
+    # Buffer headers and body into one write, flushed after each request
+    wbufsize = -1
+
+    def _send_json(self, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.token_requests += 1
+        self._send_json({"access_token": "stand_in_token", "expires_in": 3600})
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+            self.server.authorizations.add(self.headers.get("Authorization"))
+        self._send_json({"path": self.path})
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClientConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.token_requests = 0
+        self.server.connections = set()
+        self.server.authorizations = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = Client({
+            "client_id": "test_client_id",
+            "client_secret": "test_client_secret",
+            "refresh_token": "test_refresh_token",
+            "user_agent": "test_user_agent",
+            "http_pool_size": 4,
+        })
+        self.client.base_url = f"{url}/youtube/v3"
+        self.client.reporting_url = f"{url}/v1"
+        self.client.google_token_uri = f"{url}/token"
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_shared_client_under_load(self):
+        """Test many threads share one token and a bounded keep-alive pool"""
+        def fetch(i):
+            return self.client.get(path="videos", params={"i": i}, endpoint="videos")
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            responses = list(executor.map(fetch, range(400)))
+
+        self.assertEqual([r["path"] for r in responses],
+                         [f"/youtube/v3/videos?i={i}" for i in range(400)])
+        self.assertEqual(self.server.token_requests, 1)
+        self.assertEqual(self.server.authorizations, {"Bearer stand_in_token"})
+        self.assertLessEqual(len(self.server.connections), 4)
+
+
+class ReportHandler(StandInHandler):
+    """Stand-in report host, answering `Range` requests when allowed"""
+    REPORT = b"date,views\n20230101,1\n20230102,2\r\n\n20230103,3\n20230104,4"
+
+    def do_GET(self):
+        body, status = self.REPORT, 200
+        range_header = self.headers.get("Range")
+        with self.server.lock:
+            self.server.ranges.append(range_header)
+            self.server.encodings.append(self.headers.get("Accept-Encoding"))
+        gzipped = self.server.gzip and "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if gzipped:
+            body = gzip.compress(body)
+        if range_header and self.server.accept_ranges:
+            # A server may answer from a range start of its own choosing
+            start = max(int(range_header[len("bytes="):].rstrip("-")) - self.server.range_shift, 0)
+            body, status = body[start:], 206
+            content_range = f"bytes {start}-{start + len(body) - 1}/{start + len(body)}"
+        self.send_response(status)
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        if status == 206:
+            self.send_header("Content-Range", content_range)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestReportResume(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ReportHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.token_requests = 0
+        self.server.ranges = []
+        self.server.accept_ranges = True
+        self.server.encodings = []
+        self.server.gzip = False
+        self.server.range_shift = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = Client({
+            "client_id": "test_client_id",
+            "client_secret": "test_client_secret",
+            "refresh_token": "test_refresh_token",
+            "user_agent": "test_user_agent",
+        })
+        self.client.google_token_uri = f"{self.url}/token"
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def read(self, position=None):
+        return list(self.client.get_report_from(f"{self.url}/report", position))
+
+    def test_rows_carry_their_positions(self):
+        rows = self.read()
+
+        self.assertEqual([row["views"] for row, _ in rows], ["1", "2", "3", "4"])
+        self.assertEqual([position["rows"] for _, position in rows], [1, 2, 3, 4])
+        self.assertEqual(rows[1][1]["offset"], ReportHandler.REPORT.index(b"\n\n") + 1)
+        self.assertEqual(rows[-1][1]["offset"], len(ReportHandler.REPORT))
+        self.assertEqual(rows[0][1]["header"], "date,views")
+
+    def test_resume_with_ranged_read(self):
+        position = self.read()[1][1]
+        rows = self.read(position)
+
+        self.assertEqual([(row["date"], p["rows"]) for row, p in rows], [("20230103", 3), ("20230104", 4)])
+        self.assertEqual(self.server.ranges[-1], f"bytes={position['offset']}-")
+
+    def test_reports_are_requested_uncompressed(self):
+        # Offsets count report bytes, which a compressed answer would not
+        self.server.gzip = True
+        position = self.read()[1][1]
+        rows = self.read(position)
+
+        self.assertEqual(set(self.server.encodings), {"identity"})
+        self.assertEqual([(row["date"], p["rows"]) for row, p in rows], [("20230103", 3), ("20230104", 4)])
+
+    def test_resume_reads_the_whole_report_when_the_range_starts_elsewhere(self):
+        position = self.read()[1][1]
+        self.server.range_shift = 3
+        rows = self.read(position)
+
+        self.assertEqual(self.server.ranges[-2:], [f"bytes={position['offset']}-", None])
+        self.assertEqual([(row["date"], p["rows"]) for row, p in rows], [("20230103", 3), ("20230104", 4)])
+        self.assertEqual(rows[-1][1]["offset"], len(ReportHandler.REPORT))
+
+    def test_resume_skips_rows_when_ranges_are_ignored(self):
+        self.server.accept_ranges = False
+        position = self.read()[1][1]
+        rows = self.read(position)
+
+        self.assertEqual([(row["date"], p["rows"]) for row, p in rows], [("20230103", 3), ("20230104", 4)])
+        self.assertEqual(rows[-1][1]["offset"], len(ReportHandler.REPORT))
@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from tap_youtube_analytics.concurrency import AIMDLimit, ConcurrencyController
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsBadRequestError, YoutubeAnalyticsRateLimitError
+
+
+class TestAIMDLimit(unittest.TestCase):
+    def test_additive_increase_up_to_maximum(self):
+        limit = AIMDLimit("api", initial=2, maximum=4)
+        for _ in range(20):
+            with limit.slot():
+                pass
+        self.assertEqual(limit.limit, 4)
+
+    def test_slow_requests_and_other_errors_hold_the_limit(self):
+        limit = AIMDLimit("api", initial=2, latency_target=0.01)
+        with limit.slot():
+            time.sleep(0.02)
+        with self.assertRaises(YoutubeAnalyticsBadRequestError):
+            with limit.slot():
+                raise YoutubeAnalyticsBadRequestError()
+        self.assertEqual(limit.limit, 2)
+        self.assertEqual(limit.in_flight, 0)
+
+    def test_multiplicative_decrease_once_per_burst_of_errors(self):
+        limit = AIMDLimit("download", initial=8)
+        for _ in range(3):
+            with self.assertRaises(YoutubeAnalyticsRateLimitError):
+                with limit.slot():
+                    raise YoutubeAnalyticsRateLimitError()
+        self.assertEqual(limit.limit, 4)
+
+        limit.last_decrease -= 10
+        with self.assertRaises(YoutubeAnalyticsRateLimitError):
+            with limit.slot():
+                raise YoutubeAnalyticsRateLimitError()
+        self.assertEqual(limit.limit, 2)
+
+    def test_requests_in_flight_stay_within_the_limit(self):
+        limit = AIMDLimit("api", initial=3, maximum=3)
+        lock = threading.Lock()
+        in_flight, peak = [0], [0]
+
+        def request():
+            with limit.slot():
+                with lock:
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                time.sleep(0.01)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 3)
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def test_pools_are_separate_and_disabled_by_default(self):
+        controller = ConcurrencyController({"adaptive_concurrency": True, "adaptive_concurrency_initial": 4})
+        with controller.slot("download"):
+            self.assertEqual(controller.limits["download"].in_flight, 1)
+            self.assertEqual(controller.limits["api"].in_flight, 0)
+
+        controller = ConcurrencyController({})
+        with controller.slot("api"):
+            self.assertEqual(controller.limits["api"].in_flight, 0)
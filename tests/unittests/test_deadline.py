@@ -0,0 +1,92 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from singer.catalog import Catalog
+
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.deadline import RunDeadline
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsDeadlineError
+from tap_youtube_analytics.streams.playlists import Playlists
+from tap_youtube_analytics.sync import sync
+
+
+class TestRunDeadline(unittest.TestCase):
+    def test_never_reached_without_max_run_seconds(self):
+        deadline = RunDeadline({})
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.stop_before("stream"))
+        deadline.check("page")
+
+    def test_stops_new_units_once_reached(self):
+        deadline = RunDeadline({"max_run_seconds": 0.05})
+        self.assertFalse(deadline.stop_before("page"))
+        time.sleep(0.06)
+
+        self.assertTrue(deadline.stop_before("report"))
+        with self.assertRaises(YoutubeAnalyticsDeadlineError):
+            deadline.check("page")
+        self.assertTrue(deadline.stopped)
+
+    def test_no_page_is_requested_past_the_deadline(self):
+        client = MagicMock()
+        client.deadline = RunDeadline({"max_run_seconds": 1})
+        client.deadline.started -= 2
+        stream = Playlists(client, MagicMock())
+
+        with self.assertRaises(YoutubeAnalyticsDeadlineError):
+            next(stream._fetch_pages("https://api.test/playlists", {}, "playlists"))
+        client.get.assert_not_called()
+
+
+@patch("singer.write_state")
+@patch("tap_youtube_analytics.streams.STREAMS")
+class TestSyncDeadline(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock(spec=Client)
+        self.client.deadline = RunDeadline({"max_run_seconds": 60})
+        self.catalog = MagicMock(spec=Catalog)
+        catalog_streams = []
+        for name in ("stream_a", "stream_b"):
+            catalog_stream = MagicMock()
+            catalog_stream.stream = name
+            catalog_streams.append(catalog_stream)
+        self.catalog.get_selected_streams.return_value = catalog_streams
+        self.instances = {}
+
+    def build(self, sync_side_effect):
+        def factory(stream_name):
+            def build(client, catalog_stream):
+                instance = MagicMock(tap_stream_id=stream_name, children=[], child_to_sync=[])
+                instance.parent = None
+                instance.client = client
+                instance.sync.side_effect = lambda state, transformer: sync_side_effect(stream_name)
+                self.instances[stream_name] = instance
+                return instance
+            return build
+        return factory
+
+    def test_stream_stopped_at_the_deadline_stays_currently_syncing(self, streams, write_state):
+        def stream_sync(stream_name):
+            self.client.deadline.started -= 120
+            self.client.deadline.check("page")
+
+        streams.__getitem__.side_effect = self.build(stream_sync)
+        streams.__contains__.return_value = True
+        state = {}
+        sync(self.client, {}, self.catalog, state)
+
+        self.assertEqual(state["currently_syncing"], "stream_a")
+        self.assertNotIn("stream_b", self.instances)
+        write_state.assert_called_with(state)
+
+    def test_no_stream_starts_past_the_deadline_in_a_parallel_sync(self, streams, write_state):
+        self.client.deadline.started -= 120
+        streams.__getitem__.side_effect = self.build(lambda stream_name: 1)
+        streams.__contains__.return_value = True
+        state = {}
+        sync(self.client, {"max_parallel_streams": 2}, self.catalog, state)
+
+        for instance in self.instances.values():
+            instance.sync.assert_not_called()
+        self.assertNotIn("currently_syncing_streams", state)
@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.entity_store import EntityStore
+
+
+class TestEntityStore(unittest.TestCase):
+    def setUp(self):
+        self.store = EntityStore(":memory:", mode="skip")
+        self.key = EntityStore.request_key("https://data.test/videos", {"id": "v1,v2"})
+        self.response = {
+            "etag": "page-etag",
+            "nextPageToken": "next",
+            "items": [
+                {"kind": "youtube#video", "id": "v1", "etag": "e1"},
+                {"kind": "youtube#video", "id": "v2", "etag": "e2"},
+            ],
+        }
+
+    def test_not_modified_response_is_rebuilt_from_store(self):
+        self.store.save_response(self.key, self.response)
+
+        self.assertEqual(self.store.get_etag(self.key), "page-etag")
+        cached = self.store.load_response(self.key)
+
+        self.assertEqual(cached, self.response)
+        self.assertTrue(self.store.is_unchanged({"kind": "youtube#video", "id": "v1"}))
+        self.assertEqual(self.store.stats["hits"], 1)
+
+    def test_changed_entities_are_not_marked_unchanged(self):
+        self.store.save_response(self.key, self.response)
+        self.store.save_response(self.key, {
+            "etag": "page-etag-2",
+            "items": [
+                {"kind": "youtube#video", "id": "v1", "etag": "e1"},
+                {"kind": "youtube#video", "id": "v2", "etag": "e2-changed"},
+            ],
+        })
+
+        self.assertTrue(self.store.is_unchanged({"kind": "youtube#video", "id": "v1"}))
+        self.assertFalse(self.store.is_unchanged({"kind": "youtube#video", "id": "v2"}))
+        # Search results have no plain string id and are never tracked
+        self.assertFalse(self.store.is_unchanged({"kind": "youtube#searchResult", "id": {"videoId": "v1"}}))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            EntityStore(":memory:", mode="sometimes")
+
+
+class TestClientConditionalRequests(unittest.TestCase):
+    def setUp(self):
+        config = {
+            "client_id": "test_client_id",
+            "client_secret": "test_client_secret",
+            "refresh_token": "test_refresh_token",
+            "user_agent": "test_user_agent",
+            "entity_store_path": ":memory:",
+        }
+        self.client = Client(config)
+        self.client._Client__access_token = "valid_token"
+        self.client._Client__expires = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    @patch("requests.Session.request")
+    def test_sends_if_none_match_and_serves_304_from_store(self, mock_request):
+        first = MagicMock(status_code=200)
+        first.json.return_value = {
+            "etag": "page-etag",
+            "items": [{"kind": "youtube#channel", "id": "c1", "etag": "e1"}],
+        }
+        second = MagicMock(status_code=304)
+        mock_request.side_effect = [first, second]
+
+        self.client.get(path="channels", params={"id": "c1"})
+        result = self.client.get(path="channels", params={"id": "c1"})
+
+        self.assertNotIn("If-None-Match", mock_request.call_args_list[0].kwargs["headers"])
+        self.assertEqual(mock_request.call_args_list[1].kwargs["headers"]["If-None-Match"], "page-etag")
+        self.assertEqual(result["items"], [{"kind": "youtube#channel", "id": "c1", "etag": "e1"}])
+
+    @patch("requests.Session.request")
+    def test_304_without_stored_response_is_requested_again(self, mock_request):
+        not_modified = MagicMock(status_code=304)
+        full = MagicMock(status_code=200)
+        full.json.return_value = {"etag": "page-etag", "items": [{"kind": "youtube#channel", "id": "c1", "etag": "e1"}]}
+        responses, sent_headers = iter([not_modified, full]), []
+        mock_request.side_effect = lambda *args, headers=None, **kwargs: sent_headers.append(dict(headers)) or next(responses)
+
+        with patch.object(self.client.entity_store, "get_etag", return_value="page-etag"), \
+                patch.object(self.client.entity_store, "load_response", return_value=None):
+            result = self.client.get(path="channels", params={"id": "c1"})
+
+        self.assertEqual(result, full.json.return_value)
+        self.assertEqual(sent_headers[0]["If-None-Match"], "page-etag")
+        self.assertNotIn("If-None-Match", sent_headers[1])
+        self.assertEqual(self.client.quota.units, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from tap_youtube_analytics.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def test_items_keep_order_and_dropped_items_are_skipped(self):
+        written = []
+        Pipeline("test_stream", {"double": 2, "write": 2}).run(
+            range(100),
+            [("drop_odd", lambda i: None if i % 2 else i), ("double", lambda i: i * 2)],
+            written.append,
+        )
+        self.assertEqual(written, [i * 2 for i in range(0, 100, 2)])
+
+    def test_stage_error_is_raised(self):
+        def fail(item):
+            if item == 5:
+                raise ValueError("bad item")
+            return item
+
+        written = []
+        with self.assertRaises(ValueError):
+            Pipeline("test_stream", {"fail": 1}).run(range(1000), [("fail", fail)], written.append)
+        self.assertEqual(written, [0, 1, 2, 3, 4])
+
+    def test_errors_ending_a_step_thread_reach_the_sink(self):
+        def source():
+            yield 1
+            raise SystemExit(2)
+
+        def interrupt(item):
+            if item == 3:
+                raise KeyboardInterrupt
+            return item
+
+        written = []
+        with self.assertRaises(SystemExit):
+            Pipeline("test_stream").run(source(), [("noop", lambda i: i)], written.append)
+        self.assertEqual(written, [1])
+
+        with self.assertRaises(KeyboardInterrupt):
+            Pipeline("test_stream").run(range(10), [("interrupt", interrupt)], lambda item: None)
+
+    def test_sink_error_stops_the_pipeline(self):
+        def write(item):
+            raise OSError("broken pipe")
+
+        with self.assertRaises(OSError):
+            Pipeline("test_stream").run(iter(range(10 ** 6)), [("noop", lambda i: i)], write)
+
+    @patch("tap_youtube_analytics.pipeline.metrics.log")
+    def test_occupancy_shows_the_slow_stage(self, mock_log):
+        def slow(item):
+            time.sleep(0.002)
+            return item
+
+        Pipeline("test_stream", {"slow": 10, "write": 10}).run(range(100), [("slow", slow)], lambda item: None)
+
+        occupancy = {call.args[1].tags["stage"]: call.args[1].value for call in mock_log.call_args_list}
+        self.assertGreater(occupancy["slow"], 0.5)
+        self.assertLess(occupancy["write"], 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from singer.catalog import Catalog
+from test_streams import build_catalog_entry
+
+import tap_youtube_analytics
+from tap_youtube_analytics.deadline import RunDeadline
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsNotFoundError
+from tap_youtube_analytics.planner import plan
+from tap_youtube_analytics.quota import QuotaAccountant
+from tap_youtube_analytics.streams.playlist_items import PlaylistItems
+from tap_youtube_analytics.streams.reports import ChannelBasicStream
+from tap_youtube_analytics.streams.videos import Videos
+
+
+class TestSyncPlanner(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.config = {"start_date": "2023-01-01T00:00:00Z", "channel_ids": "chan1,chan2"}
+        self.client.reporting_url = "https://reports.test"
+        self.client.base_url = "https://data.test"
+        self.client.deadline = RunDeadline({})
+        self.client.quota = QuotaAccountant({})
+        self.jobs = [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]
+        self.reports = [
+            {"id": f"r{i}", "downloadUrl": f"https://download.test/r{i}", "createTime": f"2023-01-0{i + 1}T00:00:00Z"}
+            for i in (3, 1, 2)
+        ]
+        self.report_params = []
+
+        def get(url=None, path=None, params=None, endpoint=None):
+            if path:
+                self.client.quota.charge(f"{self.client.base_url}/{path}")
+                return self.data_api(path, params)
+            if endpoint.endswith("/jobs"):
+                return {"jobs": self.jobs}
+            self.report_params.append(dict(params))
+            return {"reports": self.reports}
+
+        self.client.get.side_effect = get
+        self.client.report_size.side_effect = lambda url, endpoint=None: {"r1": 100, "r2": 200}.get(url[-2:])
+
+    def data_api(self, path, params):
+        if path == "channels":
+            return {"items": [
+                {"id": "chan1", "statistics": {"videoCount": "120"}},
+                {"id": "chan2", "statistics": {"videoCount": "0"}},
+            ]}
+        if params["channelId"] == "chan1" and "pageToken" not in params:
+            return {"items": [{"id": "pl1", "contentDetails": {"itemCount": 120}}], "nextPageToken": "next"}
+        return {"items": [{"id": f"pl-{params['channelId']}", "contentDetails": {"itemCount": 0}}]}
+
+    def plan(self, stream_classes, state=None):
+        catalog = Catalog([build_catalog_entry(stream_class) for stream_class in stream_classes])
+        with patch("tap_youtube_analytics.streams.abstracts.write_state") as write_state:
+            sync_plan = plan(self.client, catalog, state or {})
+        write_state.assert_not_called()
+        return sync_plan
+
+    def test_plans_the_reports_of_the_sync_window(self):
+        state = {"bookmarks": {"channel_basic": {
+            "published_at": "2023-01-01T00:00:00Z",
+            "in_progress": {"effective_start": "2023-01-01T00:00:00Z", "create_time": "2023-01-02T00:00:00Z", "report_id": "r1"},
+            "failed_reports": [{"report_id": "r0", "create_time": "2022-12-31T00:00:00Z",
+                                "download_url": "https://download.test/r0", "attempts": 1}],
+        }}}
+
+        stream_plan = self.plan([ChannelBasicStream], state)["streams"]["channel_basic"]
+
+        # r1 was completed by the interrupted sync; r0 failed in an earlier run
+        self.assertEqual(self.report_params[0]["createdAfter"], "2023-01-01T00:00:00Z")
+        self.assertEqual(
+            [call.args[0][-2:] for call in self.client.report_size.call_args_list],
+            ["r2", "r3", "r0"],
+        )
+        self.assertEqual(stream_plan["reports"], 3)
+        self.assertEqual(stream_plan["bytes"], 200)
+        self.assertEqual(stream_plan["reports_without_size"], 2)
+        # A page of jobs, a page of reports and the downloads
+        self.assertEqual(stream_plan["requests"], 5)
+        self.assertEqual(stream_plan["quota_units"], 0)
+        self.client.get_report.assert_not_called()
+
+    def test_does_not_create_missing_jobs(self):
+        self.jobs = []
+
+        sync_plan = self.plan([ChannelBasicStream])
+
+        self.client.post.assert_not_called()
+        self.assertEqual(sync_plan["streams"]["channel_basic"]["reports"], 0)
+        # The sync would list the jobs, then create one
+        self.assertEqual(sync_plan["streams"]["channel_basic"]["requests"], 2)
+
+    def test_sizing_errors_leave_the_report_unsized(self):
+        self.client.report_size.side_effect = YoutubeAnalyticsNotFoundError("gone")
+
+        stream_plan = self.plan([ChannelBasicStream])["streams"]["channel_basic"]
+
+        self.assertEqual(stream_plan["reports"], 3)
+        self.assertEqual(stream_plan["reports_without_size"], 3)
+
+    def test_estimates_data_api_requests_and_quota(self):
+        sync_plan = self.plan([Videos, PlaylistItems])
+
+        # playlist_items is synced under playlists, which lists 3 pages
+        self.assertEqual(list(sync_plan["streams"]), ["videos", "playlists", "playlist_items"])
+        videos = sync_plan["streams"]["videos"]
+        # chan1: 3 search pages and 3 lookups of 120 videos; chan2: 1 search
+        self.assertEqual(videos["requests"], 7)
+        self.assertEqual(videos["quota_units"], 4 * 100 + 3)
+        self.assertEqual(videos["estimate"], "upper_bound")
+        self.assertEqual(sync_plan["streams"]["playlists"]["quota_units"], 3)
+        self.assertEqual(sync_plan["streams"]["playlist_items"]["requests"], 3 + 1 + 1)
+        self.assertEqual(sync_plan["totals"]["quota_units"], 403 + 3 + 5)
+        # A channels request and the playlist pages
+        self.assertEqual(sync_plan["planning"], {"requests": 4, "quota_units": 4})
+
+
+class TestPlanMode(unittest.TestCase):
+    @patch("tap_youtube_analytics.sync")
+    @patch("tap_youtube_analytics.plan", return_value={"streams": {}})
+    @patch("tap_youtube_analytics.Client")
+    @patch("tap_youtube_analytics.singer.utils.parse_args")
+    def test_plan_flag_emits_the_plan_instead_of_syncing(self, parse_args, client, plan_mock, sync):
+        parse_args.return_value = MagicMock(
+            config={"refresh_token": "token"}, state=None, discover=False, catalog=MagicMock()
+        )
+        stdout = io.StringIO()
+        with patch("sys.argv", ["tap-youtube-analytics", "--config", "config.json", "--plan"]) as argv, \
+                patch("sys.stdout", stdout):
+            tap_youtube_analytics.main()
+            self.assertNotIn("--plan", argv)
+
+        sync.assert_not_called()
+        plan_mock.assert_called_once()
+        self.assertEqual(json.loads(stdout.getvalue()), {"streams": {}})
@@ -0,0 +1,103 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsQuotaBudgetError
+from tap_youtube_analytics.pipeline import Pipeline
+from tap_youtube_analytics.prefetch import prefetch
+from tap_youtube_analytics.quota import QuotaAccountant, quota_day
+from tap_youtube_analytics.sync import prioritize_streams, run_stream
+
+BASE_URL = "https://www.googleapis.com/youtube/v3"
+
+
+class TestQuotaAccountant(unittest.TestCase):
+    def test_units_per_resource_and_stream(self):
+        quota = QuotaAccountant({"quota_costs": {"videos": 2}})
+        with quota.stream("videos"):
+            quota.charge(f"{BASE_URL}/search")
+            quota.charge(f"{BASE_URL}/videos")
+        quota.charge(f"{BASE_URL}/channels")
+
+        self.assertEqual(quota.units, 103)
+        self.assertEqual(quota.stream_units, {"videos": 102, "other": 1})
+
+    def test_units_of_worker_threads_are_charged_to_their_stream(self):
+        quota = QuotaAccountant({})
+
+        def pages(count):
+            for _ in range(count):
+                quota.charge(f"{BASE_URL}/search")
+                yield {}
+
+        # Two streams syncing, so the stream cannot be told by elimination
+        with quota.stream("channels"), quota.stream("videos"):
+            self.assertEqual(len(list(prefetch(pages(2), 2))), 2)
+            Pipeline("videos").run(pages(1), [("transform", lambda item: item)], lambda item: None)
+
+        self.assertEqual(quota.stream_units, {"videos": 300})
+
+    def test_run_budget_refuses_requests_over_budget(self):
+        quota = QuotaAccountant({"quota_run_budget": 150})
+        quota.charge(f"{BASE_URL}/search")
+        with self.assertRaises(YoutubeAnalyticsQuotaBudgetError):
+            quota.charge(f"{BASE_URL}/search")
+        quota.charge(f"{BASE_URL}/playlistItems")
+
+        self.assertEqual(quota.units, 101)
+
+    def test_daily_budget_is_carried_in_state_for_the_quota_day(self):
+        state = {"quota_usage": {"date": quota_day(), "units": 99}}
+        quota = QuotaAccountant({"quota_daily_budget": 100})
+        quota.load_state(state)
+
+        quota.charge(f"{BASE_URL}/videos")
+        with self.assertRaises(YoutubeAnalyticsQuotaBudgetError):
+            quota.charge(f"{BASE_URL}/videos")
+        self.assertEqual(state["quota_usage"]["units"], 100)
+
+        # A new quota day starts from zero
+        state["quota_usage"]["date"] = quota_day(datetime.now(timezone.utc) - timedelta(days=1))
+        quota.charge(f"{BASE_URL}/videos")
+        self.assertEqual(state["quota_usage"], {"date": quota_day(), "units": 1})
+
+    def test_quota_day_is_pacific(self):
+        self.assertEqual(quota_day(datetime(2024, 3, 2, 7, 59, tzinfo=timezone.utc)), "2024-03-01")
+        self.assertEqual(quota_day(datetime(2024, 3, 2, 8, 0, tzinfo=timezone.utc)), "2024-03-02")
+
+    @patch("requests.Session.request")
+    def test_client_charges_data_api_requests_only(self, mock_request):
+        with patch.object(Client, "check_api_credentials"):
+            client = Client({"user_agent": "test_user_agent", "quota_run_budget": 100})
+        client._Client__access_token = "valid_token"
+        client._Client__expires = datetime.now(timezone.utc) + timedelta(hours=1)
+        mock_request.return_value = MagicMock(status_code=200, json=MagicMock(return_value={}))
+
+        client.get(path="videos", endpoint="videos")
+        client.get(url=client.reporting_url, path="jobs", endpoint="jobs")
+        with self.assertRaises(YoutubeAnalyticsQuotaBudgetError):
+            client.get(path="search", endpoint="search_videos")
+
+        self.assertEqual(client.quota.units, 1)
+        self.assertEqual(mock_request.call_count, 2)
+
+
+class TestQuotaPriority(unittest.TestCase):
+    def test_priority_streams_first_after_interrupted_stream(self):
+        streams = ["channels", "playlists", "videos", "channel_basic"]
+        config = {"quota_priority": "videos, playlists"}
+
+        self.assertEqual(prioritize_streams(streams, config, {}),
+                         ["videos", "playlists", "channels", "channel_basic"])
+        self.assertEqual(prioritize_streams(streams, config, {"currently_syncing": "channels"}),
+                         ["channels", "videos", "playlists", "channel_basic"])
+        self.assertEqual(prioritize_streams(streams, {}, {}), streams)
+
+    def test_stream_over_budget_is_skipped(self):
+        stream = MagicMock(tap_stream_id="videos")
+        stream.client.quota = QuotaAccountant({})
+        stream.sync.side_effect = YoutubeAnalyticsQuotaBudgetError("over budget")
+
+        self.assertIsNone(run_stream(stream, {}, MagicMock()))
+        self.assertEqual(stream.client.quota.active_streams, [])
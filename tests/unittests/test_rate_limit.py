@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.exceptions import YoutubeAnalyticsRateLimitError
+from tap_youtube_analytics.rate_limit import RateLimiter, TokenBucket, google_error_reasons, parse_retry_after
+
+DATA_URL = "https://www.googleapis.com/youtube/v3/videos"
+REPORT_URL = "https://youtubereporting.googleapis.com/v1/jobs"
+
+
+def rate_limit_error(reason):
+    return {"error": {"code": 403, "errors": [{"domain": "usageLimits", "reason": reason}]}}
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_requests_are_paced_at_the_rate_after_the_burst(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        waits = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertAlmostEqual(waits[2], 0.1, delta=0.01)
+        self.assertAlmostEqual(waits[3], 0.2, delta=0.01)
+        self.assertAlmostEqual(bucket.wait_seconds, 0.3, delta=0.02)
+
+    def test_unlimited_bucket_only_waits_out_pauses(self):
+        bucket = TokenBucket()
+        self.assertEqual(bucket.reserve(), 0)
+        bucket.pause(0.5)
+        self.assertAlmostEqual(bucket.reserve(), 0.5, delta=0.05)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rates_per_host(self):
+        limiter = RateLimiter({"rate_limits": {"www.googleapis.com": 5}})
+        self.assertEqual(limiter.bucket(DATA_URL).rate, 5)
+        self.assertIsNone(limiter.bucket(REPORT_URL).rate)
+
+    def test_rate_limited_responses(self):
+        self.assertTrue(RateLimiter.is_rate_limited(429))
+        self.assertTrue(RateLimiter.is_rate_limited(403, rate_limit_error("userRateLimitExceeded")))
+        self.assertFalse(RateLimiter.is_rate_limited(403, rate_limit_error("quotaExceeded")))
+        self.assertFalse(RateLimiter.is_rate_limited(403, {}))
+        self.assertEqual(google_error_reasons(rate_limit_error("rateLimitExceeded")), ["rateLimitExceeded"])
+
+    def test_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_throttle_holds_every_caller_of_the_host(self):
+        limiter = RateLimiter({})
+        limiter.throttle(DATA_URL, "0.3")
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire, args=(DATA_URL,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertEqual(limiter.reserve(REPORT_URL), 0)
+
+
+class TestClientRateLimit(unittest.TestCase):
+    def setUp(self):
+        with patch.object(Client, "check_api_credentials"):
+            self.client = Client({"user_agent": "test_user_agent", "rate_limit_pause_seconds": 2})
+
+    def test_403_rate_limit_reason_pauses_host_and_is_retryable(self):
+        response = MagicMock(status_code=403, headers={})
+        response.json.return_value = rate_limit_error("rateLimitExceeded")
+
+        with self.assertRaises(YoutubeAnalyticsRateLimitError):
+            self.client._raise_for_rate_limit(DATA_URL, response)
+        self.assertAlmostEqual(self.client.rate_limiter.reserve(DATA_URL), 2, delta=0.1)
+
+    def test_429_uses_retry_after(self):
+        response = MagicMock(status_code=429, headers={"Retry-After": "1"})
+        response.json.return_value = {}
+
+        with self.assertRaises(YoutubeAnalyticsRateLimitError):
+            self.client._raise_for_rate_limit(REPORT_URL, response)
+        self.assertAlmostEqual(self.client.rate_limiter.reserve(REPORT_URL), 1, delta=0.1)
+
+    def test_other_errors_are_left_to_the_error_mapping(self):
+        response = MagicMock(status_code=403, headers={})
+        response.json.return_value = rate_limit_error("forbidden")
+
+        self.client._raise_for_rate_limit(DATA_URL, response)
+        self.assertEqual(self.client.rate_limiter.reserve(DATA_URL), 0)
@@ -0,0 +1,175 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from requests.exceptions import ConnectionError
+
+from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.deadline import RunDeadline
+from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsBadRequestError,
+    YoutubeAnalyticsInternalServerError,
+    YoutubeAnalyticsNotImplementedError,
+    YoutubeAnalyticsQuotaExceededError,
+    YoutubeAnalyticsRateLimitError,
+)
+from tap_youtube_analytics.retry import RetryPolicy, classify, endpoint_name
+
+
+def google_error(code, reason):
+    return {"error": {"code": code, "errors": [{"domain": "youtube.quota", "reason": reason}]}}
+
+
+def failing(errors, result="ok"):
+    """A function raising `errors` in turn, then returning `result`."""
+    function = MagicMock(side_effect=list(errors) + [result])
+    function.__name__ = "function"
+    return function
+
+
+@patch("tap_youtube_analytics.retry.time.sleep")
+class TestRetryPolicy(unittest.TestCase):
+    def test_classification(self, _):
+        self.assertEqual(classify(YoutubeAnalyticsRateLimitError()), "rate_limited")
+        self.assertEqual(classify(YoutubeAnalyticsInternalServerError()), "server_error")
+        self.assertEqual(classify(ConnectionError()), "network")
+        self.assertIsNone(classify(YoutubeAnalyticsNotImplementedError()))
+        self.assertIsNone(classify(YoutubeAnalyticsQuotaExceededError()))
+        self.assertIsNone(classify(YoutubeAnalyticsBadRequestError()))
+
+    def test_retries_until_success_with_decorrelated_jitter(self, sleep):
+        policy = RetryPolicy({"retry_base_delay_seconds": 1, "retry_max_delay_seconds": 5})
+        function = failing([YoutubeAnalyticsInternalServerError()] * 4)
+
+        self.assertEqual(policy.call("videos", function, 1, key="value"), "ok")
+        function.assert_called_with(1, key="value")
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 4)
+        self.assertTrue(all(1 <= delay <= 5 for delay in delays))
+        self.assertEqual(policy.stats["videos"].retries, 4)
+        self.assertAlmostEqual(policy.stats["videos"].seconds, sum(delays))
+
+    def test_errors_not_retried_are_raised_at_once(self, sleep):
+        policy = RetryPolicy({})
+        function = failing([YoutubeAnalyticsQuotaExceededError()])
+
+        with self.assertRaises(YoutubeAnalyticsQuotaExceededError):
+            policy.call("videos", function)
+        self.assertEqual(function.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_gives_up_after_max_tries(self, _):
+        policy = RetryPolicy({"retry_max_tries": 3})
+        function = failing([YoutubeAnalyticsRateLimitError()] * 5)
+
+        with self.assertRaises(YoutubeAnalyticsRateLimitError):
+            policy.call("videos", function)
+        self.assertEqual(function.call_count, 3)
+
+    def test_does_not_retry_past_the_request_deadline(self, sleep):
+        policy = RetryPolicy({"retry_base_delay_seconds": 2, "retry_request_deadline_seconds": 1})
+        function = failing([ConnectionError()])
+
+        with self.assertRaises(ConnectionError):
+            policy.call("videos", function)
+        sleep.assert_not_called()
+
+    def test_downloads_have_their_own_deadline(self, sleep):
+        # A long download is retried past the request deadline
+        policy = RetryPolicy({"retry_base_delay_seconds": 2, "retry_request_deadline_seconds": 1})
+        self.assertEqual(policy.call_download("download", failing([ConnectionError()])), "ok")
+        self.assertEqual(sleep.call_count, 1)
+
+        policy = RetryPolicy({"retry_base_delay_seconds": 2, "retry_download_deadline_seconds": 1})
+        with self.assertRaises(ConnectionError):
+            policy.call_download("download", failing([ConnectionError()]))
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_does_not_retry_past_the_stream_deadline(self, sleep):
+        policy = RetryPolicy({"retry_base_delay_seconds": 2, "retry_stream_deadline_seconds": 1})
+        with policy.stream("videos"):
+            with self.assertRaises(ConnectionError):
+                policy.call("videos", failing([ConnectionError()]))
+        sleep.assert_not_called()
+
+        # Outside of the stream only the request deadline applies
+        self.assertEqual(policy.call("videos", failing([ConnectionError()])), "ok")
+
+    def test_does_not_retry_past_the_run_deadline(self, sleep):
+        policy = RetryPolicy({"retry_base_delay_seconds": 2}, run_deadline=RunDeadline({"max_run_seconds": 1}))
+        with self.assertRaises(ConnectionError):
+            policy.call_download("download", failing([ConnectionError()]))
+        sleep.assert_not_called()
+
+        # Without max_run_seconds the run deadline is never reached
+        policy = RetryPolicy({"retry_base_delay_seconds": 2}, run_deadline=RunDeadline({}))
+        self.assertEqual(policy.call("videos", failing([ConnectionError()])), "ok")
+
+    def test_retry_budget_is_shared_by_the_run(self, _):
+        policy = RetryPolicy({"retry_budget_min_retries": 2, "retry_budget_ratio": 0.25})
+        self.assertEqual(policy.call("videos", failing([ConnectionError()] * 2)), "ok")
+
+        # 2 requests allow 2 + 0.25 * 2 retries, and 3 requests 2.75
+        self.assertEqual(policy.call("channels", failing([ConnectionError()])), "ok")
+        with self.assertRaises(ConnectionError):
+            policy.call("channels", failing([ConnectionError()]))
+        self.assertEqual(policy.retries, 3)
+
+    def test_stats_per_endpoint(self, _):
+        policy = RetryPolicy({})
+        policy.call_download("https://youtubereporting.googleapis.com/v1/media/report", failing([ConnectionError()]))
+        policy.call("https://www.googleapis.com/youtube/v3/channels", failing([ConnectionError()]))
+        policy.call("https://youtubereporting.googleapis.com/v1/jobs", failing([ConnectionError()]))
+        policy.call("videos", failing([YoutubeAnalyticsRateLimitError(), ConnectionError()]))
+
+        self.assertEqual(endpoint_name(None), "other")
+        # Report downloads by host, other URLs by path
+        self.assertEqual(policy.stats["youtubereporting.googleapis.com"].retries, 1)
+        self.assertEqual(policy.stats["/youtube/v3/channels"].retries, 1)
+        self.assertEqual(policy.stats["/v1/jobs"].retries, 1)
+        self.assertEqual(policy.stats["videos"].reasons, {"rate_limited": 1, "network": 1})
+        with patch("tap_youtube_analytics.retry.metrics.log") as log:
+            policy.log_stats()
+        points = [(call.args[1].metric, call.args[1].tags, call.args[1].value) for call in log.call_args_list]
+        self.assertIn(("retry_count", {"endpoint": "videos", "reason": "network"}, 1), points)
+
+
+@patch("tap_youtube_analytics.retry.time.sleep")
+class TestClientRetries(unittest.TestCase):
+    def setUp(self):
+        with patch.object(Client, "check_api_credentials"):
+            self.client = Client({"user_agent": "test_user_agent", "rate_limit_pause_seconds": 0.01})
+        self.client._Client__access_token = "valid_token"
+        self.client._Client__expires = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    def response(self, status_code, body=None):
+        response = MagicMock(status_code=status_code, headers={})
+        response.json.return_value = body or {}
+        return response
+
+    @patch("requests.Session.request")
+    def test_quota_exceeded_is_not_retried(self, request, _):
+        request.return_value = self.response(403, google_error(403, "quotaExceeded"))
+
+        with self.assertRaises(YoutubeAnalyticsQuotaExceededError):
+            self.client.get(path="videos", endpoint="videos")
+        self.assertEqual(request.call_count, 1)
+
+    @patch("requests.Session.request")
+    def test_not_implemented_is_not_retried(self, request, _):
+        request.return_value = self.response(501)
+
+        with self.assertRaises(YoutubeAnalyticsNotImplementedError):
+            self.client.get(path="videos", endpoint="videos")
+        self.assertEqual(request.call_count, 1)
+
+    @patch("requests.Session.request")
+    def test_server_errors_and_rate_limits_are_retried(self, request, _):
+        request.side_effect = [
+            self.response(503),
+            self.response(403, google_error(403, "userRateLimitExceeded")),
+            self.response(200, {"items": []}),
+        ]
+
+        self.assertEqual(self.client.get(path="videos", endpoint="videos"), {"items": []})
+        self.assertEqual(self.client.retry_policy.stats["videos"].reasons, {"server_error": 1, "rate_limited": 1})
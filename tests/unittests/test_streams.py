@@ -1,4 +1,11 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
 import unittest
+from urllib.parse import unquote, urlparse
 from unittest.mock import MagicMock, patch
 
 from dateutil import parser
@@ -7,7 +14,19 @@ from singer.catalog import CatalogEntry, Schema
 
 import humps
 
+from tap_youtube_analytics import parquet_export
+from tap_youtube_analytics.deadline import RunDeadline
+from tap_youtube_analytics.exceptions import (
+    YoutubeAnalyticsCircuitOpenError,
+    YoutubeAnalyticsDeadlineError,
+    YoutubeAnalyticsNotFoundError,
+)
+from tap_youtube_analytics.prefetch import prefetch
+from tap_youtube_analytics.report_workers import get_report_pool, shard_file, transform_shard
+from tap_youtube_analytics.streams.abstracts import get_page_size
+from tap_youtube_analytics.streams.channels import Channels, fetch_channel_batches
 from tap_youtube_analytics.streams.playlist_items import PlaylistItems
+from tap_youtube_analytics.streams.playlists import Playlists
 from tap_youtube_analytics.streams.reports import ChannelBasicStream
 from tap_youtube_analytics.streams.videos import Videos
 
@@ -25,8 +44,8 @@ class DummyCounter:
     def __exit__(self, exc_type, exc_val, exc_tb):
         return False
 
-    def increment(self):
-        self.value += 1
+    def increment(self, amount=1):
+        self.value += amount
 
 
 def build_catalog_entry(stream_cls, extra_properties=None):
@@ -77,6 +96,7 @@ class TestReportStream(unittest.TestCase):
         self.client = MagicMock()
         self.client.config = {"start_date": "2023-01-01T00:00:00Z"}
         self.client.reporting_url = "https://reports.test"
+        self.client.deadline = RunDeadline({})
         self.client.base_url = "https://data.test"
 
         self.catalog_entry = build_catalog_entry(ChannelBasicStream)
@@ -167,8 +187,9 @@ class TestReportStream(unittest.TestCase):
         self.assertEqual(write_args[0], ChannelBasicStream.tap_stream_id)
         self.assertEqual(write_args[1]["report_id"], "r1")
 
-        # Bookmark should be updated to the report create time
-        mock_write_bookmark.assert_called_once()
+        # Bookmark should be updated to the report create time, after the
+        # report and at the end of the stream
+        self.assertEqual(mock_write_bookmark.call_count, 2)
         self.assertEqual(write_calls["stream"], ChannelBasicStream.tap_stream_id)
         self.assertEqual(write_calls["key"], "create_time")
         parsed_bookmark = parser.isoparse(write_calls["value"])
@@ -176,6 +197,264 @@ class TestReportStream(unittest.TestCase):
         self.assertEqual(parsed_bookmark, expected_ts)
 
         self.assertEqual(result, 1)
+        self.assertEqual(stream.page_stats["job_create"]["requests"], 1)
+
+    def test_failed_job_creation_is_not_counted(self):
+        self.client.get.side_effect = lambda url=None, params=None, endpoint=None: {"jobs": []}
+        self.client.post.side_effect = YoutubeAnalyticsNotFoundError("system managed")
+        stream = ChannelBasicStream(self.client, self.catalog_entry)
+
+        with self.assertRaises(YoutubeAnalyticsNotFoundError):
+            stream._find_job_id()
+        self.assertNotIn("job_create", stream.page_stats)
+
+    def test_pipeline_sync_writes_records_in_order(self):
+        self.client.config = {"start_date": "2023-01-01T00:00:00Z", "pipeline": True}
+        self.client.get.side_effect = lambda url=None, params=None, endpoint=None: (
+            {"jobs": [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]}
+            if endpoint.endswith("/jobs") else
+            {"reports": [{"id": "r1", "downloadUrl": "https://download.test/r1", "createTime": "2023-01-03T00:00:00Z"}]}
+        )
+        self.client.get_report.side_effect = lambda **kwargs: iter([
+            {"date": "2023-01-02", "channel_id": "chan", "video_id": f"vid{i}"} for i in range(50)
+        ])
+
+        written = []
+        state = {}
+        stream = ChannelBasicStream(self.client, self.catalog_entry)
+        with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+            with patch("tap_youtube_analytics.streams.abstracts.write_lines", side_effect=lambda _, lines: written.extend(lines)):
+                result = stream.sync(state=state, transformer=self.transformer)
+
+        self.assertEqual(result, 50)
+        self.assertEqual([json.loads(line)["record"]["video_id"] for line in written], [f"vid{i}" for i in range(50)])
+        self.assertEqual(parser.isoparse(state["bookmarks"]["channel_basic"]["create_time"]),
+                         parser.isoparse("2023-01-03T00:00:00Z"))
+
+    def test_pipeline_checkpoints_reports_without_written_rows(self):
+        self.client.config = {"start_date": "2023-01-01T00:00:00Z", "pipeline": True}
+        reports = [
+            {"id": f"r{i}", "downloadUrl": f"https://download.test/r{i}", "createTime": f"2023-01-0{i + 2}T00:00:00Z"}
+            for i in (1, 2)
+        ]
+        self.client.get.side_effect = lambda url=None, params=None, endpoint=None: (
+            {"jobs": [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]}
+            if endpoint.endswith("/jobs") else {"reports": reports}
+        )
+        self.client.get_report.side_effect = lambda url=None, endpoint=None: iter([
+            {"date": "2023-01-02", "channel_id": "chan", "video_id": f"vid{i}"} for i in range(2)
+        ])
+
+        stream = ChannelBasicStream(self.client, self.catalog_entry)
+        transform_report_item = stream._transform_report_item
+        # Every row of r2 falls before the sync window
+        filtered = lambda item, *args: None if item[1]["id"] == "r2" else transform_report_item(item, *args)
+        with patch.object(stream, "_transform_report_item", side_effect=filtered), \
+                patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()), \
+                patch("tap_youtube_analytics.streams.abstracts.write_lines"), \
+                patch("tap_youtube_analytics.streams.abstracts.write_state"), \
+                patch.object(stream, "_write_report_checkpoint", wraps=stream._write_report_checkpoint) as checkpoint:
+            result = stream.sync(state={}, transformer=self.transformer)
+
+        self.assertEqual(result, 2)
+        self.assertEqual([(c.args[2]["id"], c.args[3]) for c in checkpoint.call_args_list], [("r1", 2), ("r2", 2)])
+
+
+class TestReportCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.transformer = MagicMock()
+        self.transformer.transform.side_effect = lambda record, *_: record
+
+        self.client = MagicMock()
+        self.client.config = {"start_date": "2023-01-01T00:00:00Z"}
+        self.client.reporting_url = "https://reports.test"
+        self.client.deadline = RunDeadline({})
+        # Listed out of order; created on 2023-01-02, -03 and -04
+        self.reports = [
+            {"id": f"r{i}", "downloadUrl": f"https://download.test/r{i}", "createTime": f"2023-01-0{i + 1}T00:00:00Z"}
+            for i in (3, 1, 2)
+        ]
+        self.report_params = []
+
+        def get(url=None, params=None, endpoint=None):
+            if endpoint.endswith("/jobs"):
+                return {"jobs": [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]}
+            self.report_params.append(dict(params))
+            return {"reports": self.reports}
+
+        self.client.get.side_effect = get
+        self.client.get_report.side_effect = lambda url=None, endpoint=None: iter([
+            {"date": f"2023-01-0{url[-1]}", "channel_id": "chan", "video_id": f"vid{i}"} for i in range(2)
+        ])
+
+    def sync(self, state, fail_on_report=None, fail_after=None):
+        states, written = [], []
+
+        def write_record(stream_name, record):
+            if record["report_id"] == fail_on_report or len(written) == fail_after:
+                raise RuntimeError("interrupted")
+            written.append(record["report_id"])
+
+        stream = ChannelBasicStream(self.client, build_catalog_entry(ChannelBasicStream))
+        with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+            with patch("tap_youtube_analytics.streams.abstracts.write_record", side_effect=write_record):
+                with patch("tap_youtube_analytics.streams.abstracts.write_state",
+                           side_effect=lambda s: states.append(json.loads(json.dumps(s)))):
+                    try:
+                        stream.sync(state=state, transformer=self.transformer)
+                    except (RuntimeError, YoutubeAnalyticsCircuitOpenError, YoutubeAnalyticsDeadlineError):
+                        pass
+        return states, written
+
+    def test_interrupted_sync_resumes_after_last_completed_report(self):
+        states, written = self.sync({}, fail_on_report="r3")
+
+        self.assertEqual(written, ["r1", "r1", "r2", "r2"])
+        self.assertEqual(len(states), 2)
+        bookmark = states[-1]["bookmarks"]["channel_basic"]
+        self.assertEqual(bookmark["create_time"], "2023-01-03T00:00:00.000000Z")
+        self.assertEqual(bookmark["in_progress"]["report_id"], "r2")
+        self.assertEqual(bookmark["in_progress"]["create_time"], "2023-01-03T00:00:00.000000Z")
+
+        state = states[-1]
+        _, written = self.sync(state)
+
+        self.assertEqual(written, ["r3", "r3"])
+        self.assertEqual(self.client.get_report.call_count, 4)
+        self.assertEqual(self.report_params[0]["createdAfter"], self.report_params[1]["createdAfter"])
+        self.assertEqual(state["bookmarks"]["channel_basic"], {"create_time": "2023-01-04T00:00:00.000000Z"})
+
+    def test_interrupted_report_resumes_after_last_emitted_row(self):
+        self.client.config["report_resume_rows"] = 1
+        positions = []
+
+        def get_report_from(url, position=None, endpoint=None):
+            positions.append((url[-2:], position))
+            for i in range((position or {}).get("rows", 0), 3):
+                row = {"date": f"2023-01-0{url[-1]}", "channel_id": "chan", "video_id": f"vid{i}"}
+                yield row, {"rows": i + 1, "offset": 10 * (i + 1), "header": "date,channel_id,video_id"}
+
+        self.client.get_report_from.side_effect = get_report_from
+        states, written = self.sync({}, fail_after=4)
+
+        self.assertEqual(written, ["r1", "r1", "r1", "r2"])
+        marker = states[-1]["bookmarks"]["channel_basic"]["in_progress"]
+        self.assertEqual(marker["report_id"], "r1")
+        self.assertEqual(marker["partial"], {
+            "report_id": "r2", "rows_emitted": 1, "offset": 10, "header": "date,channel_id,video_id",
+        })
+
+        positions.clear()
+        _, written = self.sync(states[-1])
+
+        self.assertEqual(written, ["r2", "r2", "r3", "r3", "r3"])
+        self.assertEqual(positions, [
+            ("r2", {"rows": 1, "offset": 10, "header": "date,channel_id,video_id"}),
+            ("r3", None),
+        ])
+
+    def test_open_circuit_stops_the_stream_instead_of_skipping_reports(self):
+        get_report = self.client.get_report.side_effect
+
+        def failing_get_report(url=None, endpoint=None):
+            if url.endswith("r2"):
+                raise YoutubeAnalyticsCircuitOpenError("download.test is down")
+            return get_report(url=url, endpoint=endpoint)
+
+        self.client.get_report.side_effect = failing_get_report
+        states, written = self.sync({})
+
+        # No bookmark past r2: the next run syncs it again
+        self.assertEqual(written, ["r1", "r1"])
+        self.assertEqual(states, [])
+        self.assertEqual(self.client.get_report.call_count, 2)
+
+    def test_deadline_stops_before_the_next_report_and_writes_state(self):
+        # Throttled checkpoints are written when the deadline stops the sync
+        self.client.config["report_checkpoint_rows"] = 100
+        self.client.deadline = RunDeadline({"max_run_seconds": 60})
+        reports_started = []
+
+        def stop_before(unit):
+            # The deadline passes while the first report is emitted
+            if unit == "report":
+                reports_started.append(unit)
+            self.client.deadline.stopped = len(reports_started) > 1
+            return self.client.deadline.stopped
+
+        with patch.object(self.client.deadline, "stop_before", side_effect=stop_before):
+            states, written = self.sync({})
+
+        self.assertEqual(written, ["r1", "r1"])
+        self.assertEqual(len(states), 1)
+        self.assertEqual(states[0]["bookmarks"]["channel_basic"]["in_progress"]["report_id"], "r1")
+        self.assertTrue(self.client.deadline.stopped)
+
+        self.client.deadline = RunDeadline({})
+        _, written = self.sync(states[0])
+        self.assertEqual(written, ["r2", "r2", "r3", "r3"])
+
+    def fail_downloads(self, report_id, times):
+        get_report = self.client.get_report.side_effect
+        failures = [times]
+
+        def failing_get_report(url=None, endpoint=None):
+            if url.endswith(report_id[-1]) and failures[0]:
+                failures[0] -= 1
+                raise RuntimeError("connection reset")
+            return get_report(url=url, endpoint=endpoint)
+
+        self.client.get_report.side_effect = failing_get_report
+
+    def test_failed_report_is_retried_after_the_others(self):
+        self.fail_downloads("r2", times=1)
+        state = {}
+        _, written = self.sync(state)
+
+        self.assertEqual(written, ["r1", "r1", "r3", "r3", "r2", "r2"])
+        self.client.reset_connections.assert_called_once_with("https://download.test/r2")
+        self.assertEqual(state["bookmarks"]["channel_basic"], {"create_time": "2023-01-04T00:00:00.000000Z"})
+
+    def test_bookmark_stays_before_a_report_that_keeps_failing(self):
+        self.fail_downloads("r2", times=2)
+        state = {}
+        _, written = self.sync(state)
+
+        self.assertEqual(written, ["r1", "r1", "r3", "r3"])
+        bookmark = state["bookmarks"]["channel_basic"]
+        self.assertEqual(bookmark["create_time"], "2023-01-02T23:59:59.000000Z")
+        self.assertEqual(bookmark["failed_reports"], [{
+            "report_id": "r2", "create_time": "2023-01-03T00:00:00.000000Z",
+            "download_url": "https://download.test/r2", "attempts": 1, "error": "connection reset",
+        }])
+
+        # The next run lists r2 again, and the retry pass skips it
+        _, written = self.sync(state)
+
+        self.assertEqual(written, ["r2", "r2", "r3", "r3"])
+        self.assertEqual(state["bookmarks"]["channel_basic"], {"create_time": "2023-01-04T00:00:00.000000Z"})
+
+    def test_report_is_given_up_on_after_its_attempts(self):
+        self.client.config["failed_report_attempts"] = 2
+        # The download and its retry fail in each run
+        self.fail_downloads("r2", times=6)
+        state = {}
+        _, written = self.sync(state)
+        self.assertEqual(written, ["r1", "r1", "r3", "r3"])
+        self.assertEqual(state["bookmarks"]["channel_basic"]["failed_reports"][0]["attempts"], 1)
+
+        # Given up on at the end of its second failing run, after its retry
+        _, written = self.sync(state)
+        self.assertEqual(written, ["r3", "r3"])
+        self.assertEqual(state["bookmarks"]["channel_basic"], {"create_time": "2023-01-04T00:00:00.000000Z"})
+
+    def test_checkpoints_are_throttled_by_rows(self):
+        self.client.config["report_checkpoint_rows"] = 3
+        states, written = self.sync({})
+
+        self.assertEqual(len(written), 6)
+        self.assertEqual(len(states), 1)
+        self.assertEqual(states[0]["bookmarks"]["channel_basic"]["in_progress"]["report_id"], "r2")
 
 
 class TestPlaylistItemsStream(unittest.TestCase):
@@ -250,6 +529,51 @@ class TestPlaylistItemsStream(unittest.TestCase):
         self.assertEqual(parsed, parser.isoparse("2023-01-02T00:00:00Z"))
         self.assertEqual(result, 1)
 
+    def test_items_fan_out_from_single_playlists_listing(self):
+        state = {
+            "bookmarks": {
+                PlaylistItems.tap_stream_id: {"published_at": "2023-01-01T00:00:00Z"}
+            }
+        }
+        requested = []
+
+        def mocked_get_records(stream_self, isreport=False):
+            requested.append((stream_self.path, dict(stream_self.params)))
+            if stream_self.path == "playlists":
+                return iter([{"id": "playlist_1"}, {"id": "playlist_2"}])
+            published = {
+                "playlist_1": "2023-01-05T00:00:00Z",
+                "playlist_2": "2023-01-02T00:00:00Z",
+            }[stream_self.params["playlistId"]]
+            return iter([{
+                "id": f"item_{stream_self.params['playlistId']}",
+                "snippet": {"publishedAt": published, "published_at": published},
+                "published_at": published,
+            }])
+
+        playlists = Playlists(self.client, build_catalog_entry(Playlists))
+        items = PlaylistItems(self.client, self.catalog_entry)
+        playlists.child_to_sync.append(items)
+
+        with patch("tap_youtube_analytics.streams.abstracts.BaseStream.get_records", new=mocked_get_records):
+            with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+                with patch("tap_youtube_analytics.streams.playlists.write_record"):
+                    with patch("tap_youtube_analytics.streams.playlist_items.write_record") as mock_write_record:
+                        playlists.sync(state=state, transformer=self.transformer)
+
+        listing_calls = [params for path, params in requested if path == "playlists"]
+        self.assertEqual(len(listing_calls), 1)
+        self.assertEqual(listing_calls[0]["channelId"], "channel_a")
+
+        # The second playlist is still filtered against the bookmark at the
+        # start of the sync, not the one advanced by the first playlist
+        written_ids = [record_call.args[1]["id"] for record_call in mock_write_record.call_args_list]
+        self.assertEqual(written_ids, ["item_playlist_1", "item_playlist_2"])
+        self.assertEqual(
+            state["bookmarks"][PlaylistItems.tap_stream_id]["published_at"],
+            "2023-01-05T00:00:00Z",
+        )
+
 
 class TestVideosStream(unittest.TestCase):
     def setUp(self):
@@ -341,5 +665,518 @@ class TestVideosStream(unittest.TestCase):
         self.assertEqual(result, 2)
 
 
+class TestChannelsStream(unittest.TestCase):
+    def test_channels_listed_in_batches_of_fifty(self):
+        channel_ids = [f"chan_{i}" for i in range(120)]
+        client = MagicMock()
+        client.config = {
+            "channel_ids": ", ".join(channel_ids + ["chan_0", "chan_1"]),
+            "start_date": "2023-01-01T00:00:00Z",
+        }
+        client.base_url = "https://data.test"
+
+        def get_side_effect(url=None, path=None, params=None, endpoint=None):
+            return {"items": [
+                {"id": cid} for cid in params["id"].split(",")
+            ]}
+
+        client.get.side_effect = get_side_effect
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda record, *_: record
+        stream = Channels(client, build_catalog_entry(Channels))
+
+        with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+            with patch("tap_youtube_analytics.streams.abstracts.write_record") as mock_write_record:
+                result = stream.sync(state={}, transformer=transformer)
+
+        requested = [call.kwargs["params"]["id"].split(",") for call in client.get.call_args_list]
+        self.assertEqual([len(batch) for batch in requested], [50, 50, 20])
+        self.assertEqual(result, 120)
+        written_ids = [record_call.args[1]["id"] for record_call in mock_write_record.call_args_list]
+        self.assertEqual(written_ids, channel_ids)
+
+        self.assertEqual(stream.page_stats, {"channels": {"requests": 3, "items": 120}})
+
+    def test_deadline_stops_before_the_next_channel_batch(self):
+        channel_ids = [f"chan_{i}" for i in range(120)]
+        client = MagicMock()
+        client.config = {"channel_ids": ",".join(channel_ids)}
+        client.deadline = RunDeadline({"max_run_seconds": 60})
+
+        def get_side_effect(url=None, path=None, params=None, endpoint=None):
+            # The deadline passes while the first batch is requested
+            client.deadline.started -= 60
+            return {"items": [{"id": cid} for cid in params["id"].split(",")]}
+
+        client.get.side_effect = get_side_effect
+        listed = []
+        with self.assertRaises(YoutubeAnalyticsDeadlineError):
+            for item in fetch_channel_batches(client, channel_ids, {"part": "id"}):
+                listed.append(item["id"])
+
+        self.assertEqual(client.get.call_count, 1)
+        self.assertEqual(listed, channel_ids[:50])
+        self.assertTrue(client.deadline.stopped)
+
+
+class TestPagePrefetch(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.base_url = "https://data.test"
+        self.pages = {
+            None: {"items": [{"id": "a"}, {"id": "b"}], "nextPageToken": "p2"},
+            "p2": {"items": [{"id": "c"}], "nextPageToken": "p3"},
+            "p3": {"items": [{"id": "d"}]},
+        }
+        self.client.get.side_effect = lambda url=None, path=None, params=None, endpoint=None: self.pages[params.get("pageToken")]
+
+    def test_prefetch_yields_pages_in_order(self):
+        for depth in (0, 1, 2):
+            self.client.config = {"channel_ids": "channel_a", "prefetch_pages": depth}
+            stream = Playlists(self.client, build_catalog_entry(Playlists))
+            stream.params = {"channelId": "channel_a"}
+
+            ids = [record["id"] for record in stream.get_records()]
+
+            self.assertEqual(ids, ["a", "b", "c", "d"])
+            self.assertEqual(stream.page_stats["playlists"], {"requests": 3, "items": 4})
+            # Each page is requested with its own params; the stream's are untouched
+            self.assertEqual(stream.params, {"channelId": "channel_a"})
+
+    def test_prefetch_reraises_client_errors(self):
+        self.client.config = {"channel_ids": "channel_a", "prefetch_pages": 2}
+        self.pages["p2"] = ValueError("boom")
+
+        def get_side_effect(url=None, path=None, params=None, endpoint=None):
+            page = self.pages[params.get("pageToken")]
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        self.client.get.side_effect = get_side_effect
+        stream = Playlists(self.client, build_catalog_entry(Playlists))
+
+        records = stream.get_records()
+        self.assertEqual(next(records)["id"], "a")
+        self.assertEqual(next(records)["id"], "b")
+        with self.assertRaises(ValueError):
+            next(records)
+
+    def test_prefetch_reraises_errors_ending_the_thread(self):
+        def pages():
+            yield "first"
+            raise SystemExit("stopped")
+
+        records = prefetch(pages(), 1)
+        self.assertEqual(next(records), "first")
+        with self.assertRaises(SystemExit):
+            next(records)
+
+
+class TestReportWorkers(unittest.TestCase):
+    HEADER = "date,channel_id,video_id,live_or_on_demand,subscribed_status,country_code,views\n"
+
+    def report_csv(self, report_index, rows):
+        return self.HEADER + "".join(
+            f"2023-01-0{report_index},chan,vid{i},on_demand,subscribed,US,{i}\n" for i in range(rows)
+        )
+
+    def test_shards_end_at_line_ends(self):
+        content = self.report_csv(1, 50).encode("utf-8")
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(content)
+        try:
+            shards = shard_file(file.name, len(self.HEADER), len(content), shard_bytes=100)
+        finally:
+            os.remove(file.name)
+
+        self.assertEqual(shards[0][0], len(self.HEADER))
+        self.assertEqual(shards[-1][1], len(content))
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(content[end - 1:end], b"\n")
+
+    def test_sync_emits_records_in_order_and_bookmarks_per_report(self):
+        client = MagicMock()
+        client.config = {"start_date": "2023-01-01T00:00:00Z", "report_workers": 2, "report_shard_bytes": 200}
+        client.reporting_url = "https://reports.test"
+        client.deadline = RunDeadline({})
+        client.report_pool = None
+        reports = [
+            {"id": f"r{i}", "downloadUrl": f"https://download.test/r{i}", "createTime": f"2023-01-0{i + 1}T00:00:00Z"}
+            for i in (1, 2)
+        ]
+
+        def get_side_effect(url=None, params=None, endpoint=None):
+            if endpoint.endswith("/jobs"):
+                return {"jobs": [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]}
+            return {"reports": reports}
+
+        def download(url, path, endpoint=None):
+            content = self.report_csv(int(url[-1]), 20).encode("utf-8")
+            with open(path, "wb") as file:
+                file.write(content)
+            return len(content)
+
+        client.get.side_effect = get_side_effect
+        client.download_report_file.side_effect = download
+
+        written, states = [], []
+        stream = ChannelBasicStream(client, build_catalog_entry(ChannelBasicStream))
+        state = {}
+        with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+            with patch("tap_youtube_analytics.streams.abstracts.write_lines", side_effect=lambda _, lines: written.extend(lines)):
+                with patch("tap_youtube_analytics.streams.abstracts.write_state",
+                           side_effect=lambda s: states.append(json.loads(json.dumps(s)))):
+                    result = stream.sync(state=state, transformer=MagicMock())
+
+        records = [json.loads(line)["record"] for line in written]
+        self.assertEqual(result, 40)
+        self.assertEqual([(r["create_time"], r["video_id"]) for r in records],
+                         [(f"2023-01-0{i + 1}T00:00:00Z", f"vid{j}") for i in (1, 2) for j in range(20)])
+        self.assertEqual(
+            [s["bookmarks"]["channel_basic"]["create_time"] for s in states],
+            ["2023-01-02T00:00:00.000000Z", "2023-01-03T00:00:00.000000Z"],
+        )
+        self.assertEqual(stream.page_stats["report_download"], {"requests": 2, "items": 40})
+
+        # One pool of spawned workers serves the streams of the sync
+        pool = client.report_pool
+        self.addCleanup(pool.shutdown)
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+        self.assertIs(get_report_pool(client, 2), pool)
+
+    def test_rows_split_on_line_ends_only(self):
+        content = (self.HEADER + "2023-01-01,chan,vid\x85one,on_demand,subscribed,US,1\r\n"
+                   "2023-01-01,chan,vid\u2028two,on_demand,subscribed,US,2\n").encode("utf-8")
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        catalog_entry = build_catalog_entry(ChannelBasicStream)
+
+        lines, row_count, _ = transform_shard({
+            "path": file.name, "start": len(self.HEADER), "end": len(content),
+            "fieldnames": self.HEADER.strip().split(","), "stream": "channel_basic",
+            "schema": catalog_entry.schema.to_dict(), "metadata": metadata.to_map(catalog_entry.metadata),
+            "dimensions": [], "report": {"id": "r1"}, "replication_key": "date",
+            "effective_start": "2023-01-01T00:00:00Z",
+        })
+
+        self.assertEqual(row_count, 2)
+        self.assertEqual([json.loads(line)["record"]["video_id"] for line in lines], ["vid\x85one", "vid\u2028two"])
+
+
+@unittest.skipUnless(parquet_export.pyarrow is not None, "requires pyarrow")
+class TestParquetExport(unittest.TestCase):
+    def test_reports_are_exported_by_date_with_batch_and_state(self):
+        import pyarrow.parquet
+
+        output_dir = tempfile.mkdtemp()
+        client = MagicMock()
+        client.config = {"start_date": "2023-01-01T00:00:00Z", "report_output": "parquet", "parquet_dir": output_dir}
+        client.reporting_url = "https://reports.test"
+        client.deadline = RunDeadline({})
+        reports = [
+            {"id": f"r{i}", "downloadUrl": f"https://download.test/r{i}", "createTime": f"2023-01-0{i + 1}T00:00:00Z"}
+            for i in (1, 2)
+        ]
+        client.get.side_effect = lambda url=None, params=None, endpoint=None: (
+            {"jobs": [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]}
+            if endpoint.endswith("/jobs") else {"reports": reports}
+        )
+        client.get_report.side_effect = lambda url=None, endpoint=None: iter([
+            {"date": f"2023010{url[-1]}", "channel_id": "chan", "video_id": "vid", "views": "7"},
+        ])
+
+        batches, states = [], []
+        stream = ChannelBasicStream(client, build_catalog_entry(ChannelBasicStream, {
+            "report_id": {"type": ["null", "string"]},
+            "date": {"type": ["null", "string"], "format": "date-time"},
+            "views": {"type": ["null", "integer"]},
+        }))
+        with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+            with patch("tap_youtube_analytics.streams.abstracts.write_batch",
+                       side_effect=lambda *args: batches.append(args)):
+                with patch("tap_youtube_analytics.streams.abstracts.write_state",
+                           side_effect=lambda s: states.append(json.loads(json.dumps(s)))):
+                    result = stream.sync(state={}, transformer=MagicMock())
+
+        self.assertEqual(result, 2)
+        self.assertEqual([len(manifest) for _, _, manifest in batches], [1, 1])
+        self.assertEqual(batches[0][1], {"format": "parquet", "compression": "snappy"})
+        self.assertIn("/channel_basic/date=2023-01-01/r1.parquet", unquote(batches[0][2][0]))
+
+        table = pyarrow.parquet.read_table(unquote(urlparse(batches[1][2][0]).path))
+        row = table.to_pylist()[0]
+        self.assertEqual(row["report_id"], "r2")
+        self.assertEqual(row["views"], 7)
+        self.assertEqual(row["date"].isoformat(), "2023-01-02T00:00:00+00:00")
+        self.assertEqual(str(table.schema.field("date").type), "timestamp[us, tz=UTC]")
+        self.assertEqual(
+            [s["bookmarks"]["channel_basic"]["create_time"] for s in states],
+            ["2023-01-02T00:00:00.000000Z", "2023-01-03T00:00:00.000000Z"],
+        )
+
+
+class TestParquetPartitionDate(unittest.TestCase):
+    def test_report_dates_are_partitioned_as_iso_dates(self):
+        self.assertEqual(parquet_export.partition_date("20230101"), "2023-01-01")
+        self.assertEqual(parquet_export.partition_date("2023-01-01T00:00:00Z"), "2023-01-01")
+        self.assertIsNone(parquet_export.partition_date(""))
+        self.assertIsNone(parquet_export.partition_date(None))
+
+
+class TestCsvPassthrough(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.client = MagicMock()
+        self.client.config = {
+            "start_date": "2023-01-01T00:00:00Z",
+            "report_output": "csv",
+            "csv_dir": self.output_dir,
+            "csv_compression": "gzip",
+        }
+        self.client.reporting_url = "https://reports.test"
+        self.client.deadline = RunDeadline({})
+        reports = [
+            {"id": f"r{i}", "downloadUrl": f"https://download.test/r{i}", "createTime": f"2023-01-0{i + 1}T00:00:00Z",
+             "startTime": f"2023-01-0{i}T00:00:00Z"}
+            for i in (1, 2)
+        ]
+        self.client.get.side_effect = lambda url=None, params=None, endpoint=None: (
+            {"jobs": [{"id": "job1", "reportTypeId": ChannelBasicStream.report_type}]}
+            if endpoint.endswith("/jobs") else {"reports": reports}
+        )
+        self.content = {"r1": b"date,views\n20230101,7\n20230101,8\n", "r2": b"date,views\n20230102,9"}
+        self.directory = os.path.join(self.output_dir, "channel_basic")
+
+        def download(url, path, endpoint=None, open_file=open):
+            with open_file(path, "wb") as file:
+                file.write(self.content[url[-2:]])
+                if url.endswith("r1") and self.fail_r1:
+                    raise YoutubeAnalyticsNotFoundError("gone")
+            return len(self.content[url[-2:]])
+
+        self.fail_r1 = False
+        self.client.download_report_file.side_effect = download
+
+    def sync(self, stream):
+        states = []
+        with patch("tap_youtube_analytics.streams.abstracts.metrics.record_counter", side_effect=lambda *_: DummyCounter()):
+            with patch("tap_youtube_analytics.streams.abstracts.write_record") as write_record:
+                with patch("tap_youtube_analytics.streams.abstracts.write_state",
+                           side_effect=lambda s: states.append(json.loads(json.dumps(s)))):
+                    result = stream.sync(state={}, transformer=MagicMock())
+        write_record.assert_not_called()
+        return result, states
+
+    def test_reports_are_archived_as_is_with_manifests(self):
+        stream = ChannelBasicStream(self.client, build_catalog_entry(ChannelBasicStream))
+        result, states = self.sync(stream)
+
+        self.assertEqual(result, 3)
+        self.client.get_report.assert_not_called()
+
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ["r1.csv.gz", "r1.manifest.json", "r2.csv.gz", "r2.manifest.json"])
+        with gzip.open(os.path.join(self.directory, "r1.csv.gz"), "rb") as file:
+            self.assertEqual(file.read(), self.content["r1"])
+        with open(os.path.join(self.directory, "r2.manifest.json"), encoding="utf-8") as file:
+            manifest = json.load(file)
+        self.assertEqual(manifest["job_id"], "job1")
+        self.assertEqual(manifest["start_time"], "2023-01-02T00:00:00Z")
+        self.assertEqual(manifest["bytes"], len(self.content["r2"]))
+        self.assertEqual(manifest["row_count"], 1)
+        self.assertEqual(manifest["sha256"], hashlib.sha256(self.content["r2"]).hexdigest())
+        self.assertTrue(manifest["file"].endswith("/channel_basic/r2.csv.gz"))
+        self.assertEqual(
+            [s["bookmarks"]["channel_basic"]["create_time"] for s in states],
+            ["2023-01-02T00:00:00.000000Z", "2023-01-03T00:00:00.000000Z"],
+        )
+
+    def test_failed_download_leaves_no_file(self):
+        self.fail_r1 = True
+        stream = ChannelBasicStream(self.client, build_catalog_entry(ChannelBasicStream))
+        result, states = self.sync(stream)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["r2.csv.gz", "r2.manifest.json"])
+        self.assertEqual([r["report_id"] for r in states[-1]["bookmarks"]["channel_basic"]["failed_reports"]], ["r1"])
+
+    def test_unselected_stream_archives_nothing(self):
+        stream = ChannelBasicStream(self.client, build_catalog_entry(ChannelBasicStream))
+        with patch.object(ChannelBasicStream, "is_selected", return_value=False):
+            result, states = self.sync(stream)
+
+        self.assertEqual(result, 0)
+        self.client.download_report_file.assert_not_called()
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(states[-1]["bookmarks"]["channel_basic"]["create_time"], "2023-01-03T00:00:00.000000Z")
+
+
+class TestAsyncReportDownloads(unittest.TestCase):
+    def test_downloads_overlap_and_yield_in_report_order(self):
+        """Reports download concurrently, up to the in-flight window, and
+        come back in listing order; failed downloads yield their error."""
+        in_flight = {"now": 0, "max": 0}
+
+        class FakeAsyncClient:
+            max_in_flight = 2
+
+            async def get_report(self, url, endpoint=None):
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+                # Later reports finish first
+                await asyncio.sleep(0.01 * (5 - int(url[-1])))
+                in_flight["now"] -= 1
+                if url.endswith("3"):
+                    raise ValueError("broken report")
+                return [{"url": url}]
+
+        client = MagicMock()
+        client.config = {"start_date": "2023-01-01T00:00:00Z"}
+        client.deadline = RunDeadline({})
+        stream = ChannelBasicStream(client, build_catalog_entry(ChannelBasicStream))
+        reports = [{"id": f"r{i}", "downloadUrl": f"https://download.test/{i}"} for i in range(1, 5)]
+
+        async def collect():
+            return [item async for item in stream._adownload_reports(FakeAsyncClient(), reports)]
+
+        results = asyncio.run(collect())
+
+        self.assertEqual([report["id"] for report, _ in results], ["r1", "r2", "r3", "r4"])
+        self.assertEqual(results[0][1], [{"url": "https://download.test/1"}])
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertEqual(in_flight["max"], 2)
+
+    def test_downloads_ahead_are_bounded_by_rows(self):
+        started = []
+
+        class FakeAsyncClient:
+            max_in_flight = 64
+
+            async def get_report(self, url, endpoint=None):
+                started.append(url[-1])
+                return [{"row": i} for i in range(10)]
+
+        client = MagicMock()
+        client.config = {"start_date": "2023-01-01T00:00:00Z", "async_reports_ahead": 3, "async_buffer_rows": 20}
+        client.deadline = RunDeadline({})
+        stream = ChannelBasicStream(client, build_catalog_entry(ChannelBasicStream))
+        reports = [{"id": f"r{i}", "downloadUrl": f"https://download.test/{i}"} for i in range(6)]
+
+        async def collect():
+            downloads_started = []
+            async for report, _ in stream._adownload_reports(FakeAsyncClient(), reports):
+                downloads_started.append((report["id"], len(started)))
+                # A slow consumer: the downloads ahead finish meanwhile
+                await asyncio.sleep(0.01)
+            return downloads_started
+
+        # Up to 3 reports ahead, but no new download while 20 rows wait
+        self.assertEqual(
+            asyncio.run(collect()),
+            [("r0", 3), ("r1", 3), ("r2", 3), ("r3", 5), ("r4", 5), ("r5", 6)],
+        )
+
+    def test_no_download_starts_past_the_run_deadline(self):
+        started = []
+
+        class FakeAsyncClient:
+            max_in_flight = 8
+
+            async def get_report(self, url, endpoint=None):
+                started.append(url[-1])
+                return [{"row": 1}]
+
+        client = MagicMock()
+        client.config = {"start_date": "2023-01-01T00:00:00Z"}
+        client.deadline = RunDeadline({"max_run_seconds": 60})
+        stream = ChannelBasicStream(client, build_catalog_entry(ChannelBasicStream))
+        # The reports were listed before the deadline, which passes once
+        # two downloads started
+        reports = [{"id": f"r{i}", "downloadUrl": f"https://download.test/{i}"} for i in range(4)]
+        checks = []
+
+        def stop_before(unit):
+            checks.append(unit)
+            return len(checks) > 2
+
+        async def collect():
+            return [report["id"] async for report, _ in stream._adownload_reports(FakeAsyncClient(), reports)]
+
+        with patch.object(client.deadline, "stop_before", side_effect=stop_before):
+            self.assertEqual(asyncio.run(collect()), ["r0", "r1"])
+        self.assertEqual(started, ["0", "1"])
+        self.assertTrue(stream.stopped_at_deadline)
+
+
+class TestPageSizePolicy(unittest.TestCase):
+    def test_documented_maximum_by_default_with_capped_overrides(self):
+        config = {"page_sizes": {"playlists": 20, "search_videos": 500, "reports": 200}}
+
+        self.assertEqual(get_page_size({}, "playlists"), 50)
+        self.assertEqual(get_page_size(config, "playlists"), 20)
+        self.assertEqual(get_page_size(config, "search_videos"), 50)
+        self.assertEqual(get_page_size(config, "reports"), 200)
+        self.assertEqual(get_page_size(config, "jobs"), 50)
+
+
+class TestFieldMask(unittest.TestCase):
+    def build_stream(self, breadcrumb_selection, stream_selected=True):
+        catalog_entry = build_catalog_entry(Videos, extra_properties={
+            "snippet": {
+                "type": ["null", "object"],
+                "properties": {
+                    "title": {"type": ["null", "string"]},
+                    "description": {"type": ["null", "string"]},
+                    "thumbnails": {"type": ["null", "object"]},
+                },
+            },
+            "statistics": {"type": ["null", "object"]},
+            "content_details": {"type": ["null", "object"]},
+        })
+        m_map = metadata.to_map(catalog_entry.metadata)
+        m_map = metadata.write(m_map, (), "selected", stream_selected)
+        for breadcrumb, selected in breadcrumb_selection.items():
+            m_map = metadata.write(m_map, breadcrumb, "selected", selected)
+        catalog_entry.metadata = metadata.to_list(m_map)
+        client = MagicMock()
+        client.config = {"start_date": "2023-01-01T00:00:00Z"}
+        return Videos(client, catalog_entry)
+
+    def test_deselected_fields_are_left_out_of_part_and_fields(self):
+        stream = self.build_stream({
+            ("properties", "statistics"): False,
+            ("properties", "snippet", "properties", "description"): False,
+            ("properties", "snippet", "properties", "thumbnails"): False,
+        })
+
+        params = stream.field_mask_params()
+
+        self.assertEqual(params["part"], "id,contentDetails,snippet")
+        self.assertEqual(
+            params["fields"],
+            "etag,nextPageToken,pageInfo,items(kind,etag,id,contentDetails,snippet(publishedAt,title))",
+        )
+
+    def test_replication_key_kept_when_its_part_is_deselected(self):
+        stream = self.build_stream({
+            ("properties", "snippet"): False,
+            ("properties", "statistics"): False,
+            ("properties", "content_details"): False,
+        })
+
+        params = stream.field_mask_params()
+
+        self.assertEqual(params["part"], "id,snippet")
+        self.assertIn("items(kind,etag,id,snippet(publishedAt))", params["fields"])
+
+    def test_unselected_stream_requests_only_key_fields(self):
+        stream = self.build_stream({}, stream_selected=False)
+
+        self.assertEqual(stream.field_mask_params()["part"], "id,snippet")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,23 @@
+import threading
 import unittest
+from functools import partial
 import singer
 from unittest.mock import patch, MagicMock, call
-from tap_youtube_analytics.sync import sync, update_currently_syncing, write_schema
+from tap_youtube_analytics.sync import (
+    sync,
+    update_currently_syncing,
+    update_in_flight_streams,
+    write_schema,
+)
 from tap_youtube_analytics.client import Client
+from tap_youtube_analytics.deadline import RunDeadline
 from singer.catalog import Catalog
 from singer import Transformer
 
 class TestSync(unittest.TestCase):
     def setUp(self):
         self.mock_client = MagicMock(spec=Client)
+        self.mock_client.deadline = RunDeadline({})
         self.mock_config = {"key": "value"}
         self.mock_catalog = MagicMock(spec=Catalog)
         self.mock_state = {}
@@ -134,6 +143,68 @@ class TestSync(unittest.TestCase):
         mock_set_currently_syncing.assert_called_once_with(state, "new_stream")
         mock_write_state.assert_called_with(state)
 
+    @patch("singer.write_state")
+    @patch("tap_youtube_analytics.streams.STREAMS")
+    def test_sync_parallel(self, mock_streams, mock_write_state):
+        """Test top-level streams are synced on a worker pool, interrupted streams first"""
+        started = []
+        instances = {}
+        interrupted_started = threading.Event()
+
+        def sync_stream_side_effect(stream_name, state, transformer):
+            # The other streams wait for the interrupted one, so a worker
+            # picking them up first cannot overtake it
+            if stream_name != "stream_c":
+                interrupted_started.wait(5)
+            started.append(stream_name)
+            interrupted_started.set()
+            return 1
+
+        def mock_stream_factory(stream_name):
+            def build(client, catalog_stream):
+                instance = MagicMock()
+                instance.client = client
+                instance.tap_stream_id = stream_name
+                instance.parent = None
+                instance.children = []
+                instance.child_to_sync = []
+                instance.sync.side_effect = partial(sync_stream_side_effect, stream_name)
+                instances[stream_name] = instance
+                return instance
+            return build
+
+        mock_streams.__getitem__.side_effect = mock_stream_factory
+        mock_streams.__contains__.return_value = True
+
+        catalog_streams = []
+        for name in ("stream_a", "stream_b", "stream_c"):
+            catalog_stream = MagicMock()
+            catalog_stream.stream = name
+            catalog_streams.append(catalog_stream)
+        self.mock_catalog.get_selected_streams.return_value = catalog_streams
+
+        state = {"currently_syncing_streams": ["stream_c"]}
+        sync(self.mock_client, {"max_parallel_streams": 2}, self.mock_catalog, state)
+
+        self.assertCountEqual(started, ["stream_a", "stream_b", "stream_c"])
+        self.assertEqual(started[0], "stream_c")
+        for instance in instances.values():
+            instance.write_schema.assert_called_once()
+            instance.sync.assert_called_once()
+        self.assertNotIn("currently_syncing_streams", state)
+
+    @patch("singer.write_state")
+    def test_update_in_flight_streams(self, mock_write_state):
+        """Test in-flight streams are tracked as a sorted list in state"""
+        state = {}
+        update_in_flight_streams(state, "videos", True)
+        update_in_flight_streams(state, "channels", True)
+        self.assertEqual(state["currently_syncing_streams"], ["channels", "videos"])
+        update_in_flight_streams(state, "videos", False)
+        update_in_flight_streams(state, "channels", False)
+        self.assertNotIn("currently_syncing_streams", state)
+        self.assertEqual(mock_write_state.call_count, 4)
+
     @patch("tap_youtube_analytics.streams.STREAMS")
     def test_write_schema(self, mock_streams):
         """Test write_schema function"""
@@ -0,0 +1,162 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from decimal import Decimal
+from unittest.mock import patch
+
+import singer
+
+from tap_youtube_analytics import writer
+from tap_youtube_analytics.writer import BatchMessageWriter, BufferedMessageWriter, MessageWriter, create_writer
+
+
+class TestBufferedMessageWriter(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        self.writer = BufferedMessageWriter(buffer_bytes=10 ** 6, flush_seconds=3600, output=self.output)
+
+    def messages(self):
+        return [json.loads(line) for line in self.output.getvalue().splitlines()]
+
+    def test_records_match_singer_messages(self):
+        record = {"id": "a", "views": 10, "title": "café", "nested": {"x": [1, 2]}}
+        line = self.writer.serialize_record("videos", record)
+
+        expected = singer.format_message(singer.RecordMessage(stream="videos", record=record))
+        self.assertEqual(json.loads(line), json.loads(expected))
+        self.assertTrue(line.endswith("}\n"))
+
+    def test_decimal_values_are_kept_exact(self):
+        line = self.writer.serialize_record("videos", {"ratio": Decimal("0.1234567890123456789")})
+        self.assertIn('"ratio":0.1234567890123456789', line)
+
+    def test_buffer_is_flushed_with_state(self):
+        self.writer.write_schema("videos", {"type": "object"}, "id")
+        self.writer.write_record("videos", {"id": "a"})
+        self.writer.write_lines("videos", [self.writer.serialize_record("videos", {"id": "b"})])
+        self.assertEqual(self.output.getvalue(), "")
+
+        self.writer.write_state({"bookmarks": {"videos": {"published_at": "2023-01-01"}}})
+
+        self.assertEqual(
+            [(message["type"], message.get("record")) for message in self.messages()],
+            [("SCHEMA", None), ("RECORD", {"id": "a"}), ("RECORD", {"id": "b"}), ("STATE", None)],
+        )
+        self.assertEqual(self.messages()[0]["key_properties"], ["id"])
+
+    def test_buffer_is_flushed_at_size_limit(self):
+        # Each message is 53 bytes: the buffer is written every third one
+        self.writer.buffer_bytes = 150
+        for i in range(10):
+            self.writer.write_record("videos", {"id": i})
+        self.assertEqual(len(self.messages()), 9)
+
+        self.writer.flush()
+        self.assertEqual(len(self.messages()), 10)
+
+
+class TestBatchMessageWriter(unittest.TestCase):
+    def setUp(self):
+        self.batch_dir = tempfile.mkdtemp()
+        self.writer = BatchMessageWriter(self.batch_dir, max_rows=3)
+        self.stdout = io.StringIO()
+
+    def messages(self):
+        return [json.loads(line) for line in self.stdout.getvalue().splitlines()]
+
+    @staticmethod
+    def read_part(uri):
+        with gzip.open(uri[len("file://"):], "rt") as file:
+            return [json.loads(line) for line in file]
+
+    def test_parts_roll_over_and_close_before_state(self):
+        self.writer.checkpoint_seconds = 0
+        with redirect_stdout(self.stdout):
+            self.writer.write_schema("videos", {"type": "object"}, ["id"])
+            for i in range(4):
+                self.writer.write_record("videos", {"id": i})
+            self.writer.write_lines("channels", [self.writer.serialize_record("channels", {"id": "c"})])
+            self.writer.write_state({"bookmarks": {}})
+
+        messages = self.messages()
+        self.assertEqual([m["type"] for m in messages], ["SCHEMA", "BATCH", "BATCH", "BATCH", "STATE"])
+        batches = {}
+        for message in messages[1:4]:
+            self.assertEqual(message["encoding"], {"format": "jsonl", "compression": "gzip"})
+            batches.setdefault(message["stream"], []).extend(
+                record for uri in message["manifest"] for record in self.read_part(uri)
+            )
+        self.assertEqual(batches, {"videos": [{"id": i} for i in range(4)], "channels": [{"id": "c"}]})
+        self.assertEqual(len(os.listdir(self.batch_dir)), 3)
+
+    def test_serialized_records_are_written_as_they_are(self):
+        with redirect_stdout(self.stdout):
+            self.writer.write_lines("channels", ['{"id": "c",  "views": 1}\n'])
+            self.writer.flush()
+
+        uri = self.messages()[0]["manifest"][0]
+        with gzip.open(uri[len("file://"):], "rt") as file:
+            self.assertEqual(file.read(), '{"id": "c",  "views": 1}\n')
+
+    def test_state_is_held_back_until_the_checkpoint_is_due(self):
+        with redirect_stdout(self.stdout):
+            # Nothing to announce: the STATE is written as it comes
+            self.writer.write_state({"bookmarks": {}})
+            for report in range(2):
+                self.writer.write_record("videos", {"id": report})
+                self.writer.write_state({"bookmarks": {"videos": {"report": report}}})
+            self.assertEqual([m["type"] for m in self.messages()], ["STATE"])
+
+            # The last open part rolls over: the latest STATE follows it
+            self.writer.write_record("videos", {"id": 2})
+            self.assertEqual([m["type"] for m in self.messages()], ["STATE", "BATCH", "STATE"])
+            self.assertEqual(self.messages()[-1]["value"], {"bookmarks": {"videos": {"report": 1}}})
+
+            self.writer.write_record("videos", {"id": 3})
+            self.writer.write_state({"bookmarks": {"videos": {"report": 3}}})
+            self.assertEqual(len(self.messages()), 3)
+            self.writer.flush()
+
+        messages = self.messages()
+        self.assertEqual([m["type"] for m in messages], ["STATE", "BATCH", "STATE", "BATCH", "STATE"])
+        self.assertEqual(messages[-1]["value"], {"bookmarks": {"videos": {"report": 3}}})
+        self.assertEqual(self.read_part(messages[3]["manifest"][0]), [{"id": 3}])
+
+    def test_flush_closes_open_parts(self):
+        with redirect_stdout(self.stdout):
+            self.writer.write_record("videos", {"id": "a"})
+            self.assertEqual(self.stdout.getvalue(), "")
+            self.writer.flush()
+
+        self.assertEqual([m["type"] for m in self.messages()], ["BATCH"])
+
+
+class TestCreateWriter(unittest.TestCase):
+    def test_writer_selection(self):
+        self.assertIs(type(create_writer({})), MessageWriter)
+        buffered = create_writer({"buffered_output": True, "output_buffer_bytes": 2048})
+        self.assertIsInstance(buffered, BufferedMessageWriter)
+        self.assertEqual(buffered.buffer_bytes, 2048)
+        batch = create_writer({"output_mode": "batch", "batch_dir": tempfile.mkdtemp(), "batch_max_rows": 10})
+        self.assertIsInstance(batch, BatchMessageWriter)
+        self.assertEqual(batch.max_rows, 10)
+
+    def test_set_writer_flushes_previous_writer(self):
+        output = io.StringIO()
+        previous = writer.WRITER
+        buffered = BufferedMessageWriter(flush_seconds=3600, output=output)
+        writer.set_writer(buffered)
+        try:
+            writer.write_record("videos", {"id": "a"})
+            self.assertEqual(output.getvalue(), "")
+        finally:
+            writer.set_writer(previous)
+        self.assertEqual(json.loads(output.getvalue())["record"], {"id": "a"})
+
+
+if __name__ == "__main__":
+    unittest.main()